@@ -0,0 +1,8 @@
+"""
+Local performance benchmarks for the Library API.
+
+Each module is a standalone script that drives the project in-process
+against a throwaway test database, e.g.:
+
+    python -m benchmarks.pagination --rows 1000000
+"""
@@ -0,0 +1,110 @@
+"""
+Compare requests/sec of the sync DRF views and their async counterparts
+when served through Django's ASGI handler, in-process.
+
+    python -m benchmarks.asgi --requests 2000 --concurrency 50
+
+Every request gets a unique query string so the catalog cache is bypassed;
+pass --cache to measure cached reads instead.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.utils import benchmark_database, insert_rows, setup_django
+
+BOOKS = 10_000
+BORROWINGS = 50
+
+
+async def load(client, url, headers, requests, concurrency, cache):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            params = {} if cache else {"_": i}
+            start = time.perf_counter()
+            response = await client.get(url, params, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.status_code
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cache", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.test import AsyncClient
+    from django.urls import reverse
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from users.serializers import ClaimsTokenObtainPairSerializer
+
+    with benchmark_database() as connection:
+        insert_rows(
+            connection,
+            Book._meta.db_table,
+            ("title", "author", "cover", "inventory", "daily_fee"),
+            (
+                (f"Book {i}", f"Author {i % 100}", "Soft", 3, "0.99")
+                for i in range(BOOKS)
+            ),
+        )
+        patron = get_user_model().objects.create_user(email="bench@example.com")
+        Borrowing.objects.bulk_create(
+            Borrowing(book_id=i + 1, user=patron, expected_return_date="2030-01-01")
+            for i in range(BORROWINGS)
+        )
+        token = ClaimsTokenObtainPairSerializer.get_token(patron).access_token
+        headers = {"authorize": f"Bearer {token}"}
+        scenarios = [
+            ("books list", "books:book-list", {}, None),
+            ("books detail", "books:book-detail", {"pk": 42}, None),
+            ("borrowings list", "borrowings:borrowing-list", {}, headers),
+        ]
+
+        async def run():
+            client = AsyncClient()
+            rows = []
+            for label, name, kwargs, auth in scenarios:
+                for flavor, url in (
+                    ("sync", reverse(name, kwargs=kwargs)),
+                    ("async", reverse(f"{name}-async", kwargs=kwargs)),
+                ):
+                    rps, latencies = await load(
+                        client, url, auth, args.requests, args.concurrency, args.cache
+                    )
+                    rows.append((f"{label} ({flavor})", rps, latencies))
+            return rows
+
+        rows = asyncio.run(run())
+
+    print(
+        f"\nASGI load: {args.requests} requests, concurrency {args.concurrency}, "
+        f"cache {'on' if args.cache else 'off'}"
+    )
+    width = max(len(label) for label, _, _ in rows)
+    print(f"{'scenario'.ljust(width)}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}")
+    for label, rps, latencies in rows:
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"{label.ljust(width)}  {rps:>8.0f}  "
+            f"{statistics.median(ordered):>8.2f}  {p95:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
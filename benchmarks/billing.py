@@ -0,0 +1,132 @@
+"""
+Time the nightly overdue billing against a per-row Python loop.
+
+    python -m benchmarks.billing --rows 500000 --loop-rows 5000
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+
+from benchmarks.utils import (
+    benchmark_database,
+    insert_rows,
+    print_table,
+    setup_django,
+    time_call,
+)
+
+AS_OF = date(2024, 6, 1)
+BOOKS = 1000
+USERS = 1000
+
+
+def user_rows():
+    for i in range(USERS):
+        yield (f"patron{i}@example.com", "!", False, False, "", "", True, AS_OF, 0, 0)
+
+
+def borrowing_rows(rows, seed=42):
+    rng = random.Random(seed)
+    for _ in range(rows):
+        borrowed = AS_OF - timedelta(days=rng.randint(15, 60))
+        expected = borrowed + timedelta(days=14)
+        yield (
+            borrowed,
+            expected,
+            rng.randint(1, BOOKS),
+            rng.randint(1, USERS),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--loop-rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+    from payments.billing import bill_overdue
+    from payments.models import Payment
+
+    def python_loop():
+        # The row-at-a-time version the set-based billing replaces.
+        overdue = Borrowing.objects.overdue(AS_OF).select_related("book")
+        billed = 0
+        with transaction.atomic():
+            for borrowing in overdue[: args.loop_rows]:
+                days = (AS_OF - borrowing.expected_return_date).days
+                Payment.objects.update_or_create(
+                    borrowing=borrowing,
+                    type=Payment.Type.FINE,
+                    defaults={
+                        "money_to_pay": borrowing.book.daily_fee
+                        * days
+                        * settings.FINE_MULTIPLIER
+                    },
+                )
+                billed += 1
+        return billed
+
+    def set_based():
+        return sum(bill_overdue(AS_OF))
+
+    def reset():
+        Payment.objects.all().delete()
+
+    with benchmark_database() as connection:
+        print(f"Seeding {args.rows} overdue borrowings...")
+        insert_rows(
+            connection,
+            Book._meta.db_table,
+            ("title", "author", "cover", "inventory", "daily_fee"),
+            ((f"Book {i}", "Author", "Soft", 1, "0.99") for i in range(BOOKS)),
+        )
+        insert_rows(
+            connection,
+            get_user_model()._meta.db_table,
+            (
+                "email",
+                "password",
+                "is_superuser",
+                "is_staff",
+                "first_name",
+                "last_name",
+                "is_active",
+                "date_joined",
+                "token_version",
+                "active_borrowings",
+            ),
+            user_rows(),
+        )
+        insert_rows(
+            connection,
+            Borrowing._meta.db_table,
+            ("borrow_date", "expected_return_date", "book_id", "user_id"),
+            borrowing_rows(args.rows),
+        )
+
+        results = []
+        for label, func, before in (
+            ("set-based, new fines", set_based, reset),
+            ("set-based, rerun", set_based, None),
+            ("python loop", python_loop, reset),
+        ):
+            # Label each timing with the fines the scenario actually wrote.
+            billed = []
+            timings = time_call(
+                lambda: billed.append(func()), args.repeat, before=before
+            )
+            results.append((f"{label} ({billed[-1]} rows)", timings))
+        print_table(f"overdue billing ({connection.vendor})", results)
+
+
+if __name__ == "__main__":
+    main()
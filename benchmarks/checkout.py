@@ -0,0 +1,73 @@
+"""
+Compare checking out a basket one POST per book against one bulk checkout.
+
+    python -m benchmarks.checkout --basket 50 --repeat 10
+"""
+
+import argparse
+
+from benchmarks.utils import benchmark_database, print_table, setup_django, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--basket", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from books.models import Book
+
+    # Every run adds its basket to the patron's active borrowings.
+    borrowings = 2 * args.basket * args.repeat
+    with benchmark_database(), override_settings(MAX_ACTIVE_BORROWINGS=borrowings):
+        patron = get_user_model().objects.create_user(email="bench@example.com")
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {i}",
+                author="Bench Author",
+                cover=Book.CoverType.SOFT,
+                inventory=2 * args.repeat,
+                daily_fee="0.99",
+            )
+            for i in range(args.basket)
+        )
+        book_ids = [book.id for book in books]
+        client = APIClient()
+        client.force_authenticate(user=patron)
+        list_url = reverse("borrowings:borrowing-list")
+        bulk_url = reverse("borrowings:borrowing-bulk-checkout")
+
+        def single_posts():
+            for book_id in book_ids:
+                response = client.post(
+                    list_url,
+                    {"book": book_id, "expected_return_date": "2030-01-01"},
+                    format="json",
+                )
+                assert response.status_code == 201, response.data
+
+        def bulk_post():
+            response = client.post(
+                bulk_url,
+                {"books": book_ids, "expected_return_date": "2030-01-01"},
+                format="json",
+            )
+            assert response.status_code == 201, response.data
+
+        print_table(
+            f"checkout of {args.basket} books",
+            [
+                (f"{args.basket} single POSTs", time_call(single_posts, args.repeat)),
+                ("1 bulk POST", time_call(bulk_post, args.repeat)),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
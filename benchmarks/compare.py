@@ -0,0 +1,90 @@
+"""
+Compare a benchmarks.load result file against a baseline and exit non-zero
+on a regression.
+
+    python -m benchmarks.compare benchmarks/baselines/load.json results.json
+
+A scenario regresses when its p50 or p95 latency grows, or its throughput
+drops, by more than --tolerance. It also regresses when it makes more
+queries per request or fails more requests than the baseline. Timings
+depend on the machine, so record the baseline on the machine that runs
+the comparison.
+"""
+
+import argparse
+import json
+import sys
+
+# (key, label, True when a larger value is worse)
+TIMED = (
+    ("p50_ms", "p50 ms", True),
+    ("p95_ms", "p95 ms", True),
+    ("requests_per_s", "req/s", False),
+)
+EXACT = (
+    ("queries_per_request", "queries"),
+    ("errors", "errors"),
+)
+
+
+def compare(baseline, current, tolerance):
+    """Yield `(scenario, label, baseline value, current value, regressed)`"""
+    for name, before in baseline["scenarios"].items():
+        after = current["scenarios"].get(name)
+        if after is None:
+            yield name, "missing", None, None, True
+            continue
+        for key, label, larger_is_worse in TIMED:
+            if larger_is_worse:
+                regressed = after[key] > before[key] * (1 + tolerance)
+            else:
+                regressed = after[key] < before[key] / (1 + tolerance)
+            yield name, label, before[key], after[key], regressed
+        for key, label in EXACT:
+            # Allow for float noise in the per-request average.
+            yield name, label, before[key], after[key], after[key] > before[key] + 1e-6
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown of timings (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as baseline_file, open(args.current) as current_file:
+        baseline = json.load(baseline_file)
+        current = json.load(current_file)
+    if baseline["config"] != current["config"]:
+        print(
+            f"warning: configurations differ\n  baseline {baseline['config']}"
+            f"\n  current  {current['config']}"
+        )
+
+    rows = list(compare(baseline, current, args.tolerance))
+    width = max(len(name) for name, *_ in rows)
+    print(
+        f"{'scenario'.ljust(width)}  {'metric':>8}  {'baseline':>10}  {'current':>10}"
+    )
+    for name, label, before, after, regressed in rows:
+        if before is None:
+            print(f"{name.ljust(width)}  {label:>8}  REGRESSION")
+            continue
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name.ljust(width)}  {label:>8}  {before:>10.2f}  {after:>10.2f}{flag}")
+
+    regressions = sum(regressed for *_, regressed in rows)
+    if regressions:
+        sys.exit(f"\n{regressions} regression(s) against {args.baseline}")
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Seeded data generators for the benchmarks: N books, users and borrowings,
+the same rows (dated relative to today) for the same seed.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from benchmarks.utils import insert_rows
+
+AUTHORS = 500
+COVERS = ("Hard", "Soft")
+PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "admin@example.com"
+# Share of borrowings still out. No patron starts with more than
+# MAX_SEEDED_ACTIVE of them, so checkouts stay within MAX_ACTIVE_BORROWINGS.
+ACTIVE_SHARE = 0.2
+MAX_SEEDED_ACTIVE = 3
+
+
+@dataclass
+class Dataset:
+    book_ids: list
+    user_ids: list
+    admin_id: int
+    active_borrowing_ids: list
+    emails: list
+    password: str = PASSWORD
+
+
+def generate(connection, books, users, borrowings, seed=0):
+    """Insert the rows into the current database and describe them"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    rng = random.Random(seed)
+    today = date.today()
+    insert_books(connection, Book, books, rng)
+    book_ids = list(Book.objects.order_by("id").values_list("id", flat=True))
+
+    user_model = get_user_model()
+    emails = [f"patron{i}@example.com" for i in range(users)]
+    patrons = list(range(users))
+    active = [0] * users
+    rows = []
+    for _ in range(borrowings):
+        patron = rng.choice(patrons)
+        borrowed = today - timedelta(days=rng.randrange(1, 365))
+        returned = None
+        if rng.random() >= ACTIVE_SHARE or active[patron] >= MAX_SEEDED_ACTIVE:
+            returned = min(borrowed + timedelta(days=rng.randrange(0, 30)), today)
+        else:
+            active[patron] += 1
+        rows.append((patron, rng.choice(book_ids), borrowed, returned))
+
+    # One hash shared by every patron keeps seeding fast while logins still
+    # pay the configured hashing cost.
+    password = make_password(PASSWORD)
+    user_model.objects.bulk_create_users(
+        {"email": email, "password": password, "active_borrowings": count}
+        for email, count in zip(emails, active)
+    )
+    admin = user_model.objects.create_superuser(ADMIN_EMAIL, PASSWORD)
+    ids_by_email = dict(user_model.objects.values_list("email", "id"))
+    user_ids = [ids_by_email[email] for email in emails]
+
+    insert_rows(
+        connection,
+        Borrowing._meta.db_table,
+        (
+            "user_id",
+            "book_id",
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+        ),
+        (
+            (
+                user_ids[patron],
+                book_id,
+                borrowed,
+                borrowed + timedelta(days=14),
+                returned,
+            )
+            for patron, book_id, borrowed, returned in rows
+        ),
+    )
+    active_borrowing_ids = list(
+        Borrowing.objects.filter(actual_return_date__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    return Dataset(book_ids, user_ids, admin.id, active_borrowing_ids, emails)
+
+
+def insert_books(connection, book_model, count, rng):
+    insert_rows(
+        connection,
+        book_model._meta.db_table,
+        ("title", "author", "cover", "inventory", "daily_fee"),
+        (
+            (
+                f"Book {i}",
+                f"Author {rng.randrange(AUTHORS)}",
+                rng.choice(COVERS),
+                rng.randrange(100, 1000),
+                f"{rng.randrange(50, 500) / 100:.2f}",
+            )
+            for i in range(count)
+        ),
+    )
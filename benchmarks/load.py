@@ -0,0 +1,265 @@
+"""
+Seed N books, users and borrowings, then drive the API in-process through
+the test client and report per-scenario p50/p95/p99 latency, throughput
+and queries per request.
+
+    python -m benchmarks.load --books 10000 --users 1000 --borrowings 50000
+    python -m benchmarks.load --output results.json
+    python -m benchmarks.compare benchmarks/baselines/load.json results.json
+
+Requests are sent one at a time with JWT credentials, so throughput is that
+of a single worker. Scenarios share one database and run in the order of
+SCENARIOS, reads first. Request sequences come from --seed, so two runs
+send the same requests against the same rows.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.data import generate
+from benchmarks.utils import benchmark_database, setup_django
+
+SCENARIOS = {}
+
+
+def scenario(requests):
+    """Register a generator of `(method, path, data, user_id, status)`"""
+
+    def register(func):
+        SCENARIOS[func.__name__] = (func, requests)
+        return func
+
+    return register
+
+
+@scenario(requests=300)
+def catalog_browse(dataset, rng):
+    """Anonymous visitors paging, filtering and opening books"""
+    from django.urls import reverse
+
+    list_url = reverse("books:book-list")
+    pages = max(1, min(len(dataset.book_ids), 2400) // 24)
+    while True:
+        roll = rng.random()
+        if roll < 0.5:
+            params = {"offset": rng.randrange(pages) * 24}
+            yield "get", list_url, params, None, 200
+        elif roll < 0.7:
+            params = {"author": f"Author {rng.randrange(500)}", "available": "true"}
+            yield "get", list_url, params, None, 200
+        else:
+            url = reverse("books:book-detail", args=[rng.choice(dataset.book_ids)])
+            yield "get", url, None, None, 200
+
+
+@scenario(requests=300)
+def filtered_borrowing_list(dataset, rng):
+    """Admins filtering borrowings by patrons and status"""
+    from django.urls import reverse
+
+    list_url = reverse("borrowings:borrowing-list")
+    while True:
+        users = rng.sample(dataset.user_ids, rng.randint(1, 3))
+        params = {
+            "user_id": ",".join(map(str, users)),
+            "is_active": rng.choice(("true", "false")),
+        }
+        yield "get", list_url, params, dataset.admin_id, 200
+
+
+@scenario(requests=20)
+def token_issuance(dataset, rng):
+    """Patrons logging in; dominated by the password hashing cost"""
+    from django.urls import reverse
+
+    url = reverse("users:token_obtain_pair")
+    while True:
+        credentials = {
+            "email": rng.choice(dataset.emails),
+            "password": dataset.password,
+        }
+        yield "post", url, credentials, None, 200
+
+
+@scenario(requests=200)
+def checkout_storm(dataset, rng):
+    """Patrons checking books out"""
+    from django.urls import reverse
+
+    url = reverse("borrowings:borrowing-list")
+    due = time.strftime("%Y-%m-%d", time.localtime(time.time() + 14 * 86400))
+    while True:
+        data = {"book": rng.choice(dataset.book_ids), "expected_return_date": due}
+        yield "post", url, data, rng.choice(dataset.user_ids), 201
+
+
+@scenario(requests=200)
+def return_storm(dataset, rng):
+    """The desk returning borrowed books, billing fees and fines"""
+    from django.urls import reverse
+
+    borrowings = list(dataset.active_borrowing_ids)
+    rng.shuffle(borrowings)
+    for borrowing_id in borrowings:
+        url = reverse("borrowings:borrowing-return", args=[borrowing_id])
+        yield "post", url, None, dataset.admin_id, 200
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def run_scenario(name, dataset, requests, warmup, seed):
+    from django.core.cache import cache
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    from users.models import User
+    from users.serializers import ClaimsTokenObtainPairSerializer
+
+    func, _ = SCENARIOS[name]
+    calls = func(dataset, random.Random(f"{seed}-{name}"))
+    client = APIClient()
+    tokens = {}
+    cache.clear()
+
+    def headers(user_id):
+        if user_id is None:
+            return {}
+        if user_id not in tokens:
+            token = ClaimsTokenObtainPairSerializer.get_token(
+                User.objects.get(pk=user_id)
+            )
+            tokens[user_id] = {"HTTP_AUTHORIZE": f"Bearer {token.access_token}"}
+        return tokens[user_id]
+
+    latencies = []
+    queries = 0
+    errors = 0
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        for i in range(warmup + requests):
+            try:
+                method, path, data, user_id, expected = next(calls)
+            except StopIteration:
+                raise SystemExit(
+                    f"{name}: not enough data for {warmup + requests} requests"
+                )
+            extra = headers(user_id)
+            counted = counter.count
+            start = time.perf_counter()
+            if method == "get":
+                response = client.get(path, data, **extra)
+            else:
+                response = client.post(path, data, format="json", **extra)
+            elapsed = (time.perf_counter() - start) * 1000
+            if i < warmup:
+                continue
+            latencies.append(elapsed)
+            queries += counter.count - counted
+            errors += response.status_code != expected
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(ordered, 0.50),
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+        "requests_per_s": requests / (sum(latencies) / 1000),
+        "queries_per_request": queries / requests,
+    }
+
+
+def print_results(results):
+    columns = (
+        ("p50_ms", "p50 ms", ".2f"),
+        ("p95_ms", "p95 ms", ".2f"),
+        ("p99_ms", "p99 ms", ".2f"),
+        ("requests_per_s", "req/s", ".0f"),
+        ("queries_per_request", "queries", ".1f"),
+        ("errors", "errors", "d"),
+    )
+    width = max(len("scenario"), *(len(name) for name in results["scenarios"]))
+    print(
+        "scenario".ljust(width)
+        + "".join(f"  {heading:>8}" for _, heading, _ in columns)
+    )
+    for name, row in results["scenarios"].items():
+        print(
+            name.ljust(width)
+            + "".join(f"  {row[key]:>8{spec}}" for key, _, spec in columns)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--borrowings", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--requests", type=int, help="requests per scenario (default: per scenario)"
+    )
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="run only these scenarios (repeatable)",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    names = [name for name in SCENARIOS if name in (args.scenario or SCENARIOS)]
+    results = {
+        "config": {
+            "books": args.books,
+            "users": args.users,
+            "borrowings": args.borrowings,
+            "seed": args.seed,
+            "warmup": args.warmup,
+            "database": connection.vendor,
+        },
+        "scenarios": {},
+    }
+    with benchmark_database() as connection:
+        dataset = generate(
+            connection, args.books, args.users, args.borrowings, args.seed
+        )
+        for name in names:
+            requests = args.requests or SCENARIOS[name][1]
+            results["scenarios"][name] = run_scenario(
+                name, dataset, requests, args.warmup, args.seed
+            )
+
+    print(
+        f"\nAPI load: {args.books} books, {args.users} users, "
+        f"{args.borrowings} borrowings, seed {args.seed}"
+    )
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+            output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
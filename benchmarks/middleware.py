@@ -0,0 +1,94 @@
+"""
+Measure the per-request cost of the browser-only middleware and the
+browsable API renderer on API requests, against the lean profile that
+skips them under /api/ and renders JSON only.
+
+    python -m benchmarks.middleware --requests 2000
+"""
+
+import argparse
+from unittest import mock
+
+from benchmarks.utils import benchmark_database, print_table, setup_django, time_call
+
+STOCK_MIDDLEWARE = [
+    "library_service.metrics.RequestMetricsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+ROUND = 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+    from rest_framework.test import APIClient
+    from rest_framework.views import APIView
+
+    from books.models import Book
+    from users.serializers import ClaimsTokenObtainPairSerializer
+
+    profiles = (
+        ("stock", STOCK_MIDDLEWARE, [JSONRenderer, BrowsableAPIRenderer]),
+        (
+            "site-only middleware",
+            settings.MIDDLEWARE,
+            [JSONRenderer, BrowsableAPIRenderer],
+        ),
+        ("lean (+ JSON only)", settings.MIDDLEWARE, [JSONRenderer]),
+    )
+
+    with benchmark_database():
+        book = Book.objects.create(
+            title="Book", author="Author", cover="Soft", inventory=1, daily_fee="1"
+        )
+        patron = get_user_model().objects.create_user(email="bench@example.com")
+        token = ClaimsTokenObtainPairSerializer.get_token(patron).access_token
+        requests = (
+            ("book detail", reverse("books:book-detail", args=[book.pk]), {}),
+            (
+                "own borrowings",
+                reverse("borrowings:borrowing-list"),
+                {"HTTP_AUTHORIZE": f"Bearer {token}"},
+            ),
+        )
+
+        rows = []
+        for label, path, extra in requests:
+            clients = []
+            for profile, middleware, renderers in profiles:
+                # The client loads the middleware chain on its first request
+                # and keeps it after the override ends.
+                with override_settings(MIDDLEWARE=middleware):
+                    client = APIClient()
+                    client.get(path, **extra)
+                clients.append((profile, renderers, client, []))
+            # Interleave the profiles so drift affects them all alike.
+            for _ in range(args.requests // ROUND):
+                for profile, renderers, client, timings in clients:
+                    with mock.patch.object(APIView, "renderer_classes", renderers):
+                        timings.extend(
+                            time_call(lambda: client.get(path, **extra), ROUND)
+                        )
+            rows.extend(
+                (f"{label}: {profile}", timings) for profile, _, _, timings in clients
+            )
+
+        print_table(f"{args.requests} API requests per profile", rows)
+
+
+if __name__ == "__main__":
+    main()
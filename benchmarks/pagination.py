@@ -0,0 +1,107 @@
+"""
+Compare limit/offset and keyset pagination latency on shallow and deep pages.
+
+    python -m benchmarks.pagination --rows 1000000 --repeat 20
+"""
+
+import argparse
+import base64
+from datetime import date
+from urllib.parse import urlencode
+
+from benchmarks.utils import (
+    benchmark_database,
+    insert_rows,
+    print_table,
+    setup_django,
+    time_call,
+)
+
+
+def encode_cursor(position):
+    """Build the opaque cursor DRF would hand out for the row after `position`."""
+    return base64.b64encode(urlencode({"p": position}).encode("ascii")).decode("ascii")
+
+
+def seed(connection, rows):
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    admin = get_user_model().objects.create_user(
+        email="bench-admin@example.com", is_staff=True
+    )
+    insert_rows(
+        connection,
+        Book._meta.db_table,
+        ("title", "author", "cover", "inventory", "daily_fee"),
+        ((f"Book {i}", f"Author {i % 1000}", "Soft", 5, "0.99") for i in range(rows)),
+    )
+    insert_rows(
+        connection,
+        Borrowing._meta.db_table,
+        (
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "book_id",
+            "user_id",
+        ),
+        (
+            (date(2024, 1, 1), date(2024, 2, 1), None, i % rows + 1, admin.id)
+            for i in range(rows)
+        ),
+    )
+    return admin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=24)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    with benchmark_database() as connection:
+        print(f"Seeding {args.rows} books and borrowings...")
+        admin = seed(connection, args.rows)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        deep_offset = max(args.rows - args.limit, 0)
+
+        for name, url in (
+            ("books", reverse("books:book-list")),
+            ("borrowings", reverse("borrowings:borrowing-list")),
+        ):
+            scenarios = {
+                "offset 0": {"limit": args.limit, "offset": 0},
+                f"offset {deep_offset}": {"limit": args.limit, "offset": deep_offset},
+                "cursor first page": {"limit": args.limit, "pagination": "cursor"},
+                "cursor deep page": {
+                    "limit": args.limit,
+                    "cursor": encode_cursor(deep_offset),
+                },
+            }
+            results = [
+                (
+                    label,
+                    time_call(
+                        lambda params=params: client.get(url, params),
+                        args.repeat,
+                        # Measure the database path, not the catalog cache.
+                        before=cache.clear,
+                    ),
+                )
+                for label, params in scenarios.items()
+            ]
+            print_table(f"{name} ({args.rows} rows)", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare the full-text book search against `icontains` scans.
+
+    python -m benchmarks.search --rows 1000000 --repeat 10
+"""
+
+import argparse
+import random
+
+from benchmarks.utils import (
+    benchmark_database,
+    insert_rows,
+    print_table,
+    setup_django,
+    time_call,
+)
+
+WORDS = (
+    "night river garden shadow empire silver winter storm city glass "
+    "forest crown machine ocean secret stone fire letter island journey "
+    "memory house dragon mirror summer iron song wolf light harbor"
+).split()
+SYLLABLES = "ka lo mi ra ven tor sel da quin bar fen ul".split()
+# A few thousand rarer words keep most terms selective, as in a real catalog.
+RARE_WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+QUERIES = ("dragon", "kalomi", "venda", "harbor quintor", "silv crown")
+
+
+def title_rows(rows, seed=42):
+    rng = random.Random(seed)
+    for i in range(rows):
+        words = [rng.choice(WORDS), *rng.sample(RARE_WORDS, 2)]
+        rng.shuffle(words)
+        title = " ".join(words).title()
+        author = f"{rng.choice(WORDS).title()} Author{i % 5000}"
+        yield (title, author, "Soft", 1, "0.99")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=24)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Q
+
+    from books.models import Book
+    from books.search import search_books, search_terms
+
+    def icontains(query):
+        queryset = Book.objects.all()
+        for term in search_terms(query):
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(author__icontains=term)
+            )
+        return queryset.order_by("id")
+
+    def first_page(queryset):
+        # What the list endpoint runs: a COUNT(*) and one page of rows.
+        queryset.count()
+        list(queryset[: args.limit])
+
+    with benchmark_database() as connection:
+        print(f"Seeding {args.rows} books...")
+        insert_rows(
+            connection,
+            Book._meta.db_table,
+            ("title", "author", "cover", "inventory", "daily_fee"),
+            title_rows(args.rows),
+        )
+
+        results = []
+        for query in QUERIES:
+            results.append(
+                (
+                    f"fts       {query!r}",
+                    time_call(
+                        lambda: first_page(search_books(Book.objects.all(), query)),
+                        args.repeat,
+                    ),
+                )
+            )
+            results.append(
+                (
+                    f"icontains {query!r}",
+                    time_call(lambda: first_page(icontains(query)), args.repeat),
+                )
+            )
+        print_table(f"book search ({args.rows} rows, {connection.vendor})", results)
+
+
+if __name__ == "__main__":
+    main()
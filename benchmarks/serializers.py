@@ -0,0 +1,135 @@
+"""
+Compare list-page serialization with the ModelSerializers and the
+`.values()` fast path, in microseconds per row. Rows are loaded once, so
+only serialization and rendering are timed.
+
+    python -m benchmarks.serializers --rows 24 --repeat 2000
+"""
+
+import argparse
+import statistics
+from datetime import date
+
+from benchmarks.utils import benchmark_database, insert_rows, setup_django, time_call
+
+
+def seed(connection, rows):
+    from django.contrib.auth import get_user_model
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    user = get_user_model().objects.create_user(email="bench@example.com")
+    insert_rows(
+        connection,
+        Book._meta.db_table,
+        ("title", "author", "cover", "inventory", "daily_fee", "isbn"),
+        (
+            (f"Book {i}", f"Author {i % 100}", "Soft", 5, "0.99", f"isbn-{i}")
+            for i in range(rows)
+        ),
+    )
+    insert_rows(
+        connection,
+        Borrowing._meta.db_table,
+        (
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "book_id",
+            "user_id",
+        ),
+        (
+            (
+                date(2024, 1, 1),
+                date(2024, 2, 1),
+                date(2024, 1, 20) if i % 2 else None,
+                i + 1,
+                user.id,
+            )
+            for i in range(rows)
+        ),
+    )
+
+
+def print_per_row(title, rows, results):
+    print(f"\n{title}")
+    width = max(len(label) for label, _ in results)
+    print(f"{'scenario'.ljust(width)}  {'median µs/row':>14}  {'speedup':>8}")
+    baseline = None
+    for label, timings in results:
+        per_row = statistics.median(timings) * 1000 / rows
+        baseline = baseline or per_row
+        print(f"{label.ljust(width)}  {per_row:>14.2f}  {baseline / per_row:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from books.models import Book
+    from books.serializers import BookSerializer, BookValuesSerializer
+    from borrowings.models import Borrowing
+    from borrowings.serializers import (
+        BorrowingListSerializer,
+        BorrowingValuesSerializer,
+    )
+
+    json_renderer = JSONRenderer()
+
+    with benchmark_database() as connection:
+        seed(connection, args.rows)
+        for name, model, serializer, values_serializer in (
+            ("books", Book, BookSerializer, BookValuesSerializer),
+            (
+                "borrowings",
+                Borrowing,
+                BorrowingListSerializer,
+                BorrowingValuesSerializer,
+            ),
+        ):
+            queryset = model.objects.order_by("id")
+            instances = list(queryset)
+            rows = list(values_serializer.values(queryset))
+            results = [
+                (
+                    "ModelSerializer",
+                    time_call(
+                        lambda: serializer(instances, many=True).data, args.repeat
+                    ),
+                ),
+                (
+                    "ModelSerializer + JSONRenderer",
+                    time_call(
+                        lambda: json_renderer.render(
+                            serializer(instances, many=True).data
+                        ),
+                        args.repeat,
+                    ),
+                ),
+                (
+                    "ValuesSerializer",
+                    time_call(
+                        lambda: values_serializer(rows, many=True).data, args.repeat
+                    ),
+                ),
+                (
+                    "ValuesSerializer + JSONRenderer",
+                    time_call(
+                        lambda: json_renderer.render(
+                            values_serializer(rows, many=True).data
+                        ),
+                        args.repeat,
+                    ),
+                ),
+            ]
+            print_per_row(f"{name} ({args.rows} rows per page)", args.rows, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Run concurrent checkout-style writers, alongside readers paging the
+borrowing list, against SQLite in rollback-journal and in WAL mode.
+
+    python -m benchmarks.sqlite_journal --writers 8 --readers 8 --transactions 200
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.utils import benchmark_database, insert_rows, setup_django
+
+MODES = (
+    ("rollback journal", {"journal_mode": "DELETE", "synchronous": "FULL"}),
+    ("WAL", {"journal_mode": "WAL", "synchronous": "NORMAL"}),
+)
+
+
+def run(args, book_count, user_id):
+    from django.db import OperationalError, connection, transaction
+    from django.db.models import F
+
+    from books.models import Book
+    from borrowings.models import Borrowing
+
+    write_timings = []
+    reads = []
+    errors = []
+    writers_done = threading.Event()
+    start = threading.Barrier(args.writers + args.readers)
+
+    def writer(index):
+        try:
+            start.wait()
+            for i in range(args.transactions):
+                book_id = (index * args.transactions + i) % book_count + 1
+                began = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        Book.objects.filter(pk=book_id).update(
+                            inventory=F("inventory") - 1
+                        )
+                        Borrowing.objects.create(
+                            expected_return_date="2030-01-01",
+                            book_id=book_id,
+                            user_id=user_id,
+                        )
+                except OperationalError as exc:
+                    errors.append(str(exc))
+                    continue
+                write_timings.append((time.perf_counter() - began) * 1000)
+        finally:
+            connection.close()
+
+    def reader():
+        count = 0
+        try:
+            start.wait()
+            while not writers_done.is_set():
+                list(Borrowing.objects.order_by("-id").values_list("id")[:24])
+                count += 1
+        except OperationalError as exc:
+            errors.append(str(exc))
+        finally:
+            reads.append(count)
+            connection.close()
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    began = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    writers_done.set()
+    for thread in readers:
+        thread.join()
+
+    ordered = sorted(write_timings) or [0]
+    return {
+        "writes/s": len(write_timings) / elapsed,
+        "reads/s": sum(reads) / elapsed,
+        "write p50 ms": statistics.median(ordered),
+        "write p95 ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--transactions", type=int, default=200)
+    parser.add_argument("--books", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from books.models import Book
+
+    if connection.vendor != "sqlite":
+        parser.error("this benchmark needs the SQLite backend")
+
+    results = []
+    for label, pragmas in MODES:
+        settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, **pragmas}
+        connection.close()
+        with benchmark_database() as connection:
+            insert_rows(
+                connection,
+                Book._meta.db_table,
+                ("title", "author", "cover", "inventory", "daily_fee"),
+                (
+                    (f"Book {i}", "Author", "Soft", 1_000_000, "0.99")
+                    for i in range(args.books)
+                ),
+            )
+            user = get_user_model().objects.create_user(email="bench@example.com")
+            results.append((label, run(args, args.books, user.id)))
+
+    print(
+        f"\nSQLite journal modes ({args.writers} writers x {args.transactions} "
+        f"transactions, {args.readers} readers)"
+    )
+    columns = list(results[0][1])
+    width = max(len(label) for label, _ in results)
+    print("mode".ljust(width) + "".join(f"  {column:>13}" for column in columns))
+    for label, row in results:
+        print(
+            label.ljust(width)
+            + "".join(f"  {row[column]:>13.1f}" for column in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Measure cold start: where import time goes (`python -X importtime`) and how
+long a fresh process takes to answer its first request.
+
+    python -m benchmarks.startup --runs 5
+
+Each run is a new interpreter that loads the WSGI application and sends one
+request through it, against a freshly migrated SQLite database. The schema
+is requested both generated on the fly and served from a file built by
+`manage.py spectacular`.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_CODE = """
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+"""
+
+REQUEST_CODE = """
+import json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+timings = []
+for _ in range(2):
+    environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": "localhost"}
+    setup_testing_defaults(environ)
+    statuses = []
+    begun = time.perf_counter()
+    response = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(response)
+    response.close()
+    timings.append(time.perf_counter() - begun)
+    assert statuses[0].startswith("200"), statuses
+print(json.dumps({
+    "wall": time.time(),
+    "setup": loaded - started,
+    "first": timings[0],
+    "second": timings[1],
+}))
+"""
+
+URLS = (
+    ("book list", "/api/library/books/", False),
+    ("schema, generated", "/api/doc/", False),
+    ("schema, prebuilt file", "/api/doc/", True),
+)
+
+
+def run_python(args, env, **kwargs):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=BASE_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+        **kwargs,
+    )
+
+
+def import_times(env, runs, top):
+    """Median self time per top-level package, in ms, across `runs` runs"""
+    totals = defaultdict(list)
+    for _ in range(runs):
+        stderr = run_python(["-X", "importtime", "-c", IMPORT_CODE], env).stderr
+        by_package = defaultdict(int)
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_us, _, name = line[len("import time:") :].split("|")
+            if not self_us.strip().isdigit():
+                continue
+            by_package[name.strip().split(".")[0]] += int(self_us)
+        totals["(total)"].append(sum(by_package.values()) / 1000)
+        for package, micros in by_package.items():
+            totals[package].append(micros / 1000)
+    medians = {
+        package: statistics.median(values + [0] * (runs - len(values)))
+        for package, values in totals.items()
+    }
+    return sorted(medians.items(), key=lambda item: -item[1])[: top + 1]
+
+
+def first_responses(env, runs, schema_file):
+    rows = []
+    for label, path, prebuilt in URLS:
+        run_env = dict(env)
+        if prebuilt:
+            run_env["DJANGO_OPENAPI_SCHEMA_FILE"] = str(schema_file)
+        samples = defaultdict(list)
+        for _ in range(runs):
+            spawned = time.time()
+            result = json.loads(run_python(["-c", REQUEST_CODE, path], run_env).stdout)
+            samples["first response"].append((result["wall"] - spawned) * 1000)
+            samples["setup"].append(result["setup"] * 1000)
+            samples["first request"].append(result["first"] * 1000)
+            samples["second request"].append(result["second"] * 1000)
+        rows.append(
+            (label, {key: statistics.median(values) for key, values in samples.items()})
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DJANGO_SECRET_KEY": os.environ.get(
+                "DJANGO_SECRET_KEY", "benchmark-only-secret-key"
+            ),
+            "DJANGO_DB_NAME": str(Path(directory) / "db.sqlite3"),
+            "DJANGO_REQUEST_METRICS": "0",
+        }
+        env.pop("DJANGO_OPENAPI_SCHEMA_FILE", None)
+        schema_file = Path(directory) / "openapi.json"
+        run_python(["manage.py", "migrate", "--verbosity", "0"], env)
+        run_python(
+            [
+                "manage.py",
+                "spectacular",
+                "--format",
+                "openapi-json",
+                "--file",
+                str(schema_file),
+            ],
+            env,
+        )
+
+        packages = import_times(env, args.runs, args.top)
+        rows = first_responses(env, args.runs, schema_file)
+
+    print(f"\nImport time by top-level package (median of {args.runs} runs)")
+    width = max(len(package) for package, _ in packages)
+    print(f"{'package'.ljust(width)}  {'ms':>8}")
+    for package, ms in packages:
+        print(f"{package.ljust(width)}  {ms:>8.1f}")
+
+    print(f"\nTime to first response (median of {args.runs} fresh processes, ms)")
+    columns = list(rows[0][1])
+    width = max(len(label) for label, _ in rows)
+    print("request".ljust(width) + "".join(f"  {column:>14}" for column in columns))
+    for label, timings in rows:
+        print(
+            label.ljust(width)
+            + "".join(f"  {timings[column]:>14.1f}" for column in columns)
+        )
+
+
+if __name__ == "__main__":
+    main()
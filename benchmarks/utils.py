@@ -0,0 +1,79 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configure Django for a benchmark run outside of manage.py."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library_service.settings")
+    os.environ.setdefault(
+        "DJANGO_SECRET_KEY", "benchmark-only-secret-key-never-used-in-production"
+    )
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create a migrated throwaway database and drop it afterwards."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def insert_rows(connection, table, columns, rows, chunk_size=50_000):
+    """Bulk-load raw tuples, bypassing the ORM so seeding millions is cheap."""
+    from django.db import transaction
+
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(table),
+        ", ".join(connection.ops.quote_name(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    chunk = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                cursor.executemany(sql, chunk)
+                chunk = []
+        if chunk:
+            cursor.executemany(sql, chunk)
+
+
+def time_call(func, repeat, before=None):
+    """
+    Return per-call wall times of `func` in milliseconds. `before` runs
+    untimed ahead of every call, e.g. to reset a cache.
+    """
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def print_table(title, rows):
+    """Print `(label, timings_ms)` pairs as a median/p95 summary table."""
+    print(f"\n{title}")
+    width = max(len(label) for label, _ in rows)
+    print(f"{'scenario'.ljust(width)}  {'median ms':>10}  {'p95 ms':>10}")
+    for label, timings in rows:
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"{label.ljust(width)}  {statistics.median(ordered):>10.2f}  {p95:>10.2f}"
+        )
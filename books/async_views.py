@@ -0,0 +1,36 @@
+from books.cache import acache_catalog_data, catalog_condition
+from books.filters import filter_books
+from books.models import Book
+from books.serializers import BookSerializer, BookValuesSerializer
+from library_service.async_api import async_api_view
+from library_service.metrics import serializing
+from library_service.pagination import AsyncLimitOffsetPagination
+from rest_framework.exceptions import NotFound
+
+
+@catalog_condition
+@async_api_view()
+@acache_catalog_data
+async def book_list(request):
+    """Async book list with the filters and limit/offset pages of BookViewSet"""
+    queryset = filter_books(Book.objects.all(), request.query_params)
+    if not queryset.ordered:
+        queryset = queryset.order_by("id")
+    paginator = AsyncLimitOffsetPagination()
+    page = await paginator.apaginate_queryset(
+        BookValuesSerializer.values(queryset), request
+    )
+    with serializing():
+        data = BookValuesSerializer(page, many=True).data
+    return paginator.get_paginated_data(data)
+
+
+@catalog_condition
+@async_api_view()
+@acache_catalog_data
+async def book_detail(request, pk):
+    try:
+        book = await Book.objects.aget(pk=pk)
+    except Book.DoesNotExist:
+        raise NotFound()
+    return BookSerializer(book).data
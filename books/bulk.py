@@ -0,0 +1,103 @@
+"""
+Streaming import and export of the book catalog.
+
+Imports read rows lazily and upsert them in fixed-size batches keyed on ISBN,
+so memory use depends on the batch size rather than on the file size.
+Exports iterate the table with a chunked server-side cursor.
+"""
+
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from library_service.bulk import MAX_REPORTED_ERRORS, write_rows
+
+FIELDS = ("isbn", "title", "author", "cover", "inventory", "daily_fee")
+UPDATE_FIELDS = [name for name in FIELDS if name != "isbn"]
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _build_book(row):
+    if isinstance(row, Exception):
+        raise ValidationError(f"Invalid JSON: {row}")
+    if not isinstance(row, dict):
+        raise ValidationError("Each row must be an object.")
+    book = Book(**{name: row.get(name) for name in FIELDS})
+    if not book.isbn:
+        raise ValidationError({"isbn": ["This field is required for import."]})
+    book.clean_fields()
+    return book
+
+
+def _upsert_batch(books, result):
+    # A repeated ISBN inside one batch keeps its last occurrence, matching
+    # what sequential upserts would have produced.
+    by_isbn = {book.isbn: book for book in books}
+    with transaction.atomic():
+        existing = set(
+            Book.objects.filter(isbn__in=by_isbn).values_list("isbn", flat=True)
+        )
+        Book.objects.bulk_create(
+            by_isbn.values(),
+            update_conflicts=True,
+            unique_fields=["isbn"],
+            update_fields=UPDATE_FIELDS,
+        )
+    result.updated += len(existing)
+    result.created += len(by_isbn) - len(existing)
+
+
+def import_books(rows, batch_size=1000):
+    """
+    Upsert books from `(line_number, row)` pairs in batches of `batch_size`.
+    Invalid rows are reported and skipped; every valid batch is committed.
+    """
+    result = ImportResult()
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        books = []
+        for line_number, row in batch:
+            try:
+                books.append(_build_book(row))
+            except ValidationError as exc:
+                result.add_error(
+                    line_number,
+                    exc.message_dict if hasattr(exc, "error_dict") else exc.messages,
+                )
+        if books:
+            _upsert_batch(books, result)
+    if result.created or result.updated:
+        transaction.on_commit(bump_catalog_version)
+    return result
+
+
+def export_books(file_format, queryset=None, chunk_size=2000):
+    """Yield the catalog as CSV or JSON Lines text, one row at a time."""
+    if queryset is None:
+        queryset = Book.objects.order_by("id")
+    rows = queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size)
+    return write_rows(file_format, FIELDS, rows)
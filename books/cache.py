@@ -0,0 +1,94 @@
+import functools
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.views.decorators.http import condition
+from rest_framework import status
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = "books:catalog-version"
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version.
+
+    The version is a microsecond timestamp of the last catalog change, so it
+    doubles as the Last-Modified value of every cached catalog response.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+async def aget_catalog_version():
+    """Async counterpart of `get_catalog_version`."""
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response by moving to a new version."""
+    version = max(time.time_ns() // 1000, get_catalog_version() + 1)
+    cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'W/"{get_catalog_version()}"'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(get_catalog_version() / 1_000_000, tz=timezone.utc)
+
+
+catalog_condition = condition(
+    etag_func=catalog_etag, last_modified_func=catalog_last_modified
+)
+
+
+def catalog_cache_key(version, request):
+    return f"books:{version}:{request.get_host()}{request.get_full_path()}"
+
+
+def cache_catalog_response(view_method):
+    """
+    Cache the serialized data of a successful catalog read under the current
+    catalog version. Reading the version before the database means a change
+    committed mid-request only ever lands in an already stale key.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = catalog_cache_key(get_catalog_version(), request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def acache_catalog_data(view_func):
+    """`cache_catalog_response` for async views returning JSON-ready data."""
+
+    @functools.wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        key = catalog_cache_key(await aget_catalog_version(), request)
+        data = await cache.aget(key)
+        if data is None:
+            data = await view_func(request, *args, **kwargs)
+            await cache.aset(key, data, settings.CATALOG_CACHE_TIMEOUT)
+        return data
+
+    return wrapper
@@ -0,0 +1,32 @@
+from books.search import search_books
+from books.serializers import BookFilterSerializer
+
+
+def filter_books(queryset, query_params):
+    """
+    Applies the validated book list query parameters to `queryset`.
+    Raises a ValidationError for invalid parameters.
+    """
+    # A plain dict: QueryDict input would read a missing boolean as False.
+    params = BookFilterSerializer(data=query_params.dict())
+    params.is_valid(raise_exception=True)
+    filters = params.validated_data
+
+    if "author" in filters:
+        queryset = queryset.filter(author=filters["author"])
+    if "cover" in filters:
+        queryset = queryset.filter(cover=filters["cover"])
+    if filters.get("available") is True:
+        queryset = queryset.filter(inventory__gt=0)
+    elif filters.get("available") is False:
+        queryset = queryset.filter(inventory=0)
+    if "min_daily_fee" in filters:
+        queryset = queryset.filter(daily_fee__gte=filters["min_daily_fee"])
+    if "max_daily_fee" in filters:
+        queryset = queryset.filter(daily_fee__lte=filters["max_daily_fee"])
+    if filters.get("search"):
+        queryset = search_books(queryset, filters["search"])
+    if "ordering" in filters:
+        queryset = queryset.order_by(filters["ordering"], "id")
+
+    return queryset
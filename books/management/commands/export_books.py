@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from books.bulk import export_books
+from library_service.bulk import FORMATS
+
+
+class Command(BaseCommand):
+    help = "Stream the book catalog as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=FORMATS, default="csv", dest="file_format"
+        )
+        parser.add_argument("--output", help="Output file (default: stdout)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = export_books(options["file_format"], chunk_size=options["chunk_size"])
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as output:
+            output.writelines(chunks)
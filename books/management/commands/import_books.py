@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from books.bulk import import_books
+from library_service.bulk import FORMATS, detect_format, open_text, read_rows
+
+
+class Command(BaseCommand):
+    help = "Stream-import books from a CSV or JSON Lines file, upserting on ISBN."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .jsonl file")
+        parser.add_argument("--format", choices=FORMATS, dest="file_format")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or detect_format(path)
+        try:
+            binary_file = open(path, "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with binary_file, open_text(binary_file) as stream:
+            result = import_books(
+                read_rows(stream, file_format), batch_size=options["batch_size"]
+            )
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, updated {result.updated}, "
+                f"skipped {result.error_count} invalid rows."
+            )
+        )
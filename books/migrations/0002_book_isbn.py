@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="isbn",
+            field=models.CharField(blank=True, max_length=17, null=True, unique=True),
+        ),
+    ]
@@ -11,6 +11,61 @@ class Book(models.Model):
     cover = models.CharField(max_length=4, choices=CoverType.choices)
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    isbn = models.CharField(max_length=17, unique=True, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["author"], name="book_author_idx"),
+            models.Index(fields=["title"], name="book_title_idx"),
+            models.Index(fields=["daily_fee"], name="book_daily_fee_idx"),
+            models.Index(fields=["cover", "daily_fee"], name="book_cover_fee_idx"),
+            models.Index(
+                fields=["id"],
+                name="book_in_stock_idx",
+                condition=models.Q(inventory__gt=0),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
+
+    def save(self, *args, **kwargs):
+        # Blank ISBNs are stored as NULL so they never collide on uniqueness.
+        self.isbn = self.isbn or None
+        super().save(*args, **kwargs)
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden FTS5 column named after its table, used as a MATCH target."""
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class BookSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index over book titles and authors.
+    The table and the triggers that keep it in sync live in migration 0003.
+    """
+
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_index",
+    )
+    document = SearchDocumentField(db_column="books_book_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "books_book_fts"
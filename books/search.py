@@ -0,0 +1,72 @@
+"""
+Full-text search over book titles and authors.
+
+SQLite uses an FTS5 external-content table kept in sync by triggers and
+exposed to the ORM as `BookSearchIndex`; PostgreSQL uses a GIN index over a
+`simple` tsvector. Both match each search term as a prefix and order results
+by relevance. Other backends fall back to `icontains` scans.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import F, Q
+
+SEARCH_CONFIG = "simple"
+MAX_TERMS = 10
+
+
+def search_terms(query):
+    """Splits a user query into word tokens, dropping FTS operators"""
+    return re.findall(r"\w+", query)[:MAX_TERMS]
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("title", "author", config=SEARCH_CONFIG)
+
+
+def _search_sqlite(queryset, terms):
+    match = " ".join(f'"{term}"*' for term in terms)
+    # FTS5 rank is bm25(): lower is more relevant.
+    return (
+        queryset.filter(search_index__document__match=match)
+        .annotate(search_rank=F("search_index__rank"))
+        .order_by("search_rank", "id")
+    )
+
+
+def _search_postgresql(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    vector = search_vector()
+    query = SearchQuery(
+        " & ".join(f"'{term}':*" for term in terms),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+    return (
+        queryset.annotate(search_document=vector)
+        .filter(search_document=query)
+        .annotate(search_rank=SearchRank(vector, query))
+        .order_by("-search_rank", "id")
+    )
+
+
+def _search_fallback(queryset, terms):
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(author__icontains=term))
+    return queryset.order_by("id")
+
+
+def search_books(queryset, query):
+    """Filters `queryset` to books matching `query`, best matches first"""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == "sqlite":
+        return _search_sqlite(queryset, terms)
+    if connection.vendor == "postgresql":
+        return _search_postgresql(queryset, terms)
+    return _search_fallback(queryset, terms)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 
 from books.models import Book
+from library_service.bulk import FORMATS
+from library_service.serializers import ValuesSerializer, decimal_string
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -8,3 +10,49 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = "__all__"
         ref_name = "book"
+
+
+class BookValuesSerializer(ValuesSerializer):
+    """`BookSerializer` output for list pages, built from `.values()` rows"""
+
+    fields = ("id", "title", "author", "cover", "inventory", "daily_fee", "isbn")
+    converters = {"daily_fee": decimal_string(2)}
+
+
+class BookFilterSerializer(serializers.Serializer):
+    """Validates the query parameters of the book list"""
+
+    ORDERING_CHOICES = ("title", "-title", "daily_fee", "-daily_fee")
+
+    search = serializers.CharField(required=False, max_length=200)
+    author = serializers.CharField(required=False, max_length=244)
+    cover = serializers.ChoiceField(choices=Book.CoverType.choices, required=False)
+    available = serializers.BooleanField(required=False)
+    min_daily_fee = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    max_daily_fee = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    ordering = serializers.ChoiceField(choices=ORDERING_CHOICES, required=False)
+
+    def validate(self, data):
+        min_fee = data.get("min_daily_fee")
+        max_fee = data.get("max_daily_fee")
+        if min_fee is not None and max_fee is not None and min_fee > max_fee:
+            raise serializers.ValidationError(
+                "min_daily_fee must not be greater than max_daily_fee."
+            )
+        return data
+
+
+class BookImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=FORMATS, required=False)
+
+
+class BookImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    error_count = serializers.IntegerField()
+    errors = serializers.ListField(child=serializers.DictField())
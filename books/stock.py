@@ -0,0 +1,14 @@
+from django.db import models
+from django.db.models import Case, F, When
+
+
+def inventory_delta(deltas):
+    """Builds a CASE expression that shifts each book's inventory by its delta"""
+    return Case(
+        *(
+            When(pk=book_id, then=F("inventory") + delta)
+            for book_id, delta in deltas.items()
+        ),
+        default=F("inventory"),
+        output_field=models.PositiveIntegerField(),
+    )
@@ -1,11 +1,23 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import skipUnless
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 
 from books.models import Book
+from books.serializers import BookSerializer, BookValuesSerializer
 from django.urls import reverse
 
 
@@ -141,3 +153,503 @@ class BookViewTest(APITestCase):
             reverse("books:book-detail", kwargs={"pk": self.book.id})
         )
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookCursorPaginationTest(APITestCase):
+    BOOK_URL = reverse("books:book-list")
+
+    def setUp(self):
+        cache.clear()
+        Book.objects.bulk_create(
+            Book(
+                title=f"Book {i}",
+                author="John Doe",
+                cover=Book.CoverType.SOFT,
+                inventory=1,
+                daily_fee="1.00",
+            )
+            for i in range(30)
+        )
+
+    def test_limit_offset_is_default(self):
+        response = self.client.get(self.BOOK_URL)
+        self.assertEqual(response.data["count"], 30)
+
+    def test_cursor_mode_skips_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.BOOK_URL, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            len(response.data["results"]), settings.REST_FRAMEWORK["PAGE_SIZE"]
+        )
+        self.assertIsNone(response.data["previous"])
+
+    def test_cursor_mode_walks_all_pages_in_id_order(self):
+        ids = []
+        url = f"{self.BOOK_URL}?pagination=cursor&limit=7"
+        while url:
+            response = self.client.get(url)
+            ids.extend(book["id"] for book in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(
+            ids, list(Book.objects.order_by("id").values_list("id", flat=True))
+        )
+
+
+class BookValuesSerializerTest(APITestCase):
+    BOOK_URL = reverse("books:book-list")
+
+    def setUp(self):
+        cache.clear()
+        for title, fee, isbn in [
+            ("Plain", "1.00", None),
+            ('Quotes "and" \\ slashes', "0.5", "978-3-16-148410-0"),
+            ("Café \u2028 line \u2029 para", "19.99", "0-306-40615-2"),
+            ("Emoji 📚 tab\t", 100, ""),
+        ]:
+            Book.objects.create(
+                title=title,
+                author="Zoë",
+                cover=Book.CoverType.SOFT,
+                inventory=2,
+                daily_fee=fee,
+                isbn=isbn,
+            )
+
+    def test_rows_render_to_model_serializer_bytes(self):
+        queryset = Book.objects.order_by("id")
+        expected = JSONRenderer().render(BookSerializer(queryset, many=True).data)
+        rows = BookValuesSerializer.values(queryset)
+        self.assertEqual(
+            JSONRenderer().render(BookValuesSerializer(rows, many=True).data),
+            expected,
+        )
+
+    def test_list_response_bytes_unchanged(self):
+        for params in ({}, {"pagination": "cursor"}, {"limit": 2, "offset": 1}):
+            with self.subTest(params=params):
+                response = self.client.get(self.BOOK_URL, params)
+                offset = params.get("offset", 0)
+                page = Book.objects.order_by("id")[
+                    offset : offset + len(response.data["results"])
+                ]
+                expected = dict(
+                    response.data, results=BookSerializer(page, many=True).data
+                )
+                self.assertEqual(response.content, JSONRenderer().render(expected))
+
+
+class BookCatalogCacheTest(APITestCase):
+    BOOK_URL = reverse("books:book-list")
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_fee="19.99",
+        )
+        self.detail_url = reverse("books:book-detail", kwargs={"pk": self.book.id})
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for url in (self.BOOK_URL, self.detail_url):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_book_update_invalidates_cache(self):
+        self.client.get(self.detail_url)
+        self.client.force_authenticate(user=self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.detail_url, {"title": "Renamed Book"})
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data["title"], "Renamed Book")
+
+    def test_checkout_invalidates_cache(self):
+        self.client.get(self.detail_url)
+        self.client.force_authenticate(user=self.admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("borrowings:borrowing-list"),
+                {"expected_return_date": "2024-02-10", "book": self.book.id},
+            )
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data["inventory"], 4)
+
+    def test_conditional_requests_return_not_modified(self):
+        response = self.client.get(self.BOOK_URL)
+        etag = response["ETag"]
+        last_modified = response["Last-Modified"]
+
+        response = self.client.get(self.BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.BOOK_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_when_catalog_changes(self):
+        etag = self.client.get(self.BOOK_URL)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.delete()
+
+        response = self.client.get(self.BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["count"], 0)
+
+
+class BookBulkTransferTest(APITestCase):
+    IMPORT_URL = reverse("books:book-import")
+    EXPORT_URL = reverse("books:book-export")
+    CSV = (
+        "isbn,title,author,cover,inventory,daily_fee\n"
+        "9780000000001,First Book,John Doe,Hard,3,1.50\n"
+        "9780000000002,Second Book,Jane Doe,Soft,0,0.99\n"
+        "9780000000003,Broken Book,Jane Doe,Leather,1,0.99\n"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        Book.objects.create(
+            title="Old Title",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=1,
+            daily_fee="1.00",
+            isbn="9780000000001",
+        )
+
+    def write_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_import_command_upserts_on_isbn(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "import_books",
+            self.write_file("books.csv", self.CSV),
+            batch_size=1,
+            stdout=out,
+            stderr=err,
+        )
+
+        self.assertIn("Created 1, updated 1, skipped 1", out.getvalue())
+        self.assertIn("line 4", err.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(Book.objects.get(isbn="9780000000001").title, "First Book")
+
+    def test_api_import_jsonl(self):
+        lines = [
+            {
+                "isbn": "9780000000009",
+                "title": "Json Book",
+                "author": "Jane Doe",
+                "cover": "Soft",
+                "inventory": 4,
+                "daily_fee": "2.00",
+            },
+            "not an object",
+        ]
+        upload = io.BytesIO(
+            ("\n".join(json.dumps(line) for line in lines) + "\n{broken").encode()
+        )
+        upload.name = "books.jsonl"
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.post(
+            self.IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["error_count"], 2)
+        self.assertEqual(Book.objects.get(isbn="9780000000009").inventory, 4)
+
+    def test_import_and_export_require_admin(self):
+        self.client.force_authenticate(user=self.user)
+        upload = io.BytesIO(self.CSV.encode())
+        upload.name = "books.csv"
+        response = self.client.post(
+            self.IMPORT_URL, {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(self.EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_api_export_streams_csv_and_jsonl(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        response = self.client.get(self.EXPORT_URL)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(
+            csv.reader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        self.assertEqual(
+            rows[0], ["isbn", "title", "author", "cover", "inventory", "daily_fee"]
+        )
+        self.assertEqual(
+            rows[1], ["9780000000001", "Old Title", "John Doe", "Hard", "1", "1.00"]
+        )
+
+        response = self.client.get(self.EXPORT_URL, {"file_format": "jsonl"})
+        record = json.loads(b"".join(response.streaming_content).decode())
+        self.assertEqual(record["daily_fee"], "1.00")
+        self.assertEqual(record["title"], "Old Title")
+
+        response = self.client.get(self.EXPORT_URL, {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command_round_trips_through_import(self):
+        path = self.write_file("export.jsonl", "")
+        call_command("export_books", file_format="jsonl", output=path)
+        Book.objects.all().delete()
+
+        call_command("import_books", path, stdout=io.StringIO())
+
+        self.assertEqual(Book.objects.get(isbn="9780000000001").title, "Old Title")
+
+
+class BookSearchTest(APITestCase):
+    BOOK_URL = reverse("books:book-list")
+
+    def setUp(self):
+        cache.clear()
+        self.dune = self.create_book("Dune", "Frank Herbert")
+        self.messiah = self.create_book("Dune Messiah", "Frank Herbert")
+        self.foundation = self.create_book("Foundation", "Isaac Asimov")
+
+    def create_book(self, title, author):
+        return Book.objects.create(
+            title=title,
+            author=author,
+            cover=Book.CoverType.SOFT,
+            inventory=1,
+            daily_fee="1.00",
+        )
+
+    def search(self, query):
+        response = self.client.get(self.BOOK_URL, {"search": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_search_matches_title_and_author_prefixes(self):
+        self.assertCountEqual(self.search("herb"), [self.dune.id, self.messiah.id])
+        self.assertEqual(self.search("asim found"), [self.foundation.id])
+        self.assertEqual(self.search("dune asimov"), [])
+
+    def test_search_orders_by_relevance(self):
+        dune_dune = self.create_book("Dune", "Dune Fan")
+        self.assertEqual(self.search("dune")[0], dune_dune.id)
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(self.search('"Dune" AND NOT *'), [])
+        self.assertEqual(self.search("!!!"), [])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        self.foundation.title = "Second Foundation"
+        self.foundation.save()
+        self.messiah.delete()
+        Book.objects.filter(pk=self.dune.pk).update(inventory=5)
+
+        self.assertEqual(self.search("second"), [self.foundation.id])
+        self.assertEqual(self.search("messiah"), [])
+        self.assertEqual(self.search("dune"), [self.dune.id])
+
+    def test_bulk_created_books_are_searchable(self):
+        Book.objects.bulk_create(
+            [
+                Book(
+                    title="Hyperion",
+                    author="Dan Simmons",
+                    cover=Book.CoverType.HARD,
+                    inventory=1,
+                    daily_fee="1.00",
+                )
+            ]
+        )
+        self.assertEqual(len(self.search("hyper")), 1)
+
+
+class BookFilterTest(APITestCase):
+    BOOK_URL = reverse("books:book-list")
+
+    def setUp(self):
+        cache.clear()
+        self.cheap = self.create_book("Alpha", "John Doe", "Soft", 0, "0.50")
+        self.middle = self.create_book("Gamma", "John Doe", "Hard", 2, "1.50")
+        self.pricey = self.create_book("Beta", "Jane Roe", "Hard", 1, "9.99")
+
+    def create_book(self, title, author, cover, inventory, daily_fee):
+        return Book.objects.create(
+            title=title,
+            author=author,
+            cover=cover,
+            inventory=inventory,
+            daily_fee=daily_fee,
+        )
+
+    def list_ids(self, params):
+        response = self.client.get(self.BOOK_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_filters(self):
+        self.assertCountEqual(
+            self.list_ids({"author": "John Doe"}), [self.cheap.id, self.middle.id]
+        )
+        self.assertCountEqual(
+            self.list_ids({"cover": "Hard"}), [self.middle.id, self.pricey.id]
+        )
+        self.assertCountEqual(
+            self.list_ids({"available": "true"}), [self.middle.id, self.pricey.id]
+        )
+        self.assertEqual(self.list_ids({"available": "false"}), [self.cheap.id])
+        self.assertEqual(
+            self.list_ids({"min_daily_fee": "1.00", "max_daily_fee": "2.00"}),
+            [self.middle.id],
+        )
+        self.assertEqual(
+            self.list_ids({"author": "John Doe", "cover": "Hard", "available": "1"}),
+            [self.middle.id],
+        )
+
+    def test_missing_available_does_not_filter(self):
+        self.assertEqual(len(self.list_ids({})), 3)
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.list_ids({"ordering": "title"}),
+            [self.cheap.id, self.pricey.id, self.middle.id],
+        )
+        self.assertEqual(
+            self.list_ids({"ordering": "-daily_fee"}),
+            [self.pricey.id, self.middle.id, self.cheap.id],
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in (
+            {"cover": "Leather"},
+            {"available": "maybe"},
+            {"min_daily_fee": "cheap"},
+            {"min_daily_fee": "5", "max_daily_fee": "1"},
+            {"ordering": "inventory"},
+        ):
+            response = self.client.get(self.BOOK_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite-specific")
+class BookIndexPlanTest(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_author_filter_uses_index(self):
+        self.assertUsesIndex(Book.objects.filter(author="John Doe"), "book_author_idx")
+
+    def test_fee_range_uses_index(self):
+        self.assertUsesIndex(
+            Book.objects.filter(daily_fee__gte=1, daily_fee__lte=2),
+            "book_daily_fee_idx",
+        )
+
+    def test_cover_and_fee_ordering_uses_composite_index(self):
+        self.assertUsesIndex(
+            Book.objects.filter(cover="Hard").order_by("daily_fee"),
+            "book_cover_fee_idx",
+        )
+
+    def test_in_stock_listing_uses_partial_index(self):
+        self.assertUsesIndex(
+            Book.objects.filter(inventory__gt=0).order_by("id"), "book_in_stock_idx"
+        )
+
+    def test_title_ordering_uses_index(self):
+        self.assertUsesIndex(Book.objects.order_by("title")[:24], "book_title_idx")
+
+
+class AsyncBookViewTest(TestCase):
+    LIST_URL = reverse("books:book-list")
+    ASYNC_LIST_URL = reverse("books:book-list-async")
+
+    def setUp(self):
+        cache.clear()
+        for i, (author, cover) in enumerate(
+            [("Jane Doe", "Soft"), ("John Doe", "Hard"), ("Jane Doe", "Hard")]
+        ):
+            Book.objects.create(
+                title=f"Dragon Tale {i}",
+                author=author,
+                cover=cover,
+                inventory=i,
+                daily_fee=f"{i + 1}.50",
+            )
+
+    async def test_list_matches_sync_list(self):
+        for params in (
+            {},
+            {"limit": 2, "offset": 1},
+            {"author": "Jane Doe", "available": "true"},
+            {"search": "drag", "ordering": "-daily_fee"},
+        ):
+            with self.subTest(params=params):
+                expected = (await self.async_client.get(self.LIST_URL, params)).json()
+                response = await self.async_client.get(self.ASYNC_LIST_URL, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                data = response.json()
+                self.assertEqual(data["results"], expected["results"])
+                self.assertEqual(data["count"], expected["count"])
+                self.assertEqual(data["next"] is None, expected["next"] is None)
+
+    async def test_list_rejects_invalid_filters(self):
+        response = await self.async_client.get(
+            self.ASYNC_LIST_URL, {"min_daily_fee": "3", "max_daily_fee": "1"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.json())
+
+    async def test_detail(self):
+        book = await Book.objects.afirst()
+        response = await self.async_client.get(
+            reverse("books:book-detail-async", kwargs={"pk": book.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], book.title)
+
+        response = await self.async_client.get(
+            reverse("books:book-detail-async", kwargs={"pk": 9999})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Not found."})
+
+    async def test_list_is_cached_and_conditional(self):
+        first = await self.async_client.get(self.ASYNC_LIST_URL)
+        await Book.objects.filter(author="Jane Doe").aupdate(title="Changed")
+        cached = await self.async_client.get(self.ASYNC_LIST_URL)
+        self.assertEqual(cached.json(), first.json())
+
+        response = await self.async_client.get(
+            self.ASYNC_LIST_URL, headers={"if-none-match": first["ETag"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_only_safe_methods(self):
+        response = await self.async_client.post(self.ASYNC_LIST_URL, {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
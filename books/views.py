@@ -1,11 +1,152 @@
-from rest_framework import viewsets
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 
+from books.bulk import export_books, import_books
+from books.cache import cache_catalog_response, catalog_condition
+from books.filters import filter_books
 from books.models import Book
 from books.permissions import IsAdminUserOrReadOnly
-from books.serializers import BookSerializer
+from books.serializers import (
+    BookFilterSerializer,
+    BookImportResultSerializer,
+    BookImportSerializer,
+    BookSerializer,
+    BookValuesSerializer,
+)
+from library_service.bulk import (
+    CONTENT_TYPES,
+    FORMATS,
+    detect_format,
+    open_text,
+    read_rows,
+)
+from library_service.db import ReplicaReadMixin
+from library_service.serializers import ValuesListModelMixin
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ReplicaReadMixin, ValuesListModelMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    values_serializer_class = BookValuesSerializer
     permission_classes = [IsAdminUserOrReadOnly]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != "list":
+            return queryset
+        return filter_books(queryset, self.request.query_params)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "search",
+                type={"type": "string"},
+                description="Full-text search on title and author, matching "
+                "word prefixes and ordered by relevance",
+            ),
+            OpenApiParameter(
+                "author",
+                type={"type": "string"},
+                description="Filter by exact author name",
+            ),
+            OpenApiParameter(
+                "cover",
+                type={"type": "string", "enum": Book.CoverType.values},
+                description="Filter by cover type",
+            ),
+            OpenApiParameter(
+                "available",
+                type={"type": "boolean"},
+                description="Filter by whether copies are in stock",
+            ),
+            OpenApiParameter(
+                "min_daily_fee",
+                type={"type": "number"},
+                description="Minimum daily fee, inclusive",
+            ),
+            OpenApiParameter(
+                "max_daily_fee",
+                type={"type": "number"},
+                description="Maximum daily fee, inclusive",
+            ),
+            OpenApiParameter(
+                "ordering",
+                type={
+                    "type": "string",
+                    "enum": BookFilterSerializer.ORDERING_CHOICES,
+                },
+                description="Sort order for limit/offset pages; overrides "
+                "search relevance. Cursor pages are always ordered by id",
+            ),
+        ]
+    )
+    @method_decorator(catalog_condition)
+    @cache_catalog_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(catalog_condition)
+    @cache_catalog_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(
+        request={"multipart/form-data": BookImportSerializer},
+        responses=BookImportResultSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def import_catalog(self, request):
+        """Upsert books on ISBN from an uploaded CSV or JSON Lines file"""
+        serializer = BookImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        file_format = serializer.validated_data.get("file_format") or detect_format(
+            upload.name
+        )
+        with open_text(upload.file) as stream:
+            result = import_books(read_rows(stream, file_format))
+        return Response(result.as_dict())
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "file_format",
+                type={"type": "string", "enum": FORMATS},
+                description="Export format, csv by default",
+            ),
+        ],
+        responses={(status.HTTP_200_OK, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="export",
+        url_name="export",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def export_catalog(self, request):
+        """Stream the whole catalog without loading it into memory"""
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response(
+                {"file_format": [f"Choose one of: {', '.join(FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        response = StreamingHttpResponse(
+            export_books(file_format), content_type=CONTENT_TYPES[file_format]
+        )
+        response["Content-Disposition"] = f'attachment; filename="books.{file_format}"'
+        return response
@@ -1,3 +1,39 @@
 from django.contrib import admin
 
-# Register your models here.
+from borrowings.models import Borrowing
+
+
+@admin.register(Borrowing)
+class BorrowingAdmin(admin.ModelAdmin):
+    """
+    Read-only: checkouts and returns go through the API, which keeps the
+    book inventory, the active borrowing limit, billing and the rollups in
+    step with each borrowing.
+    """
+
+    list_display = (
+        "id",
+        "book",
+        "user",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+    list_filter = ("borrow_date", "actual_return_date")
+    list_select_related = ("book", "user")
+    readonly_fields = (
+        "book",
+        "user",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
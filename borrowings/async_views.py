@@ -0,0 +1,23 @@
+from borrowings.filters import filter_borrowings
+from borrowings.models import Borrowing
+from borrowings.serializers import BorrowingValuesSerializer
+from library_service.async_api import async_api_view
+from library_service.metrics import serializing
+from library_service.pagination import AsyncLimitOffsetPagination
+
+
+@async_api_view(login_required=True)
+async def borrowing_list(request):
+    """Async borrowing list with the filters and scoping of BorrowingListView"""
+    queryset = filter_borrowings(
+        Borrowing.objects.order_by("id"),
+        request.user,
+        request.query_params,
+    )
+    paginator = AsyncLimitOffsetPagination()
+    page = await paginator.apaginate_queryset(
+        BorrowingValuesSerializer.values(queryset), request
+    )
+    with serializing():
+        data = BorrowingValuesSerializer(page, many=True).data
+    return paginator.get_paginated_data(data)
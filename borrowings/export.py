@@ -0,0 +1,32 @@
+"""
+Streaming export of borrowing history.
+
+Rows are read as tuples through a chunked server-side cursor, with the book
+and patron columns joined in the same query, and written out one at a time,
+so memory stays flat regardless of how many borrowings are exported.
+"""
+
+from library_service.bulk import write_rows
+
+COLUMNS = (
+    ("id", "id"),
+    ("borrow_date", "borrow_date"),
+    ("expected_return_date", "expected_return_date"),
+    ("actual_return_date", "actual_return_date"),
+    ("book_id", "book_id"),
+    ("book_title", "book__title"),
+    ("book_author", "book__author"),
+    ("user_id", "user_id"),
+    ("user_email", "user__email"),
+)
+FIELDS = tuple(name for name, _ in COLUMNS)
+
+
+def export_borrowings(file_format, queryset, chunk_size=2000):
+    """Yield the borrowings in `queryset` as CSV or JSON Lines, oldest first."""
+    rows = (
+        queryset.order_by("id")
+        .values_list(*(lookup for _, lookup in COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+    return write_rows(file_format, FIELDS, rows)
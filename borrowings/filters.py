@@ -0,0 +1,25 @@
+def _params_to_ints(qs):
+    """Converts a list of string IDs to a list of integers"""
+    return [int(str_id) for str_id in qs.split(",")]
+
+
+def filter_borrowings(queryset, user, query_params):
+    """
+    Scopes `queryset` to `user` unless they are staff and applies the
+    `user_id` and `is_active` list filters.
+    """
+    is_active = query_params.get("is_active")
+    user_id = query_params.get("user_id")
+
+    if not user.is_staff:
+        queryset = queryset.filter(user_id=user.id)
+
+    if user_id:
+        users_ids = _params_to_ints(user_id)
+        queryset = queryset.filter(user_id__in=users_ids)
+
+    if is_active:
+        is_active = is_active.lower() == "true"
+        queryset = queryset.filter(actual_return_date__isnull=is_active)
+
+    return queryset
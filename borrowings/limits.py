@@ -0,0 +1,100 @@
+"""
+Per-user limit on active borrowings.
+
+`User.active_borrowings` is a denormalized count of the user's unreturned
+borrowings. It is only ever changed with conditional F-expression updates
+inside the checkout and return transactions, so the limit check costs one
+row update instead of a scan of the user's borrowings. The counter can
+drift when borrowings are deleted or edited outside the API;
+`reconcile_active_borrowings` recomputes it.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from borrowings.models import Borrowing
+
+
+def limit_message(limit):
+    return f"You cannot have more than {limit} active borrowings."
+
+
+def reserve_borrowings(user_id, count=1):
+    """
+    Counts `count` new borrowings against the user's limit, raising a
+    ValidationError when they would exceed `MAX_ACTIVE_BORROWINGS`.
+    Must run in the transaction that creates the borrowings.
+    """
+    limit = settings.MAX_ACTIVE_BORROWINGS
+    reserved = (
+        get_user_model()
+        .objects.filter(pk=user_id, active_borrowings__lte=limit - count)
+        .update(active_borrowings=F("active_borrowings") + count)
+    )
+    if not reserved:
+        raise serializers.ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: [limit_message(limit)]}
+        )
+
+
+def release_borrowings(counts):
+    """Takes returned borrowings off the counters of `{user_id: count}`"""
+    get_user_model().objects.filter(pk__in=counts).update(
+        active_borrowings=Greatest(
+            Case(
+                *(
+                    When(pk=user_id, then=F("active_borrowings") - count)
+                    for user_id, count in counts.items()
+                ),
+                default=F("active_borrowings"),
+                output_field=models.IntegerField(),
+            ),
+            Value(0),
+            output_field=models.PositiveIntegerField(),
+        )
+    )
+
+
+def reconcile_active_borrowings(chunk_size=1000):
+    """
+    Recomputes the counters in primary key ranges of `chunk_size` users,
+    each in its own short transaction. Returns how many were corrected.
+    """
+    User = get_user_model()
+    actual = Coalesce(
+        Subquery(
+            Borrowing.objects.active()
+            .filter(user=OuterRef("pk"))
+            .order_by()
+            .values("user")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+    corrected = 0
+    last_id = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return corrected
+        last_id = user_ids[-1]
+        with transaction.atomic():
+            # Locking the rows waits out in-flight checkouts and returns,
+            # whose borrowings are then visible to the recount.
+            chunk = User.objects.filter(pk__in=user_ids)
+            list(chunk.select_for_update().values_list("pk"))
+            corrected += (
+                chunk.annotate(actual=actual)
+                .exclude(active_borrowings=F("actual"))
+                .update(active_borrowings=actual)
+            )
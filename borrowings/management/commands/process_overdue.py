@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from borrowings.models import Borrowing
+
+
+class Command(BaseCommand):
+    help = (
+        "Report active borrowings past their expected return date, "
+        "streaming them in chunks with a server-side cursor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            help="Date to check against in YYYY-MM-DD (default: today)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        as_of = options["as_of"] or timezone.now().date()
+        overdue = (
+            Borrowing.objects.overdue(as_of)
+            .order_by("expected_return_date", "id")
+            .values_list(
+                "id",
+                "expected_return_date",
+                "user__email",
+                "book__title",
+            )
+            .iterator(chunk_size=options["chunk_size"])
+        )
+
+        count = 0
+        for borrowing_id, expected_return_date, email, title in overdue:
+            count += 1
+            days = (as_of - expected_return_date).days
+            self.stdout.write(
+                f"#{borrowing_id} {title!r} borrowed by {email} "
+                f"is {days} day(s) overdue"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} overdue borrowing(s) as of {as_of}.")
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.limits import reconcile_active_borrowings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's active borrowing counter from the "
+        "borrowings table, one chunk of users per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        corrected = reconcile_active_borrowings(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Corrected {corrected} active borrowing counter(s).")
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:27
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_active_borrowings(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    active = (
+        Borrowing.objects.filter(user=OuterRef("pk"), actual_return_date__isnull=True)
+        .order_by()
+        .values("user")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    User.objects.update(active_borrowings=Coalesce(Subquery(active), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0005_borrowing_indexes"),
+        ("users", "0003_user_active_borrowings"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_active_borrowings, migrations.RunPython.noop),
+    ]
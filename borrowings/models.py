@@ -4,6 +4,15 @@ from django.db import models
 from books.models import Book
 
 
+class BorrowingQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(actual_return_date__isnull=True)
+
+    def overdue(self, as_of):
+        """Active borrowings whose expected return date is before `as_of`"""
+        return self.active().filter(expected_return_date__lt=as_of)
+
+
 class Borrowing(models.Model):
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField()
@@ -11,6 +20,26 @@ class Borrowing(models.Model):
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
 
+    objects = BorrowingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "actual_return_date"],
+                name="borrowing_user_returned_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                name="borrowing_active_idx",
+                condition=models.Q(actual_return_date__isnull=True),
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                name="borrowing_overdue_idx",
+                condition=models.Q(actual_return_date__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.borrow_date} - {self.user}"
 
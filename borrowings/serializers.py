@@ -1,7 +1,14 @@
+from collections import Counter
+
+from django.db.models import Count, Q
 from rest_framework import serializers
 
 from books.models import Book
 from borrowings.models import Borrowing
+from holds.models import Hold
+from library_service.serializers import ValuesSerializer, iso_date
+
+OUT_OF_STOCK_MESSAGE = "Unfortunately, this book is out of stock."
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -29,16 +36,102 @@ class BorrowingSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         book = data["book"]
-        if book and book.inventory == 0:
-            raise serializers.ValidationError(
-                "Unfortunately, this book is out of stock."
-            )
+        if book and book.inventory == 0 and not self.holds_copy(book):
+            raise serializers.ValidationError(OUT_OF_STOCK_MESSAGE)
         return data
 
+    def holds_copy(self, book):
+        """Whether a copy of `book` is set aside for the requesting patron"""
+        request = self.context.get("request")
+        return (
+            request is not None
+            and Hold.objects.ready().filter(user_id=request.user.id, book=book).exists()
+        )
+
 
 class BorrowingListSerializer(BorrowingSerializer):
     actual_return_date = serializers.DateField(read_only=True)
 
 
+class BorrowingValuesSerializer(ValuesSerializer):
+    """`BorrowingListSerializer` output built from `.values()` rows"""
+
+    fields = (
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book",
+        "is_active",
+    )
+    converters = {
+        "borrow_date": iso_date,
+        "expected_return_date": iso_date,
+        "actual_return_date": iso_date,
+    }
+    computed = {"is_active": lambda row: row["actual_return_date"] is None}
+
+
 class BorrowingDetailSerializer(BorrowingSerializer):
     book = BookSerializer(read_only=True)
+
+
+class BulkCheckoutSerializer(serializers.Serializer):
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100,
+    )
+    expected_return_date = serializers.DateField()
+
+    def validate_books(self, book_ids):
+        """
+        Checks stock for every requested copy with a single query, counting
+        the copies set aside for the patron's ready holds. Sets `held_books`
+        to the ids of the books that have one.
+        """
+        requested = Counter(book_ids)
+        user_id = self.context["request"].user.id
+        stock = {
+            book_id: (inventory, held)
+            for book_id, inventory, held in Book.objects.filter(pk__in=requested)
+            .annotate(
+                held=Count(
+                    "holds",
+                    filter=Q(
+                        holds__status=Hold.Status.READY,
+                        holds__user_id=user_id,
+                    ),
+                )
+            )
+            .values_list("id", "inventory", "held")
+        }
+        missing = sorted(set(requested) - set(stock))
+        if missing:
+            raise serializers.ValidationError(f"Books with ids {missing} do not exist.")
+        out_of_stock = sorted(
+            book_id
+            for book_id, count in requested.items()
+            if sum(stock[book_id]) < count
+        )
+        if out_of_stock:
+            raise serializers.ValidationError(
+                f"{OUT_OF_STOCK_MESSAGE} Book ids: {out_of_stock}."
+            )
+        self.held_books = {book_id for book_id, (_, held) in stock.items() if held}
+        return book_ids
+
+
+class BulkReturnSerializer(serializers.Serializer):
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
+class BulkReturnResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=["returned", "already_returned", "not_found"]
+    )
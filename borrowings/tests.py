@@ -1,14 +1,26 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.urls import reverse
 from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework import status
 
 from books.models import Book
 from borrowings.models import Borrowing
-from borrowings.serializers import BorrowingListSerializer
+from borrowings.serializers import BorrowingListSerializer, BorrowingValuesSerializer
+from users.authentication import user_cache
+from users.serializers import ClaimsTokenObtainPairSerializer
 
 
 class BorrowingModelTest(TestCase):
@@ -48,6 +60,41 @@ class BorrowingModelTest(TestCase):
         self.assertEqual(saved_borrowing.user, self.user)
 
 
+class BorrowingAdminTests(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="adminpassword"
+        )
+        self.client.force_login(admin_user)
+        book = Book.objects.create(
+            title="Book", author="Author", cover="Soft", inventory=1, daily_fee="1"
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=timezone.now().date(), book=book, user=admin_user
+        )
+
+    def test_borrowings_are_read_only(self):
+        change_url = reverse(
+            "admin:borrowings_borrowing_change", args=[self.borrowing.pk]
+        )
+        self.assertEqual(self.client.get(change_url).status_code, 200)
+        self.assertEqual(
+            self.client.post(
+                change_url, {"actual_return_date": "2024-01-01"}
+            ).status_code,
+            403,
+        )
+        self.assertEqual(
+            self.client.get(reverse("admin:borrowings_borrowing_add")).status_code, 403
+        )
+        delete_url = reverse(
+            "admin:borrowings_borrowing_delete", args=[self.borrowing.pk]
+        )
+        self.assertEqual(self.client.post(delete_url, {"post": "yes"}).status_code, 403)
+        self.borrowing.refresh_from_db()
+        self.assertIsNone(self.borrowing.actual_return_date)
+
+
 class BorrowingViewTests(TestCase):
     BORROWING_URL = reverse("borrowings:borrowing-list")
 
@@ -182,3 +229,787 @@ class BorrowingViewTests(TestCase):
         self.borrowing.refresh_from_db()
         self.assertNotEquals(self.borrowing.actual_return_date, None)
         self.assertEqual(self.borrowing.book.inventory, 2)
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    THREADS = 10
+    STOCK = 4
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=self.STOCK,
+            daily_fee="1.50",
+        )
+        self.users = [
+            get_user_model().objects.create_user(email=f"patron{i}@example.com")
+            for i in range(self.THREADS)
+        ]
+
+    def _checkout(self, user, barrier, results, books=None):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            if books is None:
+                response = client.post(
+                    reverse("borrowings:borrowing-list"),
+                    {"expected_return_date": "2024-02-10", "book": self.book.id},
+                )
+            else:
+                response = client.post(
+                    reverse("borrowings:borrowing-bulk-checkout"),
+                    {"expected_return_date": "2024-02-10", "books": books},
+                    format="json",
+                )
+            results.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_parallel_checkouts_never_oversell(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        threads = [
+            threading.Thread(target=self._checkout, args=(user, barrier, results))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+        created = results.count(status.HTTP_201_CREATED)
+        self.assertEqual(len(results), self.THREADS)
+        self.assertEqual(created, self.STOCK)
+        self.assertEqual(
+            results.count(status.HTTP_400_BAD_REQUEST), self.THREADS - self.STOCK
+        )
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=self.book).count(), created)
+
+    def test_parallel_bulk_checkouts_never_oversell(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        books = [self.book.id, self.book.id]
+        threads = [
+            threading.Thread(
+                target=self._checkout, args=(user, barrier, results, books)
+            )
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+        created = results.count(status.HTTP_201_CREATED)
+        self.assertEqual(len(results), self.THREADS)
+        self.assertEqual(created, self.STOCK // 2)
+        self.assertEqual(
+            results.count(status.HTTP_400_BAD_REQUEST), self.THREADS - created
+        )
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=self.book).count(), self.STOCK)
+
+    @override_settings(MAX_ACTIVE_BORROWINGS=3)
+    def test_parallel_checkouts_never_exceed_borrowing_limit(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=self.THREADS)
+        user = self.users[0]
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        threads = [
+            threading.Thread(target=self._checkout, args=(user, barrier, results))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        user.refresh_from_db()
+        self.assertEqual(results.count(status.HTTP_201_CREATED), 3)
+        self.assertEqual(user.active_borrowings, 3)
+        self.assertEqual(Borrowing.objects.filter(user=user).count(), 3)
+
+
+class ConcurrentBulkReturnTests(TransactionTestCase):
+    THREADS = 4
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        user = get_user_model().objects.create_user(email="user@example.com")
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=0,
+            daily_fee="1.50",
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                expected_return_date="2024-02-10", user=user, book=self.book
+            )
+            for _ in range(3)
+        ]
+
+    def _bulk_return(self, barrier, results):
+        client = APIClient()
+        client.force_authenticate(user=self.admin_user)
+        barrier.wait()
+        try:
+            response = client.post(
+                reverse("borrowings:borrowing-bulk-return"),
+                {"borrowings": [borrowing.id for borrowing in self.borrowings]},
+                format="json",
+            )
+            results.append((response.status_code, response.data))
+        finally:
+            connection.close()
+
+    def test_parallel_bulk_returns_return_each_borrowing_once(self):
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        threads = [
+            threading.Thread(target=self._bulk_return, args=(barrier, results))
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            [code for code, _ in results], [status.HTTP_200_OK] * self.THREADS
+        )
+        returned = [
+            item["id"]
+            for _, data in results
+            for item in data
+            if item["status"] == "returned"
+        ]
+        self.assertCountEqual(returned, [borrowing.id for borrowing in self.borrowings])
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, len(self.borrowings))
+        self.assertFalse(Borrowing.objects.active().exists())
+
+
+class BorrowingQueryCountTests(TestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model()
+        self.admin_user = user.objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.user = user.objects.create_user(email="user@example.com")
+        self.client.force_authenticate(user=self.admin_user)
+
+    def create_borrowings(self, count):
+        borrowings = []
+        for i in range(count):
+            book = Book.objects.create(
+                title=f"Book {i}",
+                author="John Doe",
+                cover=Book.CoverType.HARD,
+                inventory=3,
+                daily_fee="1.99",
+            )
+            borrowings.append(
+                Borrowing.objects.create(
+                    expected_return_date="2024-02-10", user=self.user, book=book
+                )
+            )
+        return borrowings
+
+    def test_list_query_count_independent_of_page_size(self):
+        self.create_borrowings(2)
+        with self.assertNumQueries(2):
+            self.client.get(self.BORROWING_URL)
+
+        self.create_borrowings(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(len(response.data["results"]), 22)
+
+    def test_filtered_list_query_count(self):
+        self.create_borrowings(5)
+        with self.assertNumQueries(2):
+            self.client.get(
+                self.BORROWING_URL, {"is_active": "true", "user_id": self.user.id}
+            )
+
+    def test_non_staff_list_query_count(self):
+        self.create_borrowings(5)
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(2):
+            self.client.get(self.BORROWING_URL)
+
+    def test_cursor_list_skips_count_query(self):
+        self.create_borrowings(5)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.BORROWING_URL, {"pagination": "cursor"})
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_retrieve_query_count(self):
+        borrowing = self.create_borrowings(1)[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("borrowings:borrowing-detail", kwargs={"pk": borrowing.pk})
+            )
+        self.assertEqual(response.data["book"]["title"], "Book 0")
+
+    def test_return_query_count(self):
+        borrowing = self.create_borrowings(1)[0]
+        # SELECT borrowing, SAVEPOINT, UPDATE borrowing, UPDATE book,
+        # SELECT waiting holds, UPDATE user counter, INSERT billing job,
+        # INSERT rollup job, RELEASE
+        with self.assertNumQueries(9):
+            self.client.post(
+                reverse("borrowings:borrowing-return", kwargs={"pk": borrowing.pk})
+            )
+
+
+class BorrowingValuesSerializerTests(TestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        book = Book.objects.create(
+            title="Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_fee="1.99",
+        )
+        Borrowing.objects.create(
+            expected_return_date="2024-02-10", user=self.user, book=book
+        )
+        Borrowing.objects.create(
+            expected_return_date="2024-03-01",
+            actual_return_date="2024-02-20",
+            user=self.user,
+            book=book,
+        )
+
+    def test_rows_render_to_model_serializer_bytes(self):
+        queryset = Borrowing.objects.order_by("id")
+        expected = JSONRenderer().render(
+            BorrowingListSerializer(queryset, many=True).data
+        )
+        rows = BorrowingValuesSerializer.values(queryset)
+        self.assertEqual(
+            JSONRenderer().render(BorrowingValuesSerializer(rows, many=True).data),
+            expected,
+        )
+
+    def test_list_response_bytes_unchanged(self):
+        self.client.force_authenticate(user=self.user)
+        for params in ({}, {"pagination": "cursor"}, {"is_active": "false"}):
+            with self.subTest(params=params):
+                response = self.client.get(self.BORROWING_URL, params)
+                ids = [row["id"] for row in response.data["results"]]
+                page = [Borrowing.objects.get(pk=pk) for pk in ids]
+                expected = dict(
+                    response.data,
+                    results=BorrowingListSerializer(page, many=True).data,
+                )
+                self.assertEqual(response.content, JSONRenderer().render(expected))
+
+
+class BorrowingExportTests(TestCase):
+    EXPORT_URL = reverse("borrowings:borrowing-export")
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model()
+        self.admin_user = user.objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.user = user.objects.create_user(email="user@example.com")
+        self.other_user = user.objects.create_user(email="other@example.com")
+        book = Book.objects.create(
+            title="Dune, Part One",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_fee="1.99",
+        )
+        self.active = Borrowing.objects.create(
+            expected_return_date="2024-02-10", user=self.user, book=book
+        )
+        self.returned = Borrowing.objects.create(
+            expected_return_date="2024-02-10",
+            actual_return_date="2024-02-01",
+            user=self.user,
+            book=book,
+        )
+        self.others = Borrowing.objects.create(
+            expected_return_date="2024-02-10", user=self.other_user, book=book
+        )
+
+    def export(self, params=None):
+        response = self.client.get(self.EXPORT_URL, params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_admin_exports_csv_in_a_single_query(self):
+        self.client.force_authenticate(user=self.admin_user)
+        with self.assertNumQueries(1):
+            response, content = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(
+            rows[0],
+            [
+                "id",
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "book_id",
+                "book_title",
+                "book_author",
+                "user_id",
+                "user_email",
+            ],
+        )
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]],
+            [self.active.id, self.returned.id, self.others.id],
+        )
+        self.assertEqual(
+            rows[2][3:7],
+            [
+                "2024-02-01",
+                str(self.returned.book_id),
+                "Dune, Part One",
+                "Frank Herbert",
+            ],
+        )
+        self.assertEqual(rows[1][3], "")
+
+    def test_jsonl_export_honours_filters(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response, content = self.export(
+            {"file_format": "jsonl", "user_id": self.user.id, "is_active": "true"}
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([record["id"] for record in records], [self.active.id])
+        self.assertIsNone(records[0]["actual_return_date"])
+        self.assertEqual(records[0]["user_email"], "user@example.com")
+
+    def test_patron_exports_only_own_history(self):
+        self.client.force_authenticate(user=self.user)
+        _, content = self.export(
+            {"file_format": "jsonl", "user_id": self.other_user.id}
+        )
+        self.assertEqual(content, "")
+
+        _, content = self.export({"file_format": "jsonl"})
+        self.assertEqual(
+            [json.loads(line)["id"] for line in content.splitlines()],
+            [self.active.id, self.returned.id],
+        )
+
+    def test_export_rejects_unknown_format_and_anonymous(self):
+        response = self.client.get(self.EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.EXPORT_URL, {"file_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN output is SQLite-specific")
+class BorrowingIndexPlanTests(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_user_and_status_filter_uses_composite_index(self):
+        queryset = Borrowing.objects.filter(
+            user_id__in=[1, 2], actual_return_date__isnull=True
+        )
+        self.assertUsesIndex(queryset, "borrowing_user_returned_idx")
+
+    def test_returned_by_user_uses_composite_index(self):
+        queryset = Borrowing.objects.filter(user_id=1, actual_return_date__isnull=False)
+        self.assertUsesIndex(queryset, "borrowing_user_returned_idx")
+
+    def test_active_listing_uses_partial_index(self):
+        queryset = Borrowing.objects.filter(actual_return_date__isnull=True).order_by(
+            "id"
+        )
+        self.assertUsesIndex(queryset, "borrowing_active_idx")
+
+    def test_overdue_scan_uses_partial_index(self):
+        queryset = Borrowing.objects.filter(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=timezone.now().date(),
+        )
+        self.assertUsesIndex(queryset, "borrowing_overdue_idx")
+
+
+class BulkCheckoutTests(TestCase):
+    BULK_URL = reverse("borrowings:borrowing-bulk-checkout")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.client.force_authenticate(user=self.user)
+        self.books = [
+            Book.objects.create(
+                title=f"Book {i}",
+                author="John Doe",
+                cover=Book.CoverType.SOFT,
+                inventory=2,
+                daily_fee="1.99",
+            )
+            for i in range(3)
+        ]
+
+    def checkout(self, book_ids):
+        return self.client.post(
+            self.BULK_URL,
+            {"books": book_ids, "expected_return_date": "2024-02-10"},
+            format="json",
+        )
+
+    def test_bulk_checkout_creates_borrowings_and_decrements_stock(self):
+        first, second, third = self.books
+        response = self.checkout([first.id, second.id, first.id])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertTrue(all(item["id"] for item in response.data))
+        self.assertEqual(
+            Borrowing.objects.filter(user=self.user, book=first).count(), 2
+        )
+        inventories = dict(Book.objects.values_list("id", "inventory"))
+        self.assertEqual(inventories, {first.id: 0, second.id: 1, third.id: 2})
+
+    def test_bulk_checkout_query_count_independent_of_basket_size(self):
+        # stock SELECT, SAVEPOINT, UPDATE user counter, UPDATE books, INSERT,
+        # INSERT rollup job, RELEASE
+        with self.assertNumQueries(7):
+            self.checkout([self.books[0].id])
+        with self.assertNumQueries(7):
+            self.checkout([book.id for book in self.books])
+
+    def test_bulk_checkout_is_all_or_nothing(self):
+        first, second, _ = self.books
+        response = self.checkout([first.id, second.id, second.id, second.id])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("out of stock", str(response.data["books"]))
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(set(Book.objects.values_list("inventory", flat=True)), {2})
+
+    def test_bulk_checkout_rejects_unknown_books(self):
+        response = self.checkout([self.books[0].id, 9999])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("9999", str(response.data["books"]))
+
+    def test_bulk_checkout_rejects_empty_basket(self):
+        response = self.checkout([])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_checkout_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.checkout([self.books[0].id])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BulkReturnTests(TestCase):
+    BULK_RETURN_URL = reverse("borrowings:borrowing-bulk-return")
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model()
+        self.admin_user = user.objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.user = user.objects.create_user(email="user@example.com")
+        self.client.force_authenticate(user=self.admin_user)
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=0,
+            daily_fee="1.99",
+        )
+        self.other_book = Book.objects.create(
+            title="Other Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=1,
+            daily_fee="0.99",
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                expected_return_date="2024-02-10", user=self.user, book=book
+            )
+            for book in (self.book, self.book, self.other_book)
+        ]
+        self.returned = Borrowing.objects.create(
+            expected_return_date="2024-02-10",
+            actual_return_date="2024-02-09",
+            user=self.user,
+            book=self.other_book,
+        )
+
+    def bulk_return(self, borrowing_ids):
+        return self.client.post(
+            self.BULK_RETURN_URL, {"borrowings": borrowing_ids}, format="json"
+        )
+
+    def test_bulk_return_reports_each_id(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+        response = self.bulk_return([*ids, self.returned.id, 9999])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [
+                *({"id": borrowing_id, "status": "returned"} for borrowing_id in ids),
+                {"id": self.returned.id, "status": "already_returned"},
+                {"id": 9999, "status": "not_found"},
+            ],
+        )
+        self.assertFalse(Borrowing.objects.active().exists())
+        self.book.refresh_from_db()
+        self.other_book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 2)
+        self.assertEqual(self.other_book.inventory, 2)
+
+    def test_bulk_return_is_idempotent(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+        self.bulk_return(ids)
+        response = self.bulk_return(ids)
+
+        self.assertEqual(
+            {item["status"] for item in response.data}, {"already_returned"}
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 2)
+
+    def test_bulk_return_query_count(self):
+        # SELECT borrowings, SAVEPOINT, UPDATE borrowings, UPDATE books,
+        # SELECT waiting holds, UPDATE user counters, INSERT billing job,
+        # INSERT rollup job, RELEASE
+        with self.assertNumQueries(9):
+            self.bulk_return([borrowing.id for borrowing in self.borrowings])
+
+    def test_bulk_return_admin_only(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.bulk_return([self.borrowings[0].id])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(MAX_ACTIVE_BORROWINGS=2)
+class BorrowingLimitTests(TestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+    BULK_URL = reverse("borrowings:borrowing-bulk-checkout")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.client.force_authenticate(user=self.user)
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_fee="1.99",
+        )
+
+    def checkout(self):
+        return self.client.post(
+            self.BORROWING_URL,
+            {"expected_return_date": "2024-02-10", "book": self.book.id},
+        )
+
+    def active_borrowings(self, user):
+        user.refresh_from_db()
+        return user.active_borrowings
+
+    def test_checkout_counts_against_limit(self):
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+
+        response = self.checkout()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("more than 2 active borrowings", str(response.data))
+        self.assertEqual(self.active_borrowings(self.user), 2)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 3)
+
+    def test_bulk_checkout_over_limit_creates_nothing(self):
+        response = self.client.post(
+            self.BULK_URL,
+            {"books": [self.book.id] * 3, "expected_return_date": "2024-02-10"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(self.active_borrowings(self.user), 0)
+
+    def test_returns_free_up_the_limit(self):
+        self.checkout()
+        borrowing_id = self.checkout().data["id"]
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.client.post(
+            reverse("borrowings:borrowing-return", kwargs={"pk": borrowing_id})
+        )
+        self.assertEqual(self.active_borrowings(self.user), 1)
+
+        self.client.post(
+            reverse("borrowings:borrowing-bulk-return"),
+            {"borrowings": list(Borrowing.objects.values_list("id", flat=True))},
+            format="json",
+        )
+        self.assertEqual(self.active_borrowings(self.user), 0)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.checkout().status_code, status.HTTP_201_CREATED)
+
+    def test_reconcile_command_rebuilds_counters(self):
+        Borrowing.objects.create(
+            expected_return_date="2024-02-10", user=self.user, book=self.book
+        )
+        Borrowing.objects.create(
+            expected_return_date="2024-02-10",
+            actual_return_date="2024-02-09",
+            user=self.user,
+            book=self.book,
+        )
+        get_user_model().objects.filter(pk=self.admin_user.pk).update(
+            active_borrowings=4
+        )
+
+        out = io.StringIO()
+        call_command("reconcile_active_borrowings", chunk_size=1, stdout=out)
+
+        self.assertIn("Corrected 2 active borrowing counter(s).", out.getvalue())
+        self.assertEqual(self.active_borrowings(self.user), 1)
+        self.assertEqual(self.active_borrowings(self.admin_user), 0)
+
+
+class AsyncBorrowingListTests(TestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+    ASYNC_URL = reverse("borrowings:borrowing-list-async")
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_fee="1.99",
+        )
+        for user, returned in (
+            (self.user, None),
+            (self.user, "2024-02-09"),
+            (self.admin_user, None),
+        ):
+            Borrowing.objects.create(
+                expected_return_date="2024-02-10",
+                actual_return_date=returned,
+                user=user,
+                book=book,
+            )
+
+    def headers(self, user):
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        return {"authorize": f"Bearer {token}"}
+
+    async def test_matches_sync_list(self):
+        for user, params in (
+            (self.user, {}),
+            (self.admin_user, {}),
+            (self.admin_user, {"is_active": "true", "user_id": self.user.id}),
+        ):
+            with self.subTest(user=user.email, params=params):
+                headers = self.headers(user)
+                expected = await self.async_client.get(
+                    self.BORROWING_URL, params, headers=headers
+                )
+                response = await self.async_client.get(
+                    self.ASYNC_URL, params, headers=headers
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json()["results"], expected.json()["results"])
+
+    def test_cached_user_needs_no_user_query(self):
+        get = async_to_sync(self.async_client.get)
+        headers = self.headers(self.user)
+        get(self.ASYNC_URL, headers=headers)
+        with self.assertNumQueries(2):
+            response = get(self.ASYNC_URL, headers=headers)
+        self.assertEqual(response.json()["count"], 2)
+
+    async def test_requires_valid_token(self):
+        response = await self.async_client.get(self.ASYNC_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+        headers = self.headers(self.user)
+        await sync_to_async(self.user.revoke_tokens)()
+        response = await self.async_client.get(self.ASYNC_URL, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()["code"], "token_revoked")
+
+
+class ProcessOverdueCommandTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_fee="1.99",
+        )
+        self.overdue = Borrowing.objects.create(
+            expected_return_date="2024-02-01", user=self.user, book=self.book
+        )
+        Borrowing.objects.create(
+            expected_return_date="2024-03-01", user=self.user, book=self.book
+        )
+        Borrowing.objects.create(
+            expected_return_date="2024-01-01",
+            actual_return_date="2024-01-05",
+            user=self.user,
+            book=self.book,
+        )
+
+    def test_reports_only_active_overdue_borrowings(self):
+        out = io.StringIO()
+        call_command(
+            "process_overdue", "--as-of=2024-02-11", "--chunk-size=1", stdout=out
+        )
+        output = out.getvalue()
+
+        self.assertIn(
+            f"#{self.overdue.id} 'Sample Book' borrowed by user@example.com "
+            "is 10 day(s) overdue",
+            output,
+        )
+        self.assertIn("1 overdue borrowing(s) as of 2024-02-11.", output)
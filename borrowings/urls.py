@@ -1,9 +1,13 @@
+from django.urls import path
 from rest_framework import routers
 
+from borrowings.async_views import borrowing_list
 from borrowings.views import BorrowingListView
 
 router = routers.DefaultRouter()
 router.register("", BorrowingListView, basename="borrowing")
-urlpatterns = router.urls
+urlpatterns = [
+    path("async/", borrowing_list, name="borrowing-list-async"),
+] + router.urls
 
 app_name = "borrowings"
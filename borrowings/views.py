@@ -1,54 +1,200 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+
 from django.db import transaction
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from books.cache import bump_catalog_version
+from books.models import Book
+from books.stock import inventory_delta
+from borrowings.export import export_borrowings
+from borrowings.filters import filter_borrowings
+from borrowings.limits import release_borrowings, reserve_borrowings
 from borrowings.models import Borrowing
 from borrowings.permissions import IsAdminUserOrReadAndCreateOnly
 from borrowings.serializers import (
+    OUT_OF_STOCK_MESSAGE,
     BorrowingDetailSerializer,
     BorrowingListSerializer,
+    BorrowingValuesSerializer,
+    BulkCheckoutSerializer,
+    BulkReturnResultSerializer,
+    BulkReturnSerializer,
 )
+from holds.queue import fulfill_hold, fulfill_holds, restock
+from library_service.bulk import CONTENT_TYPES, FORMATS
+from library_service.db import ReplicaReadMixin
+from library_service.serializers import ValuesListModelMixin
+from payments.tasks import enqueue_charge_returns
+from stats.tasks import enqueue_record_checkouts, enqueue_record_returns
+
+
+FILTER_PARAMETERS = [
+    OpenApiParameter(
+        "user_id",
+        type={"type": "list", "items": {"type": "number"}},
+        description="Fiter by user id",
+    ),
+    OpenApiParameter(
+        "is_active",
+        type={"type": "boolean"},
+        description="Filter by borrowing status",
+    ),
+]
 
 
-class BorrowingListView(viewsets.ModelViewSet):
+def return_borrowings(active):
+    """
+    Returns the borrowings in `{borrowing_id: (book_id, user_id,
+    expected_return_date)}`, read before the transaction so that it opens
+    with the conditional UPDATE and SQLite takes its write lock up front.
+    Returns False, changing nothing, if a concurrent return took any of them.
+    """
+    returned_on = timezone.now().date()
+    with transaction.atomic():
+        returned = Borrowing.objects.filter(
+            pk__in=active, actual_return_date__isnull=True
+        ).update(actual_return_date=returned_on)
+        if returned != len(active):
+            transaction.set_rollback(True)
+            return False
+        restock(Counter(book_id for book_id, _, _ in active.values()))
+        release_borrowings(Counter(user_id for _, user_id, _ in active.values()))
+        enqueue_charge_returns(
+            {
+                borrowing_id: expected
+                for borrowing_id, (_, _, expected) in active.items()
+            },
+            returned_on,
+        )
+        enqueue_record_returns(
+            returned_on,
+            [
+                (book_id, user_id, returned_on > expected)
+                for book_id, user_id, expected in active.values()
+            ],
+            list(active),
+        )
+    return True
+
+
+class BorrowingListView(ReplicaReadMixin, ValuesListModelMixin, viewsets.ModelViewSet):
     queryset = Borrowing.objects.all()
+    values_serializer_class = BorrowingValuesSerializer
     permission_classes = [IsAdminUserOrReadAndCreateOnly]
 
     def get_serializer_class(self):
         if self.action == "retrieve":
             return BorrowingDetailSerializer
+        if self.action == "bulk_checkout":
+            return BulkCheckoutSerializer
+        if self.action == "bulk_return":
+            return BulkReturnSerializer
         return BorrowingListSerializer
 
-    @staticmethod
-    def _params_to_ints(qs):
-        """Converts a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in qs.split(",")]
-
     def get_queryset(self):
-        is_active = self.request.query_params.get("is_active")
-        user_id = self.request.query_params.get("user_id")
         queryset = Borrowing.objects.all()
+        if self.action == "retrieve":
+            queryset = queryset.select_related("book")
+        return filter_borrowings(queryset, self.request.user, self.request.query_params)
 
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(user=self.request.user)
-
-        if user_id:
-            users_ids = self._params_to_ints(user_id)
-            queryset = queryset.filter(user_id__in=users_ids)
+    @transaction.atomic
+    def perform_create(self, serializer):
+        book = serializer.validated_data["book"]
+        reserve_borrowings(self.request.user.id)
+        # A copy set aside for the patron's hold is already out of inventory.
+        # Otherwise a conditional decrement lets the database, not the stale
+        # row loaded by the serializer, decide whether a copy is available.
+        if not fulfill_hold(self.request.user.id, book.pk):
+            decremented = Book.objects.filter(pk=book.pk, inventory__gt=0).update(
+                inventory=F("inventory") - 1
+            )
+            if not decremented:
+                raise serializers.ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [OUT_OF_STOCK_MESSAGE]}
+                )
+        borrowing = serializer.save(user_id=self.request.user.id)
+        enqueue_record_checkouts(
+            borrowing.borrow_date, [(book.pk, borrowing.user_id)], [borrowing.pk]
+        )
+        transaction.on_commit(bump_catalog_version)
 
-        if is_active:
-            is_active = is_active.lower() == "true"
-            queryset = queryset.filter(actual_return_date__isnull=is_active)
+    @extend_schema(
+        request=BulkCheckoutSerializer,
+        responses={status.HTTP_201_CREATED: BorrowingListSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="bulk",
+        url_name="bulk-checkout",
+    )
+    def bulk_checkout(self, request):
+        """Borrows a list of books at once: all of them or none"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        book_ids = serializer.validated_data["books"]
+        requested = Counter(book_ids)
+        # Validation reads stay outside the transaction, which opens with a
+        # write so SQLite takes its write lock up front instead of failing to
+        # upgrade a read lock under concurrent checkouts.
+        with transaction.atomic():
+            reserve_borrowings(request.user.id, len(book_ids))
+            # Copies set aside for the patron's holds are already out of
+            # inventory; only the rest are taken from the shelf.
+            if serializer.held_books:
+                requested -= Counter(
+                    fulfill_holds(request.user.id, serializer.held_books)
+                )
 
-        return queryset
+            if requested:
+                decremented = Book.objects.filter(
+                    reduce(
+                        or_,
+                        (
+                            Q(pk=book_id, inventory__gte=count)
+                            for book_id, count in requested.items()
+                        ),
+                    )
+                ).update(
+                    inventory=inventory_delta(
+                        {book_id: -count for book_id, count in requested.items()}
+                    )
+                )
+                if decremented != len(requested):
+                    # Stock was taken by a concurrent checkout after validation.
+                    raise serializers.ValidationError(
+                        {api_settings.NON_FIELD_ERRORS_KEY: [OUT_OF_STOCK_MESSAGE]}
+                    )
 
-    def perform_create(self, serializer):
-        updated_borrowing = serializer.save(user=self.request.user)
-        updated_borrowing.book.inventory -= 1
-        updated_borrowing.book.save()
+            expected_return_date = serializer.validated_data["expected_return_date"]
+            borrowings = Borrowing.objects.bulk_create(
+                Borrowing(
+                    book_id=book_id,
+                    user_id=request.user.id,
+                    expected_return_date=expected_return_date,
+                )
+                for book_id in book_ids
+            )
+            enqueue_record_checkouts(
+                borrowings[0].borrow_date,
+                [(borrowing.book_id, borrowing.user_id) for borrowing in borrowings],
+                [borrowing.pk for borrowing in borrowings],
+            )
+            transaction.on_commit(bump_catalog_version)
+        return Response(
+            BorrowingListSerializer(borrowings, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
 
     @action(
         detail=True,
@@ -57,34 +203,118 @@ class BorrowingListView(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAdminUser],
         url_name="return",
     )
-    @transaction.atomic
     def return_borrowing(self, request, pk=None):
         borrowing = self.get_object()
-        if borrowing.actual_return_date:
-            return Response(
-                {"error": "Item has already been returned"},
-                status=status.HTTP_400_BAD_REQUEST,
+        returned_on = timezone.now().date()
+        with transaction.atomic():
+            # Conditional update: of two concurrent returns of the same
+            # borrowing only one restocks the book and bills the patron.
+            returned = Borrowing.objects.filter(
+                pk=borrowing.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=returned_on)
+            if not returned:
+                return Response(
+                    {"error": "Item has already been returned"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            borrowing.actual_return_date = returned_on
+            restock({borrowing.book_id: 1})
+            release_borrowings({borrowing.user_id: 1})
+            enqueue_charge_returns(
+                {borrowing.id: borrowing.expected_return_date}, returned_on
+            )
+            enqueue_record_returns(
+                returned_on,
+                [
+                    (
+                        borrowing.book_id,
+                        borrowing.user_id,
+                        returned_on > borrowing.expected_return_date,
+                    )
+                ],
+                [borrowing.pk],
             )
-        borrowing.actual_return_date = timezone.now().date()
-        borrowing.book.inventory += 1
-        borrowing.book.save()
-        borrowing.save()
         serializer = self.get_serializer(borrowing)
         return Response(serializer.data)
 
+    @extend_schema(
+        request=BulkReturnSerializer,
+        responses=BulkReturnResultSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="bulk-return",
+        permission_classes=[permissions.IsAdminUser],
+        url_name="bulk-return",
+    )
+    def bulk_return(self, request):
+        """Returns a list of borrowings, reporting the outcome for each id"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        borrowing_ids = serializer.validated_data["borrowings"]
+
+        # Read again whenever a concurrent return took some of the rows.
+        while True:
+            borrowings = list(
+                Borrowing.objects.filter(pk__in=borrowing_ids).values_list(
+                    "id",
+                    "book_id",
+                    "user_id",
+                    "expected_return_date",
+                    "actual_return_date",
+                )
+            )
+            active = {
+                borrowing_id: (book_id, user_id, expected)
+                for borrowing_id, book_id, user_id, expected, returned in borrowings
+                if not returned
+            }
+            if not active or return_borrowings(active):
+                break
+
+        statuses = dict.fromkeys(borrowing_ids, "not_found")
+        for borrowing_id, *_ in borrowings:
+            statuses[borrowing_id] = (
+                "returned" if borrowing_id in active else "already_returned"
+            )
+        results = [
+            {"id": borrowing_id, "status": outcome}
+            for borrowing_id, outcome in statuses.items()
+        ]
+        return Response(BulkReturnResultSerializer(results, many=True).data)
+
+    @extend_schema(parameters=FILTER_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @extend_schema(
         parameters=[
+            *FILTER_PARAMETERS,
             OpenApiParameter(
-                "user_id",
-                type={"type": "list", "items": {"type": "number"}},
-                description="Fiter by user id",
+                "file_format",
+                type={"type": "string", "enum": FORMATS},
+                description="Export format, csv by default",
             ),
-            OpenApiParameter(
-                "is_active",
-                type={"type": "boolean"},
-                description="Filter by borrowing status",
-            ),
-        ]
+        ],
+        responses={(status.HTTP_200_OK, "text/csv"): OpenApiTypes.BINARY},
     )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+    @action(detail=False, methods=["GET"], url_path="export", url_name="export")
+    def export_history(self, request):
+        """Stream every borrowing matching the list filters, oldest first"""
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response(
+                {"file_format": [f"Choose one of: {', '.join(FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.get_queryset()
+        # Rows are read after dispatch returns, so pin the routed database.
+        response = StreamingHttpResponse(
+            export_borrowings(file_format, queryset.using(queryset.db)),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="borrowings.{file_format}"'
+        )
+        return response
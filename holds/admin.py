@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from holds.models import Hold
+
+
+@admin.register(Hold)
+class HoldAdmin(admin.ModelAdmin):
+    list_display = ("id", "book", "user", "status", "created", "ready_until")
+    list_filter = ("status",)
+    list_select_related = ("book", "user")
+    raw_id_fields = ("book", "user")
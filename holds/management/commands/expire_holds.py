@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from holds.queue import expire_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire ready holds that were not collected in time and pass their "
+        "copies on to the next holds in line. Meant to run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            help="Expire holds whose pickup deadline is before this YYYY-MM-DD "
+            "date (default: today)",
+        )
+
+    def handle(self, *args, **options):
+        as_of = options["as_of"] or timezone.now().date()
+        with transaction.atomic():
+            expired = expire_holds(as_of)
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} holds."))
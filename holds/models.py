@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from books.models import Book
+
+
+class HoldQuerySet(models.QuerySet):
+    def waiting(self):
+        return self.filter(status=Hold.Status.WAITING)
+
+    def ready(self):
+        return self.filter(status=Hold.Status.READY)
+
+
+class Hold(models.Model):
+    """
+    A patron's place in the queue for a book. Returned copies go to the
+    oldest waiting hold, which becomes ready with a copy set aside until
+    `ready_until`.
+    """
+
+    class Status(models.TextChoices):
+        WAITING = "WAITING"
+        READY = "READY"
+        FULFILLED = "FULFILLED"
+        CANCELLED = "CANCELLED"
+        EXPIRED = "EXPIRED"
+
+    OPEN_STATUSES = (Status.WAITING, Status.READY)
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="holds")
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="holds"
+    )
+    status = models.CharField(
+        max_length=9, choices=Status.choices, default=Status.WAITING
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    ready_until = models.DateField(null=True, blank=True)
+
+    objects = HoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "book"],
+                name="hold_one_open_per_book",
+                condition=models.Q(status__in=["WAITING", "READY"]),
+            ),
+        ]
+        indexes = [
+            # The queue: the next hold to promote is the first entry for the book.
+            models.Index(
+                fields=["book", "created"],
+                name="hold_queue_idx",
+                condition=models.Q(status="WAITING"),
+            ),
+            models.Index(
+                fields=["ready_until"],
+                name="hold_ready_idx",
+                condition=models.Q(status="READY"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.book} ({self.status})"
@@ -0,0 +1,169 @@
+"""
+The hold queue.
+
+Copies coming back into stock are handed to the oldest waiting holds on
+their book instead of going back on the shelf. Promotion claims holds with
+`select_for_update(skip_locked=True)`, so concurrent promoters take
+different holds instead of queueing behind each other's row locks, and
+each book's next hold is the first entry of the `(book, created)` index.
+
+Placing a hold locks the book row before reading its stock, and restocking
+updates the book row before reading the queue. That orders the two, so a
+copy is never restocked past a hold being placed at the same moment. All
+functions here must run inside the caller's transaction, and those that
+change a book's inventory move the catalog cache to a new version when it
+commits.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from books.stock import inventory_delta
+from holds.models import Hold
+
+NOT_OPEN_MESSAGE = "This hold is no longer open."
+
+
+def pickup_deadline():
+    return timezone.now().date() + timedelta(days=settings.HOLD_PICKUP_DAYS)
+
+
+def place_hold(user_id, book_id):
+    """
+    Queues a hold for the user, or makes it ready at once when a copy is
+    on the shelf.
+    """
+    hold = Hold.objects.create(user_id=user_id, book_id=book_id)
+    inventory = (
+        Book.objects.select_for_update()
+        .values_list("inventory", flat=True)
+        .get(pk=book_id)
+    )
+    if inventory:
+        Book.objects.filter(pk=book_id).update(inventory=F("inventory") - 1)
+        transaction.on_commit(bump_catalog_version)
+        hold.status = Hold.Status.READY
+        hold.ready_until = pickup_deadline()
+        hold.save(update_fields=["status", "ready_until"])
+    return hold
+
+
+def promote_holds(copies):
+    """
+    Sets aside up to `copies[book_id]` in-stock copies of each book for its
+    oldest waiting holds, taking them back out of inventory. Returns the
+    number of holds promoted.
+    """
+    queued_books = (
+        Hold.objects.waiting()
+        .filter(book_id__in=copies)
+        .values_list("book_id", flat=True)
+        .distinct()
+    )
+    promoted = {}
+    for book_id in list(queued_books):
+        hold_ids = list(
+            Hold.objects.waiting()
+            .filter(book_id=book_id)
+            .order_by("created")
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[: copies[book_id]]
+        )
+        if hold_ids:
+            promoted[book_id] = hold_ids
+    if not promoted:
+        return 0
+
+    hold_ids = [hold_id for ids in promoted.values() for hold_id in ids]
+    Hold.objects.filter(pk__in=hold_ids).update(
+        status=Hold.Status.READY, ready_until=pickup_deadline()
+    )
+    Book.objects.filter(pk__in=promoted).update(
+        inventory=inventory_delta(
+            {book_id: -len(ids) for book_id, ids in promoted.items()}
+        )
+    )
+    transaction.on_commit(bump_catalog_version)
+    return len(hold_ids)
+
+
+def restock(copies):
+    """
+    Puts `{book_id: count}` copies back into inventory, then promotes the
+    holds waiting for them.
+    """
+    Book.objects.filter(pk__in=copies).update(inventory=inventory_delta(copies))
+    transaction.on_commit(bump_catalog_version)
+    return promote_holds(copies)
+
+
+def fulfill_hold(user_id, book_id):
+    """Marks the user's ready hold on the book as collected, if there is one"""
+    return bool(
+        Hold.objects.ready()
+        .filter(user_id=user_id, book_id=book_id)
+        .update(status=Hold.Status.FULFILLED, ready_until=None)
+    )
+
+
+def fulfill_holds(user_id, book_ids):
+    """
+    Marks the user's ready holds on the books as collected. Returns the ids
+    of the books that had one.
+    """
+    held = list(
+        Hold.objects.ready()
+        .filter(user_id=user_id, book_id__in=book_ids)
+        .select_for_update()
+        .values_list("id", "book_id")
+    )
+    if held:
+        Hold.objects.filter(pk__in=[hold_id for hold_id, _ in held]).update(
+            status=Hold.Status.FULFILLED, ready_until=None
+        )
+    return {book_id for _, book_id in held}
+
+
+def cancel_hold(hold):
+    """Cancels an open hold, passing a set-aside copy on to the next in line"""
+    if Hold.objects.ready().filter(pk=hold.pk).update(status=Hold.Status.CANCELLED):
+        restock({hold.book_id: 1})
+    elif (
+        not Hold.objects.waiting()
+        .filter(pk=hold.pk)
+        .update(status=Hold.Status.CANCELLED)
+    ):
+        raise serializers.ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: [NOT_OPEN_MESSAGE]}
+        )
+    hold.refresh_from_db(fields=["status", "ready_until"])
+    return hold
+
+
+def expire_holds(as_of):
+    """
+    Expires ready holds not collected by `as_of` and passes their copies on.
+    Returns the number of holds expired.
+    """
+    expired = list(
+        Hold.objects.ready()
+        .filter(ready_until__lt=as_of)
+        .select_for_update(skip_locked=True)
+        .values_list("id", "book_id")
+    )
+    if not expired:
+        return 0
+    Hold.objects.filter(pk__in=[hold_id for hold_id, _ in expired]).update(
+        status=Hold.Status.EXPIRED
+    )
+    restock(Counter(book_id for _, book_id in expired))
+    return len(expired)
@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from holds.models import Hold
+
+DUPLICATE_HOLD_MESSAGE = "You already have an open hold on this book."
+
+
+class HoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hold
+        fields = ("id", "book", "status", "created", "ready_until")
+        read_only_fields = ("status", "created", "ready_until")
+
+    def validate_book(self, book):
+        user = self.context["request"].user
+        if Hold.objects.filter(
+            user_id=user.id, book=book, status__in=Hold.OPEN_STATUSES
+        ).exists():
+            raise serializers.ValidationError(DUPLICATE_HOLD_MESSAGE)
+        return book
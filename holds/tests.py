@@ -0,0 +1,322 @@
+import io
+import threading
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.cache import get_catalog_version
+from books.models import Book
+from borrowings.models import Borrowing
+from holds.models import Hold
+
+HOLD_URL = reverse("holds:hold-list")
+
+
+def cancel_url(hold):
+    return reverse("holds:hold-cancel", kwargs={"pk": hold.pk})
+
+
+def return_url(borrowing):
+    return reverse("borrowings:borrowing-return", kwargs={"pk": borrowing.pk})
+
+
+@override_settings(HOLD_PICKUP_DAYS=3)
+class HoldQueueTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model()
+        self.admin_user = user.objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.borrower = user.objects.create_user(email="borrower@example.com")
+        self.patrons = [
+            user.objects.create_user(email=f"patron{i}@example.com") for i in range(3)
+        ]
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=0,
+            daily_fee="1.00",
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=timezone.now().date() + timedelta(days=7),
+            user=self.borrower,
+            book=self.book,
+        )
+
+    def place_hold(self, user, book=None):
+        self.client.force_authenticate(user=user)
+        return self.client.post(HOLD_URL, {"book": (book or self.book).id})
+
+    def return_borrowing(self, borrowing=None):
+        self.client.force_authenticate(user=self.admin_user)
+        return self.client.post(return_url(borrowing or self.borrowing))
+
+    def checkout(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            reverse("borrowings:borrowing-list"),
+            {"expected_return_date": "2030-01-01", "book": self.book.id},
+        )
+
+    def test_hold_on_unavailable_book_waits(self):
+        response = self.place_hold(self.patrons[0])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["status"], Hold.Status.WAITING)
+        self.assertIsNone(response.data["ready_until"])
+
+    def test_hold_on_available_book_sets_a_copy_aside(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+        response = self.place_hold(self.patrons[0])
+        self.assertEqual(response.data["status"], Hold.Status.READY)
+        self.assertEqual(
+            response.data["ready_until"],
+            str(timezone.now().date() + timedelta(days=3)),
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_second_open_hold_is_rejected(self):
+        self.place_hold(self.patrons[0])
+        response = self.place_hold(self.patrons[0])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("book", response.data)
+
+    def test_return_promotes_oldest_waiting_hold(self):
+        for patron in self.patrons:
+            self.place_hold(patron)
+        self.return_borrowing()
+
+        statuses = dict(Hold.objects.values_list("user_id", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                self.patrons[0].id: Hold.Status.READY,
+                self.patrons[1].id: Hold.Status.WAITING,
+                self.patrons[2].id: Hold.Status.WAITING,
+            },
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_return_without_holds_restocks(self):
+        self.return_borrowing()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_bulk_return_promotes_one_hold_per_copy(self):
+        second = Borrowing.objects.create(
+            expected_return_date="2030-01-01", user=self.borrower, book=self.book
+        )
+        self.place_hold(self.patrons[0])
+        self.place_hold(self.patrons[1])
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(
+            reverse("borrowings:borrowing-bulk-return"),
+            {"borrowings": [self.borrowing.id, second.id]},
+            format="json",
+        )
+        self.assertEqual(Hold.objects.ready().count(), 2)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_ready_holder_checks_out_the_set_aside_copy(self):
+        self.place_hold(self.patrons[0])
+        self.return_borrowing()
+
+        response = self.checkout(self.patrons[1])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.checkout(self.patrons[0])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Hold.objects.get(user=self.patrons[0]).status, Hold.Status.FULFILLED
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_ready_holder_bulk_checks_out_the_set_aside_copy(self):
+        other = Book.objects.create(
+            title="Other Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=1,
+            daily_fee="1.00",
+        )
+        self.place_hold(self.patrons[0])
+        self.return_borrowing()
+
+        self.client.force_authenticate(user=self.patrons[0])
+        response = self.client.post(
+            reverse("borrowings:borrowing-bulk-checkout"),
+            {"books": [self.book.id, other.id], "expected_return_date": "2030-01-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Hold.objects.get(user=self.patrons[0]).status, Hold.Status.FULFILLED
+        )
+        inventories = dict(Book.objects.values_list("id", "inventory"))
+        self.assertEqual(inventories, {self.book.id: 0, other.id: 0})
+
+    def test_stock_changes_refresh_the_catalog(self):
+        def changes_catalog(func, *args, **kwargs):
+            version = get_catalog_version()
+            with self.captureOnCommitCallbacks(execute=True):
+                func(*args, **kwargs)
+            return get_catalog_version() > version
+
+        self.assertTrue(changes_catalog(self.return_borrowing))
+        self.assertTrue(changes_catalog(self.place_hold, self.patrons[0]))
+        hold = Hold.objects.get(user=self.patrons[0])
+        self.client.force_authenticate(user=self.patrons[0])
+        self.assertTrue(changes_catalog(self.client.post, cancel_url(hold)))
+
+        self.place_hold(self.patrons[1])
+        as_of = timezone.now().date() + timedelta(days=4)
+        self.assertTrue(
+            changes_catalog(
+                call_command, "expire_holds", f"--as-of={as_of}", stdout=io.StringIO()
+            )
+        )
+
+    def test_cancelling_ready_hold_promotes_next(self):
+        self.place_hold(self.patrons[0])
+        self.place_hold(self.patrons[1])
+        self.return_borrowing()
+        hold = Hold.objects.get(user=self.patrons[0])
+
+        self.client.force_authenticate(user=self.patrons[0])
+        response = self.client.post(cancel_url(hold))
+        self.assertEqual(response.data["status"], Hold.Status.CANCELLED)
+        self.assertEqual(
+            Hold.objects.get(user=self.patrons[1]).status, Hold.Status.READY
+        )
+
+        response = self.client.post(cancel_url(hold))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancelling_waiting_hold_leaves_stock_alone(self):
+        hold = Hold.objects.get(pk=self.place_hold(self.patrons[0]).data["id"])
+        self.client.post(cancel_url(hold))
+        hold.refresh_from_db()
+        self.assertEqual(hold.status, Hold.Status.CANCELLED)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_expire_holds_passes_copies_on(self):
+        self.place_hold(self.patrons[0])
+        self.place_hold(self.patrons[1])
+        self.return_borrowing()
+
+        as_of = timezone.now().date() + timedelta(days=4)
+        out = io.StringIO()
+        call_command("expire_holds", f"--as-of={as_of}", stdout=out)
+
+        self.assertIn("Expired 1 holds.", out.getvalue())
+        statuses = dict(Hold.objects.values_list("user_id", "status"))
+        self.assertEqual(statuses[self.patrons[0].id], Hold.Status.EXPIRED)
+        self.assertEqual(statuses[self.patrons[1].id], Hold.Status.READY)
+
+    def test_patrons_see_only_their_holds(self):
+        self.place_hold(self.patrons[0])
+        self.place_hold(self.patrons[1])
+
+        response = self.client.get(HOLD_URL)
+        self.assertEqual(
+            [hold["id"] for hold in response.data["results"]],
+            list(
+                Hold.objects.filter(user=self.patrons[1]).values_list("id", flat=True)
+            ),
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.get(HOLD_URL).data["count"], 2)
+
+    def test_promotion_query_uses_queue_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN output is SQLite-specific")
+        queryset = (
+            Hold.objects.waiting().filter(book_id=self.book.id).order_by("created")
+        )
+        plan = queryset.explain()
+        self.assertIn("hold_queue_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ConcurrentHoldTests(TransactionTestCase):
+    RETURNS = 6
+    HOLDS = 8
+
+    def setUp(self):
+        user = get_user_model()
+        self.admin_user = user.objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=0,
+            daily_fee="1.00",
+        )
+        borrower = user.objects.create_user(email="borrower@example.com")
+        self.borrowings = [
+            Borrowing.objects.create(
+                expected_return_date="2030-01-01", user=borrower, book=self.book
+            )
+            for _ in range(self.RETURNS)
+        ]
+        self.patrons = [
+            user.objects.create_user(email=f"patron{i}@example.com")
+            for i in range(self.HOLDS)
+        ]
+
+    def _request(self, user, url, data, barrier, results):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        barrier.wait()
+        try:
+            results.append(client.post(url, data).status_code)
+        finally:
+            connection.close()
+
+    def test_parallel_returns_and_holds_hand_each_copy_out_once(self):
+        requests = [
+            (self.admin_user, return_url(borrowing), {})
+            for borrowing in self.borrowings
+        ] + [(patron, HOLD_URL, {"book": self.book.id}) for patron in self.patrons]
+        barrier = threading.Barrier(len(requests))
+        results = []
+        threads = [
+            threading.Thread(
+                target=self._request, args=(user, url, data, barrier, results)
+            )
+            for user, url, data in requests
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            sorted(results),
+            [status.HTTP_200_OK] * self.RETURNS
+            + [status.HTTP_201_CREATED] * self.HOLDS,
+        )
+        self.book.refresh_from_db()
+        ready = Hold.objects.ready().count()
+        waiting = Hold.objects.waiting().count()
+        # Every returned copy is either on the shelf or set aside for
+        # exactly one hold, and no hold waits while a copy sits on the shelf.
+        self.assertEqual(ready + self.book.inventory, self.RETURNS)
+        self.assertEqual(ready, min(self.RETURNS, self.HOLDS))
+        self.assertEqual(waiting, self.HOLDS - ready)
+        self.assertEqual(self.book.inventory, 0)
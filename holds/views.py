@@ -0,0 +1,46 @@
+from django.db import IntegrityError, transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework import mixins, permissions, serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from holds.models import Hold
+from holds.queue import cancel_hold, place_hold
+from holds.serializers import DUPLICATE_HOLD_MESSAGE, HoldSerializer
+
+
+class HoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = Hold.objects.all()
+    serializer_class = HoldSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Hold.objects.order_by("id")
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user_id=self.request.user.id)
+        return queryset
+
+    def perform_create(self, serializer):
+        """Ready at once when a copy is in stock, queued otherwise"""
+        try:
+            with transaction.atomic():
+                serializer.instance = place_hold(
+                    self.request.user.id, serializer.validated_data["book"].pk
+                )
+        except IntegrityError:
+            # A concurrent request opened the same hold after validation.
+            raise serializers.ValidationError({"book": [DUPLICATE_HOLD_MESSAGE]})
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["POST"], url_path="cancel", url_name="cancel")
+    def cancel(self, request, pk=None):
+        """Leaves the queue, passing a set-aside copy on to the next hold"""
+        hold = self.get_object()
+        with transaction.atomic():
+            cancel_hold(hold)
+        return Response(self.get_serializer(hold).data)
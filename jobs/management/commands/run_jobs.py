@@ -0,0 +1,87 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import stop_on_signals, work, worker_process
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs with a pool of worker processes. Runs "
+        "until stopped, or until the queue is drained with --burst."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=settings.JOB_WORKER_PROCESSES,
+            help="Worker processes to fork; 1 runs jobs in this process",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10,
+            help="Jobs each worker claims at a time",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before looking for jobs again",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no jobs are due instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        worker_args = (
+            options["batch_size"],
+            options["poll_interval"],
+            options["burst"],
+        )
+        if options["processes"] == 1:
+            succeeded, failed = work(*worker_args, stop=stop_on_signals())
+        else:
+            succeeded, failed = self.run_pool(options["processes"], worker_args)
+        self.stdout.write(
+            self.style.SUCCESS(f"Ran {succeeded + failed} jobs, {failed} failed.")
+        )
+
+    def run_pool(self, processes, worker_args):
+        # Forked workers must open their own database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        results = context.SimpleQueue()
+        workers = [
+            context.Process(
+                target=worker_process,
+                args=(*worker_args, results),
+                name=f"jobs-worker-{index}",
+            )
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        def stop_workers(*args):
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+
+        signal.signal(signal.SIGTERM, stop_workers)
+        signal.signal(signal.SIGINT, stop_workers)
+        for worker in workers:
+            worker.join()
+
+        succeeded = failed = 0
+        while not results.empty():
+            worker_succeeded, worker_failed = results.get()
+            succeeded += worker_succeeded
+            failed += worker_failed
+        return succeeded, failed
@@ -0,0 +1,65 @@
+from django.db import models
+
+
+class JobQuerySet(models.QuerySet):
+    def due(self, now):
+        """Queued jobs whose time has come and running jobs whose lease ran out"""
+        return self.filter(
+            models.Q(status=Job.Status.QUEUED, run_after__lte=now)
+            | models.Q(status=Job.Status.RUNNING, locked_until__lt=now)
+        )
+
+
+class Job(models.Model):
+    """
+    A deferred call of the registered task `task` with `payload` as keyword
+    arguments. Workers claim it by setting `locked_by` and hold it until
+    `locked_until`; past that it is handed to another worker.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED"
+        RUNNING = "RUNNING"
+        SUCCEEDED = "SUCCEEDED"
+        FAILED = "FAILED"
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Enqueueing a key that is already present is a no-op.
+    idempotency_key = models.CharField(max_length=100, unique=True, null=True)
+    status = models.CharField(
+        max_length=9, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The queue: the next jobs to claim are the first entries.
+            models.Index(
+                fields=["run_after", "id"],
+                name="job_queue_idx",
+                condition=models.Q(status="QUEUED"),
+            ),
+            models.Index(
+                fields=["locked_until"],
+                name="job_lease_idx",
+                condition=models.Q(status="RUNNING"),
+            ),
+            models.Index(
+                fields=["locked_by"],
+                name="job_claim_idx",
+                condition=models.Q(status="RUNNING"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
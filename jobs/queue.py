@@ -0,0 +1,188 @@
+"""
+A database-backed job queue.
+
+Requests enqueue work inside the transaction that makes the change the
+work follows from, as an outbox: the job row commits or rolls back with
+that change, so workers see it exactly when the change commits and a crash
+cannot lose it in between. Workers (`run_jobs`) claim batches with one
+UPDATE whose subquery selects due jobs with
+`select_for_update(skip_locked=True)`. Concurrent workers take different
+jobs instead of queueing behind each other's row locks, and on SQLite, which
+has no row locks, the claim is a single write. Each claim is tagged with a
+token that the worker then reads its jobs back by.
+
+A job runs in a transaction that first renews its lease and ends by marking
+it succeeded, so its database effects commit exactly once: a failure, or a
+lease lost to another worker, rolls them back. Failed jobs are retried with
+exponential backoff until `max_attempts`. Effects outside the database, such
+as emails, happen at least once and should be keyed on the job.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+class LeaseLost(Exception):
+    """Another worker reclaimed the job while it ran"""
+
+
+def task(name):
+    """Registers the decorated function as the task `name`"""
+
+    def register(func):
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def idempotency_key(task_name, *parts):
+    """A key for `task_name` that is the same for the same `parts`"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:40]
+    return f"{task_name}:{digest}"
+
+
+def enqueue(task_name, payload=None, key=None, delay=None, max_attempts=None):
+    """
+    Queues a call of `task_name` with `payload` as keyword arguments, to
+    run after `delay`. Does nothing if a job with `key` already exists.
+    Call it in the transaction the job belongs to.
+    """
+    job = Job(
+        task=task_name,
+        payload=payload or {},
+        idempotency_key=key,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+
+
+def discard_jobs(*task_names):
+    """
+    Deletes the queued and running jobs of `task_names`, for callers that
+    redo their work. A running job loses its lease and rolls back.
+    Returns the number of jobs deleted.
+    """
+    deleted, _ = Job.objects.filter(
+        task__in=task_names, status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+    ).delete()
+    return deleted
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_expiry(now=None):
+    return (now or timezone.now()) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+def claim_jobs(worker, limit):
+    """Claims up to `limit` due jobs for `worker`, oldest first"""
+    now = timezone.now()
+    token = f"{worker}:{uuid.uuid4().hex[:12]}"[-100:]
+    due = (
+        Job.objects.due(now)
+        .order_by("run_after", "id")
+        .select_for_update(skip_locked=True)
+        .values("pk")[:limit]
+    )
+    with transaction.atomic():
+        claimed = Job.objects.filter(pk__in=due).update(
+            status=Job.Status.RUNNING,
+            locked_by=token,
+            locked_until=lease_expiry(now),
+            attempts=F("attempts") + 1,
+        )
+    if not claimed:
+        return []
+    return list(
+        Job.objects.filter(status=Job.Status.RUNNING, locked_by=token).order_by(
+            "run_after", "id"
+        )
+    )
+
+
+def release_jobs(jobs):
+    """Hands claimed jobs that were never started back to the queue"""
+    for job in jobs:
+        Job.objects.filter(
+            pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+        ).update(
+            status=Job.Status.QUEUED,
+            attempts=F("attempts") - 1,
+            locked_until=None,
+        )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """Runs a claimed job and records the outcome. Returns True on success."""
+    held = Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    )
+    try:
+        with transaction.atomic():
+            # Renewing the lease first makes the transaction start with a
+            # write, so SQLite takes its write lock up front and queues on
+            # the busy timeout instead of failing mid-transaction. On other
+            # databases it locks the job row against reclaiming workers.
+            if not held.update(locked_until=lease_expiry()):
+                raise LeaseLost
+            if job.attempts > job.max_attempts:
+                raise RuntimeError("Out of attempts; the last worker lost its lease")
+            func = TASKS.get(job.task)
+            if func is None:
+                raise LookupError(f"Unknown task {job.task!r}")
+            func(**job.payload)
+            finished = held.update(
+                status=Job.Status.SUCCEEDED,
+                finished=timezone.now(),
+                locked_until=None,
+                last_error="",
+            )
+            if not finished:
+                raise LeaseLost
+        return True
+    except LeaseLost:
+        logger.warning("Lost the lease on %s; its effects were rolled back", job)
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            held.update(
+                status=Job.Status.QUEUED,
+                run_after=timezone.now() + retry_delay(job.attempts),
+                locked_until=None,
+                last_error=error,
+            )
+            logger.warning("%s failed, will retry:\n%s", job, error)
+        else:
+            held.update(
+                status=Job.Status.FAILED,
+                finished=timezone.now(),
+                locked_until=None,
+                last_error=error,
+            )
+            logger.error("%s failed for good:\n%s", job, error)
+        return False
@@ -0,0 +1,159 @@
+import io
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from books.models import Book
+from jobs.models import Job
+from jobs.queue import (
+    claim_jobs,
+    enqueue,
+    idempotency_key,
+    release_jobs,
+    run_job,
+    task,
+)
+
+calls = Counter()
+
+
+@task("jobs.tests.add_book")
+def add_book(title, fail_times=0):
+    Book.objects.create(
+        title=title, author="Author", cover="Soft", inventory=1, daily_fee="1"
+    )
+    calls[title] += 1
+    if calls[title] <= fail_times:
+        raise ValueError(f"Failure {calls[title]} of {title}")
+
+
+def titles():
+    return sorted(Book.objects.values_list("title", flat=True))
+
+
+@override_settings(JOB_MAX_ATTEMPTS=3, JOB_RETRY_DELAY=10)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_jobs(self):
+        for job in claim_jobs("worker", 10):
+            run_job(job)
+
+    def test_duplicate_keys_are_enqueued_once(self):
+        key = idempotency_key("jobs.tests.add_book", 1, 2)
+        self.assertEqual(key, idempotency_key("jobs.tests.add_book", 1, 2))
+        self.assertNotEqual(key, idempotency_key("jobs.tests.add_book", 1, 3))
+        enqueue("jobs.tests.add_book", {"title": "A"}, key=key)
+        enqueue("jobs.tests.add_book", {"title": "B"}, key=key)
+        enqueue("jobs.tests.add_book", {"title": "C"})
+        self.assertEqual(
+            sorted(Job.objects.values_list("payload__title", flat=True)), ["A", "C"]
+        )
+
+    def test_jobs_commit_and_roll_back_with_their_transaction(self):
+        try:
+            with transaction.atomic():
+                enqueue("jobs.tests.add_book", {"title": "Rolled back"})
+                raise ValueError
+        except ValueError:
+            pass
+        with transaction.atomic():
+            enqueue("jobs.tests.add_book", {"title": "Committed"})
+        self.assertEqual(Job.objects.get().payload, {"title": "Committed"})
+
+    def test_claimed_jobs_run_and_succeed(self):
+        enqueue("jobs.tests.add_book", {"title": "A"})
+        enqueue("jobs.tests.add_book", {"title": "Later"}, delay=timedelta(hours=1))
+        self.run_jobs()
+        self.assertEqual(titles(), ["A"])
+        job = Job.objects.get(payload__title="A")
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(
+            Job.objects.get(payload__title="Later").status, Job.Status.QUEUED
+        )
+
+    def test_failures_roll_back_and_retry_with_backoff(self):
+        enqueue("jobs.tests.add_book", {"title": "A", "fail_times": 1})
+        self.run_jobs()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("Failure 1 of A", job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=9))
+        self.assertEqual(titles(), [])
+
+        Job.objects.update(run_after=timezone.now())
+        self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(titles(), ["A"])
+
+    def test_jobs_fail_for_good_after_max_attempts(self):
+        enqueue("jobs.tests.add_book", {"title": "A", "fail_times": 99})
+        enqueue("jobs.tests.missing", {})
+        for _ in range(3):
+            Job.objects.update(run_after=timezone.now())
+            self.run_jobs()
+        self.assertEqual(
+            set(Job.objects.values_list("status", "attempts")),
+            {(Job.Status.FAILED, 3)},
+        )
+        self.assertIn(
+            "Unknown task", Job.objects.get(task="jobs.tests.missing").last_error
+        )
+        self.assertEqual(titles(), [])
+
+    def test_expired_lease_hands_the_job_to_another_worker(self):
+        enqueue("jobs.tests.add_book", {"title": "A"})
+        [stalled] = claim_jobs("stalled", 10)
+        self.assertEqual(claim_jobs("other", 10), [])
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        [reclaimed] = claim_jobs("other", 10)
+        self.assertEqual(reclaimed.attempts, 2)
+
+        # The stalled worker's late run must not count.
+        self.assertFalse(run_job(stalled))
+        self.assertEqual(titles(), [])
+        self.assertTrue(run_job(reclaimed))
+        self.assertEqual(titles(), ["A"])
+
+    def test_released_jobs_go_back_to_the_queue(self):
+        enqueue("jobs.tests.add_book", {"title": "A"})
+        release_jobs(claim_jobs("worker", 10))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 0))
+
+    def test_run_jobs_burst(self):
+        for title in ("A", "B", "C"):
+            enqueue("jobs.tests.add_book", {"title": title})
+        out = io.StringIO()
+        call_command("run_jobs", burst=True, processes=1, batch_size=2, stdout=out)
+        self.assertIn("Ran 3 jobs, 0 failed.", out.getvalue())
+        self.assertEqual(titles(), ["A", "B", "C"])
+
+
+class WorkerPoolTests(TransactionTestCase):
+    JOBS = 40
+
+    def test_processes_run_every_job_exactly_once(self):
+        for i in range(self.JOBS):
+            enqueue("jobs.tests.add_book", {"title": f"Book {i:02}"})
+        out = io.StringIO()
+        call_command("run_jobs", burst=True, processes=3, batch_size=2, stdout=out)
+
+        self.assertIn(f"Ran {self.JOBS} jobs, 0 failed.", out.getvalue())
+        self.assertEqual(titles(), [f"Book {i:02}" for i in range(self.JOBS)])
+        self.assertEqual(
+            set(Job.objects.values_list("status", "attempts")),
+            {(Job.Status.SUCCEEDED, 1)},
+        )
+        # Every worker claimed with its own process id.
+        workers = set(Job.objects.values_list("locked_by", flat=True))
+        self.assertGreater(len({worker.split(":")[1] for worker in workers}), 1)
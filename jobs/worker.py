@@ -0,0 +1,53 @@
+"""
+The worker loop behind `manage.py run_jobs`. Each worker process claims a
+batch of due jobs, runs them one by one and polls again. SIGTERM and SIGINT
+let the current job finish and hand the rest of the batch back.
+"""
+
+import signal
+import threading
+
+from django.db import close_old_connections
+
+from jobs.queue import claim_jobs, release_jobs, run_job, worker_name
+
+
+def work(batch_size, poll_interval, burst=False, stop=None):
+    """
+    Runs jobs until `stop` is set or, with `burst`, until none are due.
+    Returns the numbers of jobs that succeeded and failed.
+    """
+    stop = stop or threading.Event()
+    worker = worker_name()
+    succeeded = failed = 0
+    while not stop.is_set():
+        jobs = claim_jobs(worker, batch_size)
+        if not jobs:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            # Drop connections that went stale or too old while idle.
+            close_old_connections()
+            continue
+        for index, job in enumerate(jobs):
+            if stop.is_set():
+                release_jobs(jobs[index:])
+                break
+            if run_job(job):
+                succeeded += 1
+            else:
+                failed += 1
+    return succeeded, failed
+
+
+def stop_on_signals():
+    """An event set by SIGTERM or SIGINT"""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: stop.set())
+    return stop
+
+
+def worker_process(batch_size, poll_interval, burst, results):
+    """Entry point of a forked worker; reports its counts on `results`"""
+    results.put(work(batch_size, poll_interval, burst, stop_on_signals()))
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class LibraryServiceConfig(AppConfig):
+    name = "library_service"
+
+    def ready(self):
+        from library_service import db  # noqa: F401
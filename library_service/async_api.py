@@ -0,0 +1,62 @@
+"""
+Helpers for read-only API endpoints written as plain Django async views.
+
+DRF 3.14 views are synchronous, so under ASGI every DRF request holds a
+worker thread. These views authenticate with the async path of the project's
+JWT authenticator, query with the async ORM and reuse DRF serializers only
+to shape already loaded rows, which never touches the database.
+"""
+
+import functools
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from library_service.metrics import serializing
+from users.authentication import StatelessJWTAuthentication
+
+
+def error_response(exc, authenticate_header=None):
+    """Renders an APIException the way DRF's exception handler would"""
+    detail = exc.detail
+    if not isinstance(detail, (list, dict)):
+        detail = {"detail": detail}
+    response = JsonResponse(detail, status=exc.status_code, safe=False)
+    auth_errors = (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    if authenticate_header and isinstance(exc, auth_errors):
+        response["WWW-Authenticate"] = authenticate_header
+    return response
+
+
+def async_api_view(login_required=False):
+    """
+    Turns `async def view(request, ...)` returning JSON-ready data into a
+    GET/HEAD endpoint. The view gets a DRF `Request` whose `user` comes from
+    the JWT; DRF exceptions and Http404 become JSON error responses.
+    """
+
+    def decorator(view_func):
+        @require_safe
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            authenticator = StatelessJWTAuthentication()
+            request = Request(request)
+            try:
+                result = await authenticator.aauthenticate(request)
+                request.user = result[0] if result else AnonymousUser()
+                if login_required and not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                data = await view_func(request, *args, **kwargs)
+            except Http404:
+                return error_response(exceptions.NotFound())
+            except exceptions.APIException as exc:
+                return error_response(exc, authenticator.authenticate_header(request))
+            with serializing():
+                return JsonResponse(data)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,67 @@
+"""
+CSV and JSON Lines helpers shared by the bulk imports and exports.
+
+Rows are read and written one at a time so callers can stream files of any
+size; what a row means is left to the importing or exporting app.
+"""
+
+import csv
+import io
+import json
+
+FORMATS = ["csv", "jsonl"]
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename, default="csv"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return default
+
+
+def read_rows(stream, file_format):
+    """Yield `(line_number, row_dict)` pairs from a text stream."""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, exc
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+
+def open_text(binary_file, encoding="utf-8"):
+    """Wrap an uploaded or opened binary file for line-by-line text reads."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+
+
+class _Echo:
+    """File-like object whose write() just hands the value back."""
+
+    def write(self, value):
+        return value
+
+
+def write_rows(file_format, fields, rows):
+    """Yield `rows` of `fields` values as CSV or JSON Lines text, one at a time."""
+    if file_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+    elif file_format == "jsonl":
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), default=str) + "\n"
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
@@ -0,0 +1,69 @@
+"""
+Database connection setup and read-replica routing.
+
+SQLite connections get the pragmas in `SQLITE_PRAGMAS` as they open. WAL
+lets readers and a writer work at the same time, and `synchronous=NORMAL`
+syncs only at checkpoints. `busy_timeout` makes writers queue instead of
+failing, and `mmap_size` serves reads from the page cache.
+
+When a `replica` database is configured, `ReplicaRouter` sends it the reads
+made while a `ReplicaReadMixin` view handles a GET, HEAD or OPTIONS
+request. All writes, and every other read, go to `default`.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DB_ALIAS = "replica"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Routes the reads made inside the block to the replica"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return REPLICA_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Serves the view's read-only requests from the read replica"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request.method in SAFE_METHODS):
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,56 @@
+"""
+OpenAPI schema serving, kept off the startup path.
+
+`urls.py` routes the docs views lazily, so this module and drf-spectacular's
+view and generator machinery load on the first docs request. The schema
+does not change while a process runs, so `CachedSchemaView` generates each
+variant once. With `OPENAPI_SCHEMA_FILE` pointing at a file built by
+
+    python manage.py spectacular --format openapi-json --file openapi.json
+
+the default variant is read from that file instead of generated.
+"""
+
+import json
+import threading
+
+from django.conf import settings
+from django.utils import translation
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.response import Response
+
+
+class CachedSchemaView(SpectacularAPIView):
+    _schemas = {}
+    _lock = threading.Lock()
+
+    def _get_schema_response(self, request):
+        if not self.serve_public:
+            # The schema depends on the user's permissions.
+            return super()._get_schema_response(request)
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        key = (self.urlconf, version, translation.get_language())
+        schema = self._schemas.get(key)
+        if schema is None:
+            with self._lock:
+                schema = self._schemas.get(key)
+                if schema is None:
+                    schema = self._schemas[key] = self.build_schema(request, key)
+        filename = self._get_filename(request, version)
+        return Response(
+            data=schema,
+            headers={"Content-Disposition": f'inline; filename="{filename}"'},
+        )
+
+    def build_schema(self, request, key):
+        urlconf, version, language = key
+        default = (urlconf, version, language) == (None, None, settings.LANGUAGE_CODE)
+        if default and settings.OPENAPI_SCHEMA_FILE:
+            with open(settings.OPENAPI_SCHEMA_FILE) as schema_file:
+                return json.load(schema_file)
+        generator = self.generator_class(
+            urlconf=urlconf, api_version=version, patterns=self.patterns
+        )
+        return generator.get_schema(request=request, public=True)
@@ -0,0 +1,307 @@
+"""
+Request-level performance metrics.
+
+`RequestMetricsMiddleware` records, for each view and action (for example
+`BorrowingListView.list` or `BookViewSet.retrieve`):
+
+- the wall time;
+- the number of queries and the time spent in them, counted with
+  `connection.execute_wrapper` on every database alias;
+- the serialization time, covering the list pages' serializers (timed by
+  the views through `serializing()`), the async views' JSON encoding and
+  the rendering of DRF responses, minus any queries they trigger.
+
+Metrics are off unless `REQUEST_METRICS` is set; the middleware then drops
+out of the stack and no query wrapper is installed.
+
+The results are aggregated into in-process histograms, so each worker
+process reports its own. They are served in the Prometheus text format by
+`MetricsView`. Under ASGI the wrappers are installed on the request's
+thread-sensitive executor thread, where sync views and the async ORM run
+their queries.
+
+With `SLOW_QUERY_MS` set, queries slower than that are logged to
+`library_service.slow_queries` together with the project frames of the
+stack that issued them.
+"""
+
+import logging
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+slow_query_logger = logging.getLogger("library_service.slow_queries")
+
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+METRICS = (
+    (
+        "library_request_duration_seconds",
+        "Wall time of the request",
+        "duration",
+        DURATION_BUCKETS,
+    ),
+    (
+        "library_request_db_queries",
+        "Database queries per request",
+        "queries",
+        QUERY_BUCKETS,
+    ),
+    (
+        "library_request_db_duration_seconds",
+        "Time spent in database queries",
+        "db_time",
+        DURATION_BUCKETS,
+    ),
+    (
+        "library_request_serialization_seconds",
+        "Time spent serializing and rendering the response",
+        "serialization_time",
+        DURATION_BUCKETS,
+    ),
+)
+
+_collector = ContextVar("request_metrics", default=None)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram; not thread-safe on its own."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """Histograms of every metric in METRICS, per view label."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, view, collector):
+        with self._lock:
+            for name, _, attribute, buckets in METRICS:
+                histogram = self._histograms.get((name, view))
+                if histogram is None:
+                    histogram = self._histograms[(name, view)] = Histogram(buckets)
+                histogram.observe(getattr(collector, attribute))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """The histograms in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, help_text, _, _ in METRICS:
+                lines.append(f"# HELP {name} {help_text}.")
+                lines.append(f"# TYPE {name} histogram")
+                views = sorted(
+                    view for metric, view in self._histograms if metric == name
+                )
+                for view in views:
+                    histogram = self._histograms[(name, view)]
+                    label = f'view="{view}"'
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {total}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def project_stack():
+    """The current stack, limited to frames from the project's own code"""
+    root = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(root) and "site-packages" not in frame.filename
+    ]
+    return "".join(traceback.format_list(frames))
+
+
+class RequestCollector:
+    """Per-request counters; also the `execute_wrapper` that fills them."""
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.duration = 0.0
+        self._serializing = 0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            threshold = settings.SLOW_QUERY_MS
+            if threshold and elapsed * 1000 >= threshold:
+                slow_query_logger.warning(
+                    "Slow query (%.1f ms) in %s: %s\nParams: %r\n%s",
+                    elapsed * 1000,
+                    self.view or "unresolved view",
+                    sql,
+                    params,
+                    project_stack(),
+                )
+
+    @contextmanager
+    def serializing(self):
+        """Times the outermost serialization span, excluding its queries"""
+        self._serializing += 1
+        started = time.perf_counter()
+        db_time = self.db_time
+        try:
+            yield
+        finally:
+            self._serializing -= 1
+            if not self._serializing:
+                elapsed = time.perf_counter() - started
+                self.serialization_time += elapsed - (self.db_time - db_time)
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response):
+        if self._render_started is not None:
+            self.serialization_time += time.perf_counter() - self._render_started
+            self._render_started = None
+
+
+@contextmanager
+def serializing():
+    """Counts the block as serialization time of the current request, if any"""
+    collector = _collector.get()
+    if collector is None:
+        yield
+        return
+    with collector.serializing():
+        yield
+
+
+@contextmanager
+def wrap_connections(collector):
+    """Runs `collector` around every query on this thread's connections"""
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(collector))
+        yield
+
+
+def view_label(view_func, request):
+    """`Class.action` for DRF views, the function name for plain views"""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return getattr(view_func, "__name__", type(view_func).__name__)
+    method = request.method.lower()
+    actions = getattr(view_func, "actions", None)
+    action = actions.get(method, method) if actions else method
+    return f"{view_class.__name__}.{action}"
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS:
+            return self.get_response(request)
+        collector = RequestCollector()
+        token = _collector.set(collector)
+        started = time.perf_counter()
+        try:
+            with wrap_connections(collector):
+                response = self.get_response(request)
+        finally:
+            _collector.reset(token)
+        self.record(collector, started)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS:
+            return await self.get_response(request)
+        collector = RequestCollector()
+        token = _collector.set(collector)
+        started = time.perf_counter()
+        wrappers = wrap_connections(collector)
+        await sync_to_async(wrappers.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.__exit__)(None, None, None)
+            _collector.reset(token)
+        self.record(collector, started)
+        return response
+
+    def record(self, collector, started):
+        collector.duration = time.perf_counter() - started
+        if collector.view is not None:
+            registry.record(collector.view, collector)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        collector = _collector.get()
+        if collector is not None:
+            collector.view = view_label(view_func, request)
+
+    def process_template_response(self, request, response):
+        collector = _collector.get()
+        if collector is not None:
+            collector.render_started()
+            response.add_post_render_callback(collector.render_finished)
+        return response
@@ -0,0 +1,60 @@
+"""
+Middleware that only the browser-facing site needs.
+
+The API authenticates every request with a JWT and answers in JSON, so
+sessions, CSRF checks and messages do nothing for it but cost time. The
+classes here subclass Django's own and skip them for paths under
+`API_PATH_PREFIX`; the admin keeps the full stack. X-Frame-Options is only
+left off JSON responses, so the Swagger UI and the browsable API under the
+prefix can still not be framed.
+"""
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import clickjacking, csrf
+
+
+class SiteOnlyMixin:
+    """Passes API requests straight to the next middleware"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.api_prefix = settings.API_PATH_PREFIX
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefix)
+
+    def __call__(self, request):
+        if self.is_api(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SiteOnlyMixin, sessions.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SiteOnlyMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if self.is_api(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(SiteOnlyMixin, auth.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SiteOnlyMixin, messages.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(clickjacking.XFrameOptionsMiddleware):
+    """Sets the header on every response a browser could render as a page"""
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("application/json"):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,91 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Keyset pagination over the primary key, without a COUNT(*) per page."""
+
+    ordering = "id"
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination by default, switching to keyset pagination
+    when the client asks for it with `?pagination=cursor` or follows a
+    `cursor` link from a previous page.
+    """
+
+    cursor_pagination_class = KeysetCursorPagination
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        cursor_parameters = [
+            parameter
+            for parameter in self.cursor_pagination_class().get_schema_operation_parameters(
+                view
+            )
+            if parameter["name"] != self.cursor_pagination_class.page_size_query_param
+        ]
+        return [
+            *super().get_schema_operation_parameters(view),
+            *cursor_parameters,
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' for keyset pagination without a total count.",
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+        ]
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination for plain Django async views, counting and
+    fetching the page with the async ORM. `request` is a DRF `Request`
+    wrapping the Django one.
+    """
+
+    async def apaginate_queryset(self, queryset, request):
+        self.limit = self.get_limit(request)
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        self.request = request
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset : self.offset + self.limit]]
+
+    def get_paginated_data(self, data):
+        return {
+            "count": self.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
@@ -0,0 +1,14 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Plain text in the Prometheus exposition format; errors as their detail"""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = f"{data.get('detail', data)}\n"
+        return data.encode(self.charset)
@@ -0,0 +1,11 @@
+from drf_spectacular import generators
+
+# Registers the JWT authentication extension with drf-spectacular.
+from users import schema  # noqa: F401
+
+
+class SchemaGenerator(generators.SchemaGenerator):
+    """
+    The project's DEFAULT_GENERATOR_CLASS. Importing it loads the schema
+    extensions, so they stay out of startup and load with the generator.
+    """
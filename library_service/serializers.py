@@ -0,0 +1,107 @@
+"""
+Read-only serializers for list endpoints that shape `.values()` rows.
+
+A `ModelSerializer` walks its bound fields for every attribute of every
+instance. `ValuesSerializer` subclasses instead declare their output keys
+once and build each dict with one converter call per field, producing the
+same representation as the DRF fields they stand in for.
+"""
+
+from decimal import Decimal
+from operator import itemgetter
+
+from rest_framework.response import Response
+
+from library_service.metrics import serializing
+
+
+def iso_date(value):
+    """`serializers.DateField` output with the default ISO 8601 format"""
+    return None if value is None else value.isoformat()
+
+
+def decimal_string(decimal_places):
+    """`serializers.DecimalField` output with COERCE_DECIMAL_TO_STRING"""
+    exponent = Decimal(1).scaleb(-decimal_places)
+
+    def to_string(value):
+        if value is None:
+            return ""
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return "{:f}".format(value.quantize(exponent))
+
+    return to_string
+
+
+class ValuesSerializer:
+    """
+    Serializes `.values()` rows into dicts keyed by `fields`, in order.
+
+    Columns listed in `converters` are passed through their converter;
+    keys listed in `computed` are not selected and are derived from the
+    whole row instead.
+    """
+
+    fields = ()
+    converters = {}
+    computed = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        getters = []
+        for name in cls.fields:
+            if name in cls.computed:
+                getters.append((name, cls.computed[name]))
+            elif name in cls.converters:
+                getters.append((name, cls._convert(name, cls.converters[name])))
+            else:
+                getters.append((name, itemgetter(name)))
+        cls._getters = tuple(getters)
+
+    @staticmethod
+    def _convert(name, converter):
+        return lambda row: converter(row[name])
+
+    def __init__(self, instance=None, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def columns(cls):
+        return [name for name in cls.fields if name not in cls.computed]
+
+    @classmethod
+    def values(cls, queryset):
+        """Narrows `queryset` to the rows this serializer reads"""
+        return queryset.values(*cls.columns())
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self._getters}
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class ValuesListModelMixin:
+    """
+    Replaces `ListModelMixin.list` with one that pages `.values()` rows
+    through `values_serializer_class`. Other actions keep the regular
+    serializer, which stays the documented schema of the list.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        with serializing():
+            data = serializer_class(rows, many=True).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
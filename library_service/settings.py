@@ -12,13 +12,17 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 import os
 from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv()
+# Deployments pass the environment directly; only import dotenv for a .env.
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
@@ -42,21 +46,31 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "drf_spectacular",
     "rest_framework",
+    "library_service",
     "books",
     "users",
     "borrowings",
+    "payments",
+    "stats",
+    "holds",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "library_service.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "library_service.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "library_service.middleware.CsrfViewMiddleware",
+    "library_service.middleware.AuthenticationMiddleware",
+    "library_service.middleware.MessageMiddleware",
+    "library_service.middleware.XFrameOptionsMiddleware",
 ]
 
+# Sessions, CSRF and messages are skipped for requests under this prefix;
+# see library_service.middleware.
+API_PATH_PREFIX = "/api/"
+
 ROOT_URLCONF = "library_service.urls"
 
 TEMPLATES = [
@@ -82,10 +96,65 @@ WSGI_APPLICATION = "library_service.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "ENGINE": os.environ.get("DJANGO_DB_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.environ.get("DJANGO_DB_NAME", BASE_DIR / "db.sqlite3"),
+        "USER": os.environ.get("DJANGO_DB_USER", ""),
+        "PASSWORD": os.environ.get("DJANGO_DB_PASSWORD", ""),
+        "HOST": os.environ.get("DJANGO_DB_HOST", ""),
+        "PORT": os.environ.get("DJANGO_DB_PORT", ""),
+        # Reuse each worker's connection for up to a minute instead of
+        # reconnecting per request, checking it is still alive first. Under
+        # ASGI prefer 0 and the database's own pooling.
+        "CONN_MAX_AGE": int(os.environ.get("DJANGO_DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        # A file-backed test database lets concurrent test threads wait on
+        # SQLite's busy timeout instead of failing on shared-cache locks.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
+if DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+    DATABASES["default"]["TEST"] = {}
+
+# Optional read replica for the GET traffic of the book and borrowing views;
+# it shares the primary's credentials unless overridden.
+if os.environ.get("DJANGO_DB_REPLICA_HOST") or os.environ.get("DJANGO_DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get("DJANGO_DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "HOST": os.environ.get("DJANGO_DB_REPLICA_HOST", DATABASES["default"]["HOST"]),
+        "PORT": os.environ.get("DJANGO_DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["library_service.db.ReplicaRouter"]
+
+# Applied to every new SQLite connection by library_service.db.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("DJANGO_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("DJANGO_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory is per process; point DJANGO_CACHE_DIR at a shared directory
+# so catalog invalidation reaches every worker on the host.
+
+if os.environ.get("DJANGO_CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["DJANGO_CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+CATALOG_CACHE_TIMEOUT = 60 * 15
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -105,6 +174,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# The first hasher is used for new passwords; stored hashes made by any other
+# listed hasher, or with a different work factor, are upgraded on login.
+
+PASSWORD_HASHERS = [
+    "users.hashers.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.environ.get("DJANGO_PASSWORD_HASHER"):
+    PASSWORD_HASHERS.insert(0, os.environ["DJANGO_PASSWORD_HASHER"])
+
+# PBKDF2 iterations; unset keeps Django's default for this release.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("DJANGO_PASSWORD_HASH_ITERATIONS", 0))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -128,23 +215,66 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.StatelessJWTAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "library_service.pagination.LimitOffsetOrCursorPagination",
     "PAGE_SIZE": 24,
 }
 
+# Production sets DJANGO_BROWSABLE_API=0 to answer in JSON only.
+if os.environ.get("DJANGO_BROWSABLE_API", "1" if DEBUG else "0") != "0":
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "rest_framework.renderers.BrowsableAPIRenderer"
+    )
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Library API",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "DEFAULT_GENERATOR_CLASS": "library_service.schema.SchemaGenerator",
 }
 
+# Schema built with `manage.py spectacular --format openapi-json`, served at
+# /api/doc/ instead of generating it on the first request.
+OPENAPI_SCHEMA_FILE = os.environ.get("DJANGO_OPENAPI_SCHEMA_FILE")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.ClaimsTokenObtainPairSerializer",
 }
 
+# In-process cache of user rows used by JWT authentication; revocations and
+# deactivations reach other worker processes within USER_CACHE_TTL seconds.
+USER_CACHE_MAX_SIZE = 1024
+USER_CACHE_TTL = 60
+
 AUTH_USER_MODEL = "users.User"
+
+# Most unreturned borrowings a patron may hold at once.
+MAX_ACTIVE_BORROWINGS = int(os.environ.get("DJANGO_MAX_ACTIVE_BORROWINGS", 10))
+
+# Each overdue day costs the book's daily fee times this multiplier.
+FINE_MULTIPLIER = Decimal(os.environ.get("DJANGO_FINE_MULTIPLIER", "2"))
+
+# Days a patron has to collect a copy set aside for their hold.
+HOLD_PICKUP_DAYS = int(os.environ.get("DJANGO_HOLD_PICKUP_DAYS", 3))
+
+# Opt-in per-view latency, query and serialization histograms served at
+# /api/metrics/. Queries slower than SLOW_QUERY_MS (0 disables) are logged
+# with their stack to the "library_service.slow_queries" logger.
+REQUEST_METRICS = os.environ.get("DJANGO_REQUEST_METRICS", "0") != "0"
+SLOW_QUERY_MS = float(os.environ.get("DJANGO_SLOW_QUERY_MS", 0))
+
+# Background jobs (see jobs.queue). A job that keeps failing is retried
+# JOB_MAX_ATTEMPTS times, JOB_RETRY_DELAY seconds apart and doubling; one
+# whose worker dies is handed to another after JOB_LEASE_SECONDS.
+JOB_WORKER_PROCESSES = int(os.environ.get("DJANGO_JOB_WORKER_PROCESSES", 2))
+JOB_MAX_ATTEMPTS = int(os.environ.get("DJANGO_JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_DELAY = float(os.environ.get("DJANGO_JOB_RETRY_DELAY", 10))
+JOB_LEASE_SECONDS = int(os.environ.get("DJANGO_JOB_LEASE_SECONDS", 300))
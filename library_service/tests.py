@@ -0,0 +1,261 @@
+import json
+import tempfile
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from books.models import Book
+from library_service.docs import CachedSchemaView
+from library_service.db import REPLICA_DB_ALIAS, ReplicaRouter, replica_reads
+from library_service.metrics import Histogram, registry
+from library_service.schema import SchemaGenerator
+
+METRICS_URL = reverse("metrics")
+SCHEMA_URL = reverse("schema")
+OPENAPI_JSON = "application/vnd.oai.openapi+json"
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite pragmas")
+class SQLitePragmaTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connections_use_wal_and_relaxed_sync(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        # 1 is NORMAL.
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("mmap_size"), 256 * 1024 * 1024)
+
+
+class ReplicaRouterTest(TestCase):
+    def test_reads_go_to_replica_only_inside_replica_reads(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Book))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Book), REPLICA_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Book), "default")
+        self.assertIsNone(router.db_for_read(Book))
+
+    def test_replica_is_never_migrated(self):
+        router = ReplicaRouter()
+        self.assertFalse(router.allow_migrate(REPLICA_DB_ALIAS, "books"))
+        self.assertTrue(router.allow_migrate("default", "books"))
+
+    @override_settings(DATABASE_ROUTERS=["library_service.db.ReplicaRouter"])
+    def test_only_safe_requests_to_replica_views_read_from_replica(self):
+        routed = []
+        cache.clear()
+        client = APIClient()
+        user = get_user_model().objects.create_user(email="user@example.com")
+        client.force_authenticate(user=user)
+        book = Book.objects.create(
+            title="Book", author="Author", cover="Soft", inventory=1, daily_fee="1"
+        )
+        original = ReplicaRouter.db_for_read
+        with mock.patch.object(
+            ReplicaRouter,
+            "db_for_read",
+            autospec=True,
+            side_effect=lambda router, model, **hints: routed.append(
+                original(router, model, **hints)
+            ),
+        ):
+            client.get(reverse("books:book-detail", kwargs={"pk": book.pk}))
+            self.assertIn(REPLICA_DB_ALIAS, routed)
+
+            routed.clear()
+            client.post(
+                reverse("borrowings:borrowing-list"),
+                {"book": book.pk, "expected_return_date": "2030-01-01"},
+            )
+            self.assertTrue(routed)
+            self.assertNotIn(REPLICA_DB_ALIAS, routed)
+
+            routed.clear()
+            client.get(reverse("payments:payment-list"))
+            self.assertNotIn(REPLICA_DB_ALIAS, routed)
+
+
+class HistogramTest(TestCase):
+    def test_buckets_are_cumulative_and_inclusive(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 7):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 3), ("+Inf", 4)])
+        self.assertEqual(histogram.sum, 11)
+        self.assertEqual(histogram.count, 4)
+
+
+@override_settings(REQUEST_METRICS=True)
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.book = Book.objects.create(
+            title="Book", author="Author", cover="Soft", inventory=1, daily_fee="1"
+        )
+
+    def samples(self):
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_records_view_action_queries_and_timings(self):
+        self.client.get(reverse("books:book-list"))
+        self.client.get(reverse("books:book-list"), {"author": "Nobody"})
+        samples = self.samples()
+
+        label = 'view="BookViewSet.list"'
+        self.assertEqual(
+            samples[f"library_request_duration_seconds_count{{{label}}}"], 2
+        )
+        self.assertGreater(samples[f"library_request_db_queries_sum{{{label}}}"], 0)
+        self.assertGreater(
+            samples[f"library_request_db_duration_seconds_sum{{{label}}}"], 0
+        )
+        self.assertGreater(
+            samples[f"library_request_serialization_seconds_sum{{{label}}}"], 0
+        )
+        self.assertEqual(
+            samples[f'library_request_db_queries_bucket{{{label},le="+Inf"}}'], 2
+        )
+
+    async def test_async_views_record_their_queries(self):
+        response = await self.async_client.get(
+            reverse("books:book-detail-async", kwargs={"pk": self.book.pk})
+        )
+        self.assertEqual(response.status_code, 200)
+        samples = await sync_to_async(self.samples)()
+        self.assertEqual(
+            samples['library_request_db_queries_sum{view="book_detail"}'], 1
+        )
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_disabled_metrics_record_nothing(self):
+        self.client.get(reverse("books:book-list"))
+        self.assertNotIn(
+            'library_request_duration_seconds_count{view="BookViewSet.list"}',
+            self.samples(),
+        )
+
+    def test_only_admins_read_metrics(self):
+        user = get_user_model().objects.create_user(email="user@example.com")
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+    @override_settings(SLOW_QUERY_MS=1e-6)
+    def test_slow_queries_are_logged_with_sql_and_stack(self):
+        with self.assertLogs("library_service.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("books:book-detail", kwargs={"pk": self.book.pk}))
+        message = "\n".join(logs.output)
+        self.assertIn("BookViewSet.retrieve", message)
+        self.assertIn('FROM "books_book"', message)
+        self.assertIn("library_service/tests.py", message)
+
+
+class SiteOnlyMiddlewareTest(TestCase):
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", password="secret", is_staff=True
+        )
+
+    def test_api_requests_skip_session_csrf_and_frame_options(self):
+        response = self.client.get(reverse("books:book-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertNotIn("X-Frame-Options", response.headers)
+
+        response = self.client.post(
+            reverse("users:token_obtain_pair"),
+            {"email": "admin@example.com", "password": "secret"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.cookies)
+
+    def test_api_pages_keep_frame_options(self):
+        response = self.client.get(reverse("swagger-ui"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Frame-Options"], "DENY")
+
+    def test_admin_keeps_the_full_stack(self):
+        response = self.client.get(reverse("admin:login"))
+        self.assertEqual(response.headers["X-Frame-Options"], "DENY")
+        self.assertIn("csrftoken", response.cookies)
+
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(
+            reverse("admin:login"), {"username": "admin@example.com", "password": "x"}
+        )
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(self.admin_user)
+        self.assertEqual(self.client.get(reverse("admin:index")).status_code, 200)
+
+
+class CachedSchemaViewTest(TestCase):
+    def setUp(self):
+        CachedSchemaView._schemas.clear()
+
+    def test_schema_is_generated_once(self):
+        with mock.patch.object(
+            SchemaGenerator,
+            "get_schema",
+            autospec=True,
+            side_effect=SchemaGenerator.get_schema,
+        ) as get_schema:
+            first = self.client.get(SCHEMA_URL, HTTP_ACCEPT=OPENAPI_JSON)
+            second = self.client.get(SCHEMA_URL, HTTP_ACCEPT=OPENAPI_JSON)
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        schema = json.loads(first.content)
+        self.assertIn("/api/library/books/", schema["paths"])
+        # The lazily loaded generator still registers the JWT extension.
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+
+    def test_schema_builds_without_warnings(self):
+        # Both JWT authenticators get a security scheme of their own.
+        with tempfile.NamedTemporaryFile(suffix=".json") as schema_file:
+            call_command(
+                "spectacular",
+                "--fail-on-warn",
+                "--format=openapi-json",
+                f"--file={schema_file.name}",
+            )
+            schemes = json.load(schema_file)["components"]["securitySchemes"]
+        self.assertEqual(set(schemes), {"jwtAuth", "jwtUserAuth"})
+
+    def test_prebuilt_schema_file_is_served(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as schema_file:
+            json.dump({"openapi": "3.0.3", "info": {"title": "Prebuilt"}}, schema_file)
+            schema_file.flush()
+            with override_settings(
+                OPENAPI_SCHEMA_FILE=schema_file.name
+            ), mock.patch.object(SchemaGenerator, "get_schema") as get_schema:
+                response = self.client.get(SCHEMA_URL, HTTP_ACCEPT=OPENAPI_JSON)
+        get_schema.assert_not_called()
+        self.assertEqual(json.loads(response.content)["info"]["title"], "Prebuilt")
+
+    def test_swagger_ui_loads_lazily(self):
+        response = self.client.get(reverse("swagger-ui"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, SCHEMA_URL)
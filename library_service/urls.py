@@ -1,9 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+
+from library_service.views import MetricsView, lazy_view
 
 
 urlpatterns = [
@@ -11,10 +9,15 @@ urlpatterns = [
     path("api/library/", include("books.urls"), name="books"),
     path("api/users/", include("users.urls"), name="users"),
     path("api/borrowsings/", include("borrowings.urls"), name="borrowings"),
-    path("api/doc/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/payments/", include("payments.urls"), name="payments"),
+    path("api/stats/", include("stats.urls"), name="stats"),
+    path("api/holds/", include("holds.urls"), name="holds"),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+    # The docs machinery is only imported once the docs are requested.
+    path("api/doc/", lazy_view("library_service.docs.CachedSchemaView"), name="schema"),
     path(
         "api/doc/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
+        lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="schema"),
         name="swagger-ui",
     ),
 ]
@@ -0,0 +1,41 @@
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from library_service.metrics import registry
+from library_service.renderers import PrometheusRenderer
+
+
+class MetricsView(APIView):
+    """This worker's request histograms, in the Prometheus text format"""
+
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    @extend_schema(
+        responses={200: OpenApiResponse(OpenApiTypes.STR, "Prometheus metrics")}
+    )
+    def get(self, request):
+        return Response(registry.render())
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    `as_view(**initkwargs)` of the view class at `dotted_path`, imported on
+    the first request rather than with the URLconf.
+    """
+    view = None
+
+    @csrf_exempt
+    def lazy(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    lazy.__name__ = lazy.__qualname__ = dotted_path.rpartition(".")[2]
+    return lazy
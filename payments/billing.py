@@ -0,0 +1,95 @@
+"""
+Set-based billing of borrowings.
+
+Every function here issues a fixed number of statements regardless of how
+many borrowings it bills: fees and fines are computed by the database (see
+`payments.fees`) and written with UPDATE ... SET = (subquery) and
+INSERT ... SELECT, never by loading borrowings into Python.
+"""
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery, Value
+
+from borrowings.models import Borrowing
+from payments.fees import borrowing_fee, overdue_fine
+from payments.models import Payment
+
+INSERT_COLUMNS = ("borrowing_id", "type", "status", "money_to_pay")
+
+
+def _insert_payments(borrowings, payment_type, amount):
+    """INSERT ... SELECT one pending payment of `payment_type` per borrowing"""
+    rows = borrowings.annotate(
+        payment_type=Value(payment_type),
+        payment_status=Value(Payment.Status.PENDING),
+        amount=amount,
+    ).values_list("id", "payment_type", "payment_status", "amount")
+    sql, params = rows.query.sql_with_params()
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO {} ({}) {}".format(
+                quote_name(Payment._meta.db_table),
+                ", ".join(quote_name(column) for column in INSERT_COLUMNS),
+                sql,
+            ),
+            params,
+        )
+        return cursor.rowcount
+
+
+def _upsert_fines(borrowings, as_of):
+    """
+    Sets the pending fine of every borrowing in `borrowings` to what it has
+    accrued by `as_of`, creating missing fines. Paid fines are left alone.
+    Returns `(updated, created)`.
+    """
+    fines = Payment.objects.filter(type=Payment.Type.FINE)
+    updated = fines.filter(
+        status=Payment.Status.PENDING, borrowing__in=borrowings
+    ).update(
+        money_to_pay=Subquery(
+            Borrowing.objects.filter(pk=OuterRef("borrowing_id"))
+            .annotate(fine=overdue_fine(as_of))
+            .values("fine")
+        )
+    )
+    created = _insert_payments(
+        borrowings.exclude(pk__in=fines.values("borrowing_id")),
+        Payment.Type.FINE,
+        overdue_fine(as_of),
+    )
+    return updated, created
+
+
+def charge_returns(expected_return_dates, returned_on):
+    """
+    Bills borrowings just returned on `returned_on`: their fee and, for late
+    returns, their final fine. `expected_return_dates` maps borrowing ids to
+    their expected return dates so on-time returns skip the fine queries.
+    Runs in a job queued by the return (see `payments.tasks`); fees already
+    charged are skipped and fines upserted, so a rerun bills nothing twice.
+    """
+    _insert_payments(
+        Borrowing.objects.filter(pk__in=expected_return_dates).exclude(
+            payments__type=Payment.Type.PAYMENT
+        ),
+        Payment.Type.PAYMENT,
+        borrowing_fee(returned_on),
+    )
+    late = [
+        borrowing_id
+        for borrowing_id, expected in expected_return_dates.items()
+        if expected < returned_on
+    ]
+    if late:
+        _upsert_fines(Borrowing.objects.filter(pk__in=late), returned_on)
+
+
+@transaction.atomic
+def bill_overdue(as_of):
+    """
+    Brings the pending fine of every active overdue borrowing up to date
+    as of `as_of`. Returns `(updated, created)` fine counts.
+    """
+    return _upsert_fines(Borrowing.objects.overdue(as_of), as_of)
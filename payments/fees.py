@@ -0,0 +1,81 @@
+"""
+Borrowing fees and overdue fines as database expressions.
+
+A borrowing costs `daily_fee` for each day from `borrow_date` to its return,
+capped at `expected_return_date` and billed for at least one day. Each day
+past `expected_return_date` adds a fine of `daily_fee * FINE_MULTIPLIER`.
+Computing both in SQL lets billing run as a handful of set-based statements.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.db.models import (
+    Case,
+    ExpressionWrapper,
+    F,
+    Func,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, Least, Round
+
+MONEY = models.DecimalField(max_digits=10, decimal_places=2)
+
+
+class DaysBetween(Func):
+    """Whole days from the `start` date to the `end` date"""
+
+    output_field = models.IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(julianday(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # date - date is an integer number of days.
+        return self.as_sql(
+            compiler,
+            connection,
+            template="(%(expressions)s)",
+            arg_joiner=" - ",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function="DATEDIFF", **extra_context)
+
+
+def _money(expression):
+    return Round(ExpressionWrapper(expression, output_field=MONEY), 2)
+
+
+def borrowing_fee(returned_on):
+    """Fee for borrowings returned on `returned_on`"""
+    days = Greatest(
+        DaysBetween(
+            Least(Value(returned_on), F("expected_return_date")), F("borrow_date")
+        ),
+        Value(1),
+    )
+    return _money(F("book__daily_fee") * days)
+
+
+def overdue_fine(as_of):
+    """Fine accrued by `as_of`; zero for borrowings that are not overdue"""
+    days = DaysBetween(Value(as_of), F("expected_return_date"))
+    return _money(
+        Case(
+            When(expected_return_date__lt=as_of, then=F("book__daily_fee") * days),
+            default=Value(0),
+            output_field=MONEY,
+        )
+        * Value(settings.FINE_MULTIPLIER)
+    )
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from payments.billing import bill_overdue
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the fines of all overdue borrowings up to date with a few "
+        "set-based statements. Meant to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            help="Date to bill up to in YYYY-MM-DD (default: today)",
+        )
+
+    def handle(self, *args, **options):
+        as_of = options["as_of"] or timezone.now().date()
+        updated, created = bill_overdue(as_of)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Billed overdue fines as of {as_of}: "
+                f"{created} created, {updated} updated."
+            )
+        )
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("borrowings", "0006_backfill_active_borrowings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Payment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("PENDING", "Pending"), ("PAID", "Paid")],
+                        default="PENDING",
+                        max_length=7,
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("PAYMENT", "Payment"), ("FINE", "Fine")], max_length=7
+                    ),
+                ),
+                ("money_to_pay", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "borrowing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payments",
+                        to="borrowings.borrowing",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "PENDING")),
+                        fields=["borrowing"],
+                        name="payment_pending_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("borrowing", "type"), name="payment_borrowing_type_unique"
+            ),
+        ),
+    ]
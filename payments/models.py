@@ -0,0 +1,40 @@
+from django.db import models
+
+from borrowings.models import Borrowing
+
+
+class Payment(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        PAID = "PAID"
+
+    class Type(models.TextChoices):
+        PAYMENT = "PAYMENT"
+        FINE = "FINE"
+
+    status = models.CharField(
+        max_length=7, choices=Status.choices, default=Status.PENDING
+    )
+    type = models.CharField(max_length=7, choices=Type.choices)
+    borrowing = models.ForeignKey(
+        Borrowing, on_delete=models.CASCADE, related_name="payments"
+    )
+    money_to_pay = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            # A borrowing is charged its fee once and accrues a single fine.
+            models.UniqueConstraint(
+                fields=["borrowing", "type"], name="payment_borrowing_type_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["borrowing"],
+                name="payment_pending_idx",
+                condition=models.Q(status="PENDING"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.money_to_pay} for borrowing #{self.borrowing_id}"
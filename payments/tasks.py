@@ -0,0 +1,39 @@
+"""
+Billing of returns deferred to the job queue, so a return only records
+itself and queues the charge in the same transaction. `charge_returns`
+skips fees already charged and upserts fines, so a rerun bills nothing
+twice.
+"""
+
+from datetime import date
+
+from jobs.queue import enqueue, idempotency_key, task
+from payments.billing import charge_returns
+
+CHARGE_RETURNS = "payments.charge_returns"
+
+
+@task(CHARGE_RETURNS)
+def run_charge_returns(expected_return_dates, returned_on):
+    charge_returns(
+        {
+            int(borrowing_id): date.fromisoformat(expected)
+            for borrowing_id, expected in expected_return_dates.items()
+        },
+        date.fromisoformat(returned_on),
+    )
+
+
+def enqueue_charge_returns(expected_return_dates, returned_on):
+    """Queues `charge_returns` in the current transaction"""
+    enqueue(
+        CHARGE_RETURNS,
+        {
+            "expected_return_dates": {
+                borrowing_id: expected.isoformat()
+                for borrowing_id, expected in expected_return_dates.items()
+            },
+            "returned_on": returned_on.isoformat(),
+        },
+        key=idempotency_key(CHARGE_RETURNS, *sorted(expected_return_dates)),
+    )
@@ -0,0 +1,193 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.billing import bill_overdue
+from payments.models import Payment
+
+
+@override_settings(FINE_MULTIPLIER=Decimal("2"))
+class PaymentTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.today = timezone.now().date()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_fee="1.25",
+        )
+
+    def create_borrowing(self, borrowed_days_ago, due_days_ago, user=None):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=self.today - timedelta(days=due_days_ago),
+            user=user or self.user,
+            book=self.book,
+        )
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=self.today - timedelta(days=borrowed_days_ago)
+        )
+        return borrowing
+
+    def run_jobs(self):
+        call_command("run_jobs", burst=True, processes=1, stdout=io.StringIO())
+
+    def payments(self, borrowing):
+        return dict(
+            Payment.objects.filter(borrowing=borrowing).values_list(
+                "type", "money_to_pay"
+            )
+        )
+
+
+class ChargeOnReturnTests(PaymentTestCase):
+    def return_borrowing(self, borrowing):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            reverse("borrowings:borrowing-return", kwargs={"pk": borrowing.pk})
+        )
+        # Returns are billed by the job they queue.
+        self.run_jobs()
+        return response
+
+    def test_on_time_return_charges_days_borrowed(self):
+        borrowing = self.create_borrowing(borrowed_days_ago=4, due_days_ago=-3)
+        self.return_borrowing(borrowing)
+        self.assertEqual(self.payments(borrowing), {"PAYMENT": Decimal("5.00")})
+
+    def test_same_day_return_charges_one_day(self):
+        borrowing = self.create_borrowing(borrowed_days_ago=0, due_days_ago=-3)
+        self.return_borrowing(borrowing)
+        self.assertEqual(self.payments(borrowing), {"PAYMENT": Decimal("1.25")})
+
+    def test_late_return_charges_fee_and_fine(self):
+        borrowing = self.create_borrowing(borrowed_days_ago=10, due_days_ago=3)
+        self.return_borrowing(borrowing)
+        self.assertEqual(
+            self.payments(borrowing),
+            {"PAYMENT": Decimal("8.75"), "FINE": Decimal("7.50")},
+        )
+
+    def test_late_return_finalizes_accrued_fine(self):
+        borrowing = self.create_borrowing(borrowed_days_ago=10, due_days_ago=3)
+        bill_overdue(self.today - timedelta(days=2))
+        self.assertEqual(self.payments(borrowing), {"FINE": Decimal("2.50")})
+
+        self.return_borrowing(borrowing)
+        self.assertEqual(Payment.objects.filter(type=Payment.Type.FINE).count(), 1)
+        self.assertEqual(self.payments(borrowing)["FINE"], Decimal("7.50"))
+
+    def test_billing_waits_for_the_job(self):
+        borrowing = self.create_borrowing(borrowed_days_ago=4, due_days_ago=-3)
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(
+            reverse("borrowings:borrowing-return", kwargs={"pk": borrowing.pk})
+        )
+        self.assertEqual(self.payments(borrowing), {})
+        self.run_jobs()
+        self.assertEqual(self.payments(borrowing), {"PAYMENT": Decimal("5.00")})
+
+    def test_bulk_return_charges_every_borrowing(self):
+        late = self.create_borrowing(borrowed_days_ago=6, due_days_ago=1)
+        on_time = self.create_borrowing(borrowed_days_ago=2, due_days_ago=-5)
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(
+            reverse("borrowings:borrowing-bulk-return"),
+            {"borrowings": [late.id, on_time.id]},
+            format="json",
+        )
+        self.run_jobs()
+        self.assertEqual(
+            self.payments(late),
+            {"PAYMENT": Decimal("6.25"), "FINE": Decimal("2.50")},
+        )
+        self.assertEqual(self.payments(on_time), {"PAYMENT": Decimal("2.50")})
+
+
+class BillOverdueTests(PaymentTestCase):
+    def test_bills_only_active_overdue_borrowings(self):
+        overdue = self.create_borrowing(borrowed_days_ago=10, due_days_ago=4)
+        self.create_borrowing(borrowed_days_ago=1, due_days_ago=-6)
+        returned = self.create_borrowing(borrowed_days_ago=10, due_days_ago=4)
+        Borrowing.objects.filter(pk=returned.pk).update(actual_return_date=self.today)
+
+        self.assertEqual(bill_overdue(self.today), (0, 1))
+        self.assertEqual(
+            list(Payment.objects.values_list("borrowing", "money_to_pay")),
+            [(overdue.id, Decimal("10.00"))],
+        )
+
+    def test_rerun_updates_pending_and_keeps_paid_fines(self):
+        pending = self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        paid = self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        bill_overdue(self.today - timedelta(days=1))
+        Payment.objects.filter(borrowing=paid).update(status=Payment.Status.PAID)
+
+        self.assertEqual(bill_overdue(self.today), (1, 0))
+        self.assertEqual(self.payments(pending), {"FINE": Decimal("5.00")})
+        self.assertEqual(self.payments(paid), {"FINE": Decimal("2.50")})
+
+    def test_query_count_independent_of_borrowings(self):
+        for _ in range(3):
+            self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        # SAVEPOINT, UPDATE pending fines, INSERT ... SELECT new fines, RELEASE
+        with self.assertNumQueries(4):
+            bill_overdue(self.today)
+        for _ in range(20):
+            self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        with self.assertNumQueries(4):
+            bill_overdue(self.today)
+        self.assertEqual(Payment.objects.count(), 23)
+
+    def test_command_reports_counts(self):
+        self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        out = io.StringIO()
+        call_command("bill_overdue", f"--as-of={self.today.isoformat()}", stdout=out)
+        self.assertIn("1 created, 0 updated", out.getvalue())
+
+
+class PaymentViewTests(PaymentTestCase):
+    PAYMENT_URL = reverse("payments:payment-list")
+
+    def setUp(self):
+        super().setUp()
+        other_user = get_user_model().objects.create_user(email="other@example.com")
+        self.create_borrowing(borrowed_days_ago=10, due_days_ago=2)
+        self.create_borrowing(borrowed_days_ago=10, due_days_ago=2, user=other_user)
+        bill_overdue(self.today)
+
+    def test_patrons_see_only_their_payments(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.PAYMENT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["money_to_pay"], "5.00")
+
+    def test_staff_see_all_payments(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.PAYMENT_URL)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_payments_are_read_only(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(self.PAYMENT_URL, {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_requires_authentication(self):
+        response = self.client.get(self.PAYMENT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,9 @@
+from rest_framework import routers
+
+from payments.views import PaymentViewSet
+
+router = routers.DefaultRouter()
+router.register("", PaymentViewSet, basename="payment")
+urlpatterns = router.urls
+
+app_name = "payments"
@@ -0,0 +1,16 @@
+from rest_framework import permissions, viewsets
+
+from payments.models import Payment
+from payments.serializers import PaymentSerializer
+
+
+class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Payment.objects.all()
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Payment.objects.order_by("id")
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(borrowing__user_id=self.request.user.id)
+        return queryset
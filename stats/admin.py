@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from stats.models import BookDailyStats, UserDailyStats
+
+
+@admin.register(BookDailyStats)
+class BookDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("date", "book", "borrowed", "returned", "returned_late")
+    list_select_related = ("book",)
+    date_hierarchy = "date"
+
+
+@admin.register(UserDailyStats)
+class UserDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("date", "user", "borrowed", "returned", "returned_late")
+    list_select_related = ("user",)
+    date_hierarchy = "date"
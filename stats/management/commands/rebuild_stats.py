@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from stats.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily circulation rollups from the borrowings table, "
+        "aggregating a window of days at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = rebuild(
+            chunk_days=options["chunk_days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup row(s)."))
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from books.models import Book
+
+
+class DailyStats(models.Model):
+    """Circulation counts of one day, maintained by `stats.rollups`."""
+
+    date = models.DateField()
+    borrowed = models.PositiveIntegerField(default=0)
+    returned = models.PositiveIntegerField(default=0)
+    returned_late = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class BookDailyStats(DailyStats):
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "book"], name="book_daily_stats_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["book", "date"], name="book_daily_stats_book_idx"),
+        ]
+
+
+class UserDailyStats(DailyStats):
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="+"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "user"], name="user_daily_stats_unique"
+            ),
+        ]
@@ -0,0 +1,150 @@
+"""
+Daily circulation rollups per book and per user.
+
+Checkouts and returns add to the rows of the day they happen on, from jobs
+they enqueue (see stats.tasks): one INSERT that ignores existing rows, then
+one UPDATE adding every delta through a CASE expression. Both statements are
+safe under concurrency, so no count is lost when two requests create the
+same day's row. `rebuild` recomputes all rows from `Borrowing`.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Max, Min, Q, When
+
+from borrowings.models import Borrowing
+from jobs.queue import discard_jobs
+from stats.models import BookDailyStats, UserDailyStats
+
+COLUMNS = ("borrowed", "returned", "returned_late")
+
+
+def _increment(model, key, day, columns):
+    """Adds `{column: Counter(key_id -> delta)}` to the rows of `day`"""
+    key_ids = set().union(*columns.values())
+    if not key_ids:
+        return
+    model.objects.bulk_create(
+        [model(date=day, **{key: key_id}) for key_id in key_ids],
+        ignore_conflicts=True,
+    )
+    model.objects.filter(date=day, **{f"{key}__in": key_ids}).update(
+        **{
+            column: Case(
+                *(
+                    When(**{key: key_id}, then=F(column) + delta)
+                    for key_id, delta in deltas.items()
+                ),
+                default=F(column),
+                output_field=models.PositiveIntegerField(),
+            )
+            for column, deltas in columns.items()
+            if deltas
+        }
+    )
+
+
+def record_checkouts(day, borrowings):
+    """Counts `(book_id, user_id)` pairs checked out on `day`"""
+    books, users = Counter(), Counter()
+    for book_id, user_id in borrowings:
+        books[book_id] += 1
+        users[user_id] += 1
+    _increment(BookDailyStats, "book_id", day, {"borrowed": books})
+    _increment(UserDailyStats, "user_id", day, {"borrowed": users})
+
+
+def record_returns(day, borrowings):
+    """Counts `(book_id, user_id, late)` triples returned on `day`"""
+    books, users = Counter(), Counter()
+    late_books, late_users = Counter(), Counter()
+    for book_id, user_id, late in borrowings:
+        books[book_id] += 1
+        users[user_id] += 1
+        if late:
+            late_books[book_id] += 1
+            late_users[user_id] += 1
+    _increment(
+        BookDailyStats,
+        "book_id",
+        day,
+        {"returned": books, "returned_late": late_books},
+    )
+    _increment(
+        UserDailyStats,
+        "user_id",
+        day,
+        {"returned": users, "returned_late": late_users},
+    )
+
+
+def _daily_counts(start, end, key):
+    """`{(date, key_id): [borrowed, returned, returned_late]}` for a date range"""
+    counts = {}
+    borrowed = (
+        Borrowing.objects.filter(borrow_date__gte=start, borrow_date__lt=end)
+        .values_list("borrow_date", key)
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    for day, key_id, count in borrowed:
+        counts.setdefault((day, key_id), [0, 0, 0])[0] = count
+    returned = (
+        Borrowing.objects.filter(
+            actual_return_date__gte=start, actual_return_date__lt=end
+        )
+        .values_list("actual_return_date", key)
+        .annotate(
+            count=Count("pk"),
+            late=Count(
+                "pk", filter=Q(actual_return_date__gt=F("expected_return_date"))
+            ),
+        )
+        .order_by()
+    )
+    for day, key_id, count, late in returned:
+        row = counts.setdefault((day, key_id), [0, 0, 0])
+        row[1:] = count, late
+    return counts
+
+
+@transaction.atomic
+def rebuild(chunk_days=30, batch_size=1000):
+    """
+    Replaces all rollup rows with counts aggregated from `Borrowing`,
+    `chunk_days` days at a time so memory stays bounded by one chunk.
+    Runs in one transaction so dashboards never see a partial rebuild.
+    Pending rollup jobs are discarded first, since the rebuild already
+    counts their borrowings. Returns the number of rows written.
+    """
+    # stats.tasks imports this module.
+    from stats.tasks import RECORD_CHECKOUTS, RECORD_RETURNS
+
+    discard_jobs(RECORD_CHECKOUTS, RECORD_RETURNS)
+    BookDailyStats.objects.all().delete()
+    UserDailyStats.objects.all().delete()
+    bounds = Borrowing.objects.aggregate(
+        first_borrowed=Min("borrow_date"),
+        last_borrowed=Max("borrow_date"),
+        first_returned=Min("actual_return_date"),
+        last_returned=Max("actual_return_date"),
+    )
+    if bounds["first_borrowed"] is None:
+        return 0
+
+    written = 0
+    start = min(filter(None, (bounds["first_borrowed"], bounds["first_returned"])))
+    last = max(filter(None, (bounds["last_borrowed"], bounds["last_returned"])))
+    while start <= last:
+        end = start + timedelta(days=chunk_days)
+        for model, key in ((BookDailyStats, "book_id"), (UserDailyStats, "user_id")):
+            rows = [
+                model(date=day, **{key: key_id}, **dict(zip(COLUMNS, values)))
+                for (day, key_id), values in _daily_counts(start, end, key).items()
+            ]
+            model.objects.bulk_create(rows, batch_size=batch_size)
+            written += len(rows)
+        start = end
+    return written
@@ -0,0 +1,47 @@
+from rest_framework import serializers
+
+
+class CirculationStatsQuerySerializer(serializers.Serializer):
+    """Validates the query parameters of the circulation stats"""
+
+    end = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=366, default=30)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class DailyCirculationSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    borrowed = serializers.IntegerField()
+    returned = serializers.IntegerField()
+    returned_late = serializers.IntegerField()
+
+
+class BookCirculationSerializer(serializers.Serializer):
+    book_id = serializers.IntegerField()
+    title = serializers.CharField(source="book__title")
+    author = serializers.CharField(source="book__author")
+    borrowed = serializers.IntegerField(source="total")
+
+
+class PatronCirculationSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    email = serializers.EmailField(source="user__email")
+    borrowed = serializers.IntegerField(source="total")
+
+
+class AuthorLoansSerializer(serializers.Serializer):
+    author = serializers.CharField(source="book__author")
+    active = serializers.IntegerField()
+
+
+class CirculationStatsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    borrowed = serializers.IntegerField()
+    returned = serializers.IntegerField()
+    returned_late = serializers.IntegerField()
+    overdue_rate = serializers.FloatField()
+    daily = DailyCirculationSerializer(many=True)
+    most_borrowed_books = BookCirculationSerializer(many=True)
+    top_patrons = PatronCirculationSerializer(many=True)
+    active_loans_per_author = AuthorLoansSerializer(many=True)
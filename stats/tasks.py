@@ -0,0 +1,43 @@
+"""
+Rollup updates deferred to the job queue. Every checkout and return of a
+day adds to the same rollup rows, so the requests leave that write to the
+job workers. The job is inserted in the transaction that records the
+events and its rollup update commits with the job being marked done, so
+each event is counted once; the idempotency key is the borrowing ids.
+"""
+
+from datetime import date
+
+from jobs.queue import enqueue, idempotency_key, task
+from stats.rollups import record_checkouts, record_returns
+
+RECORD_CHECKOUTS = "stats.record_checkouts"
+RECORD_RETURNS = "stats.record_returns"
+
+
+@task(RECORD_CHECKOUTS)
+def run_record_checkouts(day, borrowings):
+    record_checkouts(date.fromisoformat(day), borrowings)
+
+
+@task(RECORD_RETURNS)
+def run_record_returns(day, borrowings):
+    record_returns(date.fromisoformat(day), borrowings)
+
+
+def enqueue_record_checkouts(day, borrowings, borrowing_ids):
+    """Queues `record_checkouts` in the current transaction"""
+    enqueue(
+        RECORD_CHECKOUTS,
+        {"day": day.isoformat(), "borrowings": borrowings},
+        key=idempotency_key(RECORD_CHECKOUTS, *sorted(borrowing_ids)),
+    )
+
+
+def enqueue_record_returns(day, borrowings, borrowing_ids):
+    """Queues `record_returns` in the current transaction"""
+    enqueue(
+        RECORD_RETURNS,
+        {"day": day.isoformat(), "borrowings": borrowings},
+        key=idempotency_key(RECORD_RETURNS, *sorted(borrowing_ids)),
+    )
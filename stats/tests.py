@@ -0,0 +1,250 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+from stats.models import BookDailyStats, UserDailyStats
+from stats.rollups import rebuild
+
+ROLLUP_FIELDS = ("date", "borrowed", "returned", "returned_late")
+
+
+class CirculationTestCase(TestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.today = timezone.now().date()
+        self.user = get_user_model().objects.create_user(email="user@example.com")
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com"
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", is_staff=True
+        )
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Jane Doe",
+            cover=Book.CoverType.SOFT,
+            inventory=10,
+            daily_fee="1.00",
+        )
+        self.other_book = Book.objects.create(
+            title="Other Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=10,
+            daily_fee="1.00",
+        )
+
+    def checkout(self, user, book, due_in_days=7):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(
+            self.BORROWING_URL,
+            {
+                "book": book.id,
+                "expected_return_date": self.today + timedelta(days=due_in_days),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def run_jobs(self):
+        call_command("run_jobs", burst=True, processes=1, stdout=io.StringIO())
+
+    def simulate_circulation(self, run_jobs=True):
+        late = self.checkout(self.user, self.book, due_in_days=-2)
+        on_time = self.checkout(self.user, self.book)
+        self.checkout(self.other_user, self.book)
+        self.client.force_authenticate(user=self.user)
+        self.client.post(
+            reverse("borrowings:borrowing-bulk-checkout"),
+            {
+                "books": [self.other_book.id, self.book.id],
+                "expected_return_date": self.today + timedelta(days=7),
+            },
+            format="json",
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(reverse("borrowings:borrowing-return", kwargs={"pk": late}))
+        self.client.post(
+            reverse("borrowings:borrowing-bulk-return"),
+            {"borrowings": [on_time]},
+            format="json",
+        )
+        # The rollups are updated by the jobs the requests queued.
+        if run_jobs:
+            self.run_jobs()
+
+
+class RollupTests(CirculationTestCase):
+    def rollups(self):
+        return (
+            sorted(BookDailyStats.objects.values_list("book_id", *ROLLUP_FIELDS)),
+            sorted(UserDailyStats.objects.values_list("user_id", *ROLLUP_FIELDS)),
+        )
+
+    def test_events_update_rollups_incrementally(self):
+        self.simulate_circulation()
+        books, users = self.rollups()
+        self.assertEqual(
+            books,
+            [
+                (self.book.id, self.today, 4, 2, 1),
+                (self.other_book.id, self.today, 1, 0, 0),
+            ],
+        )
+        self.assertEqual(
+            users,
+            [
+                (self.user.id, self.today, 4, 2, 1),
+                (self.other_user.id, self.today, 1, 0, 0),
+            ],
+        )
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.simulate_circulation()
+        expected_books, expected_users = self.rollups()
+        # History that predates the rollups, created without the API.
+        historical = Borrowing.objects.create(
+            expected_return_date=self.today - timedelta(days=30),
+            actual_return_date=self.today - timedelta(days=20),
+            book=self.other_book,
+            user=self.other_user,
+        )
+        Borrowing.objects.filter(pk=historical.pk).update(
+            borrow_date=self.today - timedelta(days=45)
+        )
+
+        out = io.StringIO()
+        call_command("rebuild_stats", chunk_days=7, stdout=out)
+
+        borrowed_on = self.today - timedelta(days=45)
+        returned_on = self.today - timedelta(days=20)
+        books, users = self.rollups()
+        self.assertEqual(
+            books,
+            sorted(
+                [
+                    *expected_books,
+                    (self.other_book.id, borrowed_on, 1, 0, 0),
+                    (self.other_book.id, returned_on, 0, 1, 1),
+                ]
+            ),
+        )
+        self.assertEqual(
+            users,
+            sorted(
+                [
+                    *expected_users,
+                    (self.other_user.id, borrowed_on, 1, 0, 0),
+                    (self.other_user.id, returned_on, 0, 1, 1),
+                ]
+            ),
+        )
+        self.assertIn("Wrote 8 rollup row(s).", out.getvalue())
+
+    def test_rebuild_discards_pending_rollup_jobs(self):
+        self.simulate_circulation(run_jobs=False)
+        rebuild()
+        # The rebuild counted every borrowing; the queued jobs must not again.
+        self.run_jobs()
+        books, users = self.rollups()
+        self.assertEqual(
+            books,
+            [
+                (self.book.id, self.today, 4, 2, 1),
+                (self.other_book.id, self.today, 1, 0, 0),
+            ],
+        )
+        self.assertEqual(
+            users,
+            [
+                (self.user.id, self.today, 4, 2, 1),
+                (self.other_user.id, self.today, 1, 0, 0),
+            ],
+        )
+
+    def test_rebuild_of_empty_history(self):
+        self.assertEqual(rebuild(), 0)
+
+
+class CirculationStatsViewTests(CirculationTestCase):
+    STATS_URL = reverse("stats:circulation")
+
+    def test_reports_from_rollups(self):
+        self.simulate_circulation()
+        self.client.force_authenticate(user=self.admin_user)
+
+        # Daily series, totals, top books, top patrons, loans per author.
+        with self.assertNumQueries(5):
+            response = self.client.get(self.STATS_URL, {"days": 7})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data["start"], str(self.today - timedelta(days=6)))
+        self.assertEqual(data["end"], str(self.today))
+        self.assertEqual(
+            (data["borrowed"], data["returned"], data["returned_late"]), (5, 2, 1)
+        )
+        self.assertEqual(data["overdue_rate"], 0.5)
+        self.assertEqual(
+            data["daily"],
+            [
+                {
+                    "date": str(self.today),
+                    "borrowed": 5,
+                    "returned": 2,
+                    "returned_late": 1,
+                }
+            ],
+        )
+        self.assertEqual(
+            [
+                (item["book_id"], item["borrowed"])
+                for item in data["most_borrowed_books"]
+            ],
+            [(self.book.id, 4), (self.other_book.id, 1)],
+        )
+        self.assertEqual(
+            [(item["email"], item["borrowed"]) for item in data["top_patrons"]],
+            [("user@example.com", 4), ("other@example.com", 1)],
+        )
+        self.assertEqual(
+            [dict(item) for item in data["active_loans_per_author"]],
+            [{"author": "Jane Doe", "active": 2}, {"author": "John Doe", "active": 1}],
+        )
+
+    def test_window_excludes_other_days(self):
+        self.simulate_circulation()
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(
+            self.STATS_URL, {"end": self.today - timedelta(days=1)}
+        )
+        self.assertEqual(response.data["borrowed"], 0)
+        self.assertEqual(response.data["overdue_rate"], 0)
+        self.assertEqual(response.data["most_borrowed_books"], [])
+
+    def test_limit_and_validation(self):
+        self.simulate_circulation()
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.STATS_URL, {"limit": 1})
+        self.assertEqual(len(response.data["most_borrowed_books"]), 1)
+
+        response = self.client.get(self.STATS_URL, {"days": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_only(self):
+        response = self.client.get(self.STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from stats.views import CirculationStatsView
+
+urlpatterns = [
+    path("circulation/", CirculationStatsView.as_view(), name="circulation"),
+]
+
+app_name = "stats"
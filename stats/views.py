@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+
+from stats.reports import circulation_report
+from stats.serializers import (
+    CirculationStatsQuerySerializer,
+    CirculationStatsSerializer,
+)
+
+
+class CirculationStatsView(generics.GenericAPIView):
+    """Circulation dashboard for the `days` days ending on `end`"""
+
+    serializer_class = CirculationStatsSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = None
+
+    @extend_schema(parameters=[CirculationStatsQuerySerializer])
+    def get(self, request):
+        query = CirculationStatsQuerySerializer(data=request.query_params.dict())
+        query.is_valid(raise_exception=True)
+        end = query.validated_data.get("end") or timezone.now().date()
+        start = end - timedelta(days=query.validated_data["days"] - 1)
+        report = circulation_report(start, end, query.validated_data["limit"])
+        return Response(self.get_serializer(report).data)
@@ -0,0 +1,196 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+TOKEN_VERSION_CLAIM = "token_version"
+CLAIMS = ("is_staff", "email", TOKEN_VERSION_CLAIM)
+
+
+class UserCache:
+    """Thread-safe LRU cache of user rows whose entries expire after `ttl`."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL
+)
+
+
+def load_user(user_id):
+    """
+    Return the shared cached user with `user_id`, loading it from the
+    database only when the entry is missing or expired. Callers must not
+    mutate the returned instance.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        try:
+            user = get_user_model().objects.get(pk=user_id)
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user_cache.set(user_id, user)
+    return user
+
+
+async def aload_user(user_id):
+    """Async counterpart of `load_user` using the async ORM on cache misses."""
+    user = user_cache.get(user_id)
+    if user is None:
+        try:
+            user = await get_user_model().objects.aget(pk=user_id)
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user_cache.set(user_id, user)
+    return user
+
+
+def get_cached_user(user_id):
+    """Return a private, mutable copy of the cached user with `user_id`."""
+    return copy.copy(load_user(user_id))
+
+
+def token_claims(user):
+    """Claims that let requests authenticate without loading the user."""
+    return {
+        "is_staff": user.is_staff,
+        "email": user.email,
+        TOKEN_VERSION_CLAIM: user.token_version,
+    }
+
+
+class ClaimsTokenUser(TokenUser):
+    """Token-backed user carrying the signed `is_staff` and `email` claims."""
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def username(self):
+        return self.email
+
+    def __str__(self):
+        return self.email
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    Loads the full user model through the in-process user cache, for views
+    that need more than the token claims.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # Tokens issued before the claim existed count as version 0.
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+
+    def get_user(self, validated_token):
+        user = get_cached_user(self.get_user_id(validated_token))
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        user = copy.copy(await aload_user(self.get_user_id(validated_token)))
+        self.check_user(user, validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of `authenticate` for plain Django async views:
+        token parsing is CPU-only and user rows come from the cache or the
+        async ORM, so the event loop never blocks on the database.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+
+class StatelessJWTAuthentication(CachedUserJWTAuthentication):
+    """
+    Authenticates from signed claims and returns a `ClaimsTokenUser`.
+
+    Revocation, deactivation and `is_staff` are checked against the cached
+    user row, so the database is read at most once per user per cache TTL.
+    Tokens issued before the claims existed fall back to the full cached
+    user.
+    """
+
+    def token_user(self, user, validated_token):
+        self.check_user(user, validated_token)
+        # A claim the row no longer agrees with, such as the `is_staff` of a
+        # demoted admin, is never trusted: the row decides.
+        if validated_token["is_staff"] != user.is_staff:
+            return copy.copy(user)
+        return ClaimsTokenUser(validated_token)
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if not all(claim in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        return self.token_user(load_user(user_id), validated_token)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if not all(claim in validated_token for claim in CLAIMS):
+            return await super().aget_user(validated_token)
+        return self.token_user(await aload_user(user_id), validated_token)
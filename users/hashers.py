@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from `PASSWORD_HASH_ITERATIONS`.
+
+    It keeps Django's `pbkdf2_sha256` algorithm name, so existing hashes still
+    verify, and any hash stored with a different iteration count is
+    re-encoded the next time its owner logs in.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
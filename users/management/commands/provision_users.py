@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from library_service.bulk import FORMATS, detect_format, open_text, read_rows
+from users.bulk import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Create patron accounts from a CSV or JSON Lines file with email, "
+        "first_name, last_name and an optional pre-hashed password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .jsonl file")
+        parser.add_argument("--format", choices=FORMATS, dest="file_format")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--hash-passwords",
+            action="store_true",
+            help="Treat the password column as plain text and hash it (slow).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or detect_format(path)
+        try:
+            binary_file = open(path, "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with binary_file, open_text(binary_file) as stream:
+            result = provision_users(
+                read_rows(stream, file_format),
+                batch_size=options["batch_size"],
+                hash_passwords=options["hash_passwords"],
+            )
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result.created}, skipped {result.skipped} existing "
+                f"and {result.error_count} invalid rows."
+            )
+        )
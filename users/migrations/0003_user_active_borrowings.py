@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_token_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="active_borrowings",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from functools import partial
+from itertools import islice
+
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
 
 class UserManager(BaseUserManager):
@@ -36,12 +41,85 @@ class UserManager(BaseUserManager):
 
         return self._create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, rows, batch_size=1000):
+        """
+        Insert users from dicts of field values in batches of `batch_size`,
+        skipping emails that already exist. `password` must already be
+        hashed; rows without one get an unusable password until the user
+        sets their own. Return the number of users created.
+        """
+        created = 0
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            users = {}
+            for fields in batch:
+                fields = dict(fields)
+                email = self.normalize_email(fields.pop("email"))
+                password = fields.pop("password", None) or make_password(None)
+                users[email] = self.model(email=email, password=password, **fields)
+            with transaction.atomic(using=self._db):
+                existing = set(
+                    self.filter(email__in=users).values_list("email", flat=True)
+                )
+                new_users = [
+                    user for email, user in users.items() if email not in existing
+                ]
+                self.bulk_create(new_users, ignore_conflicts=True)
+            created += len(new_users)
+        return created
+
 
 class User(AbstractUser):
     username = None
     email = models.EmailField(unique=True)
+    token_version = models.PositiveIntegerField(default=0)
+    # Maintained by borrowings.limits; see reconcile_active_borrowings.
+    active_borrowings = models.PositiveIntegerField(default=0, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    # Changing these, or the password, revokes the user's tokens, whose
+    # claims carry the old privileges.
+    ACCESS_FIELDS = ("is_staff", "is_active")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_access = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.ACCESS_FIELDS
+        }
+        return user
+
+    def access_changed(self):
+        """Whether privileges or the password changed since the row was loaded"""
+        # `set_password` keeps the raw password until the next save; hash
+        # upgrades on login clear it first and do not count as a change.
+        if self._password is not None:
+            return True
+        loaded = getattr(self, "_loaded_access", {})
+        return any(getattr(self, name) != value for name, value in loaded.items())
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None and self.access_changed():
+            self.token_version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_access = {name: getattr(self, name) for name in self.ACCESS_FIELDS}
+
+    def revoke_tokens(self):
+        """Invalidate every JWT issued to this user so far."""
+        from users.authentication import user_cache
+
+        User.objects.filter(pk=self.pk).update(token_version=F("token_version") + 1)
+        self.refresh_from_db(fields=["token_version"])
+        # `update()` sends no post_save, so drop the cached row here. Drop it
+        # again on commit in case a request re-cached the old version first.
+        user_cache.invalidate(self.pk)
+        transaction.on_commit(partial(user_cache.invalidate, self.pk))
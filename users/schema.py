@@ -0,0 +1,19 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    """Documents the default JWT authenticator as the simplejwt scheme."""
+
+    target_class = "users.authentication.StatelessJWTAuthentication"
+    priority = 1
+
+
+class CachedUserJWTScheme(SimpleJWTScheme):
+    """
+    The same bearer token for views that load the user row. Each
+    authenticator class needs a scheme name of its own.
+    """
+
+    target_class = "users.authentication.CachedUserJWTAuthentication"
+    name = "jwtUserAuth"
+    priority = 1
@@ -1,5 +1,20 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+from users.authentication import ClaimsTokenUser, UserCache, user_cache
 
 
 class UserManagerTest(TestCase):
@@ -58,3 +73,294 @@ class UserTest(TestCase):
         self.assertFalse(user.is_staff)
         self.assertFalse(user.is_superuser)
         self.assertEqual(str(user), "user@example.com")
+
+
+class UserCacheTest(TestCase):
+    def test_evicts_least_recently_used_entries(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set(1, "first")
+        cache.set(2, "second")
+        cache.get(1)
+        cache.set(3, "third")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(1), "first")
+        self.assertIsNone(cache.get(2))
+
+    def test_entries_expire_after_ttl(self):
+        cache = UserCache(max_size=2, ttl=60)
+        with mock.patch("users.authentication.time.monotonic", return_value=100):
+            cache.set(1, "first")
+        with mock.patch("users.authentication.time.monotonic", return_value=159):
+            self.assertEqual(cache.get(1), "first")
+        with mock.patch("users.authentication.time.monotonic", return_value=160):
+            self.assertIsNone(cache.get(1))
+
+
+class StatelessJWTAuthenticationTest(APITestCase):
+    BORROWING_URL = reverse("borrowings:borrowing-list")
+    ME_URL = reverse("users:me")
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="password123"
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@example.com", password="password123", is_staff=True
+        )
+
+    def obtain_access_token(self, email):
+        response = self.client.post(
+            reverse("users:token_obtain_pair"),
+            {"email": email, "password": "password123"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["access"]
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {token}")
+
+    def test_issued_tokens_carry_claims(self):
+        token = AccessToken(self.obtain_access_token("admin@example.com"))
+        self.assertEqual(token["email"], "admin@example.com")
+        self.assertTrue(token["is_staff"])
+        self.assertEqual(token["token_version"], 0)
+
+    def test_authenticated_requests_skip_user_query_when_cached(self):
+        self.authorize(self.obtain_access_token("admin@example.com"))
+        self.client.get(self.BORROWING_URL)
+
+        # Only the COUNT of the (empty) page, no user lookup.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.wsgi_request.user, ClaimsTokenUser)
+        self.assertTrue(response.wsgi_request.user.is_staff)
+
+    def test_token_user_can_create_borrowings(self):
+        book = Book.objects.create(
+            title="Sample Book",
+            author="John Doe",
+            cover=Book.CoverType.HARD,
+            inventory=1,
+            daily_fee="1.99",
+        )
+        self.authorize(self.obtain_access_token("user@example.com"))
+        response = self.client.post(
+            self.BORROWING_URL,
+            {"expected_return_date": "2024-02-10", "book": book.id},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Borrowing.objects.get(pk=response.data["id"]).user, self.user)
+
+    def test_revoked_tokens_are_rejected(self):
+        token = self.obtain_access_token("user@example.com")
+        self.authorize(token)
+        self.assertEqual(
+            self.client.get(self.BORROWING_URL).status_code, status.HTTP_200_OK
+        )
+
+        self.user.revoke_tokens()
+
+        response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authorize(self.obtain_access_token("user@example.com"))
+        response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_users_are_rejected(self):
+        self.authorize(self.obtain_access_token("user@example.com"))
+        self.client.get(self.BORROWING_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demoted_admins_lose_staff_access(self):
+        stats_url = reverse("stats:circulation")
+        refresh = self.client.post(
+            reverse("users:token_obtain_pair"),
+            {"email": "admin@example.com", "password": "password123"},
+        ).data["refresh"]
+        self.authorize(self.obtain_access_token("admin@example.com"))
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_200_OK)
+
+        self.admin_user.is_staff = False
+        self.admin_user.save()
+
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        access = self.client.post(
+            reverse("users:token_refresh"), {"refresh": refresh}
+        ).data["access"]
+        self.authorize(access)
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authorize(self.obtain_access_token("admin@example.com"))
+        self.assertEqual(
+            self.client.get(stats_url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    def test_stale_staff_claim_defers_to_user_row(self):
+        stats_url = reverse("stats:circulation")
+        self.authorize(self.obtain_access_token("admin@example.com"))
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_200_OK)
+
+        # A demotion that bypasses save() leaves the token version alone.
+        get_user_model().objects.filter(pk=self.admin_user.pk).update(is_staff=False)
+        user_cache.clear()
+
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(response.wsgi_request.user.is_staff)
+
+    def test_password_change_revokes_tokens(self):
+        self.authorize(self.obtain_access_token("user@example.com"))
+        self.user.set_password("new-password")
+        self.user.save()
+
+        response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_without_claims_fall_back_to_user_model(self):
+        self.authorize(str(AccessToken.for_user(self.user)))
+        response = self.client.get(self.BORROWING_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_manage_user_view_uses_cached_user(self):
+        self.authorize(self.obtain_access_token("user@example.com"))
+        self.client.get(self.ME_URL)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.ME_URL)
+        self.assertEqual(response.data["email"], "user@example.com")
+
+        response = self.client.patch(self.ME_URL, {"email": "new@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.ME_URL).data["email"], "new@example.com")
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PasswordHashingTest(APITestCase):
+    def test_new_passwords_use_configured_iterations(self):
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="password123"
+        )
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_login_upgrades_hash_to_configured_iterations(self):
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="password123"
+        )
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.client.post(
+                reverse("users:token_obtain_pair"),
+                {"email": "user@example.com", "password": "password123"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertTrue(user.check_password("password123"))
+        # A rehash is not a password change and keeps the user's tokens valid.
+        self.assertEqual(user.token_version, 0)
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "users.hashers.TunablePBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+    )
+    def test_login_upgrades_legacy_algorithms(self):
+        user = get_user_model().objects.create_user(email="user@example.com")
+        user.password = make_password("password123", hasher="md5")
+        user.save()
+
+        self.assertTrue(user.check_password("password123"))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+
+class BulkCreateUsersTest(TestCase):
+    def test_inserts_in_batches_and_skips_existing_emails(self):
+        get_user_model().objects.create_user(email="taken@example.com")
+        rows = [
+            {"email": f"student{i}@Example.com", "first_name": f"Student {i}"}
+            for i in range(5)
+        ]
+        rows.append({"email": "taken@example.com"})
+
+        # Per batch: one lookup of existing emails and one INSERT, plus
+        # the savepoint pair of the batch transaction.
+        with self.assertNumQueries(3 * 4):
+            created = get_user_model().objects.bulk_create_users(rows, batch_size=2)
+
+        self.assertEqual(created, 5)
+        user = get_user_model().objects.get(email="student0@example.com")
+        self.assertEqual(user.first_name, "Student 0")
+        self.assertFalse(user.has_usable_password())
+
+    def test_keeps_pre_hashed_passwords(self):
+        password = make_password("password123")
+        get_user_model().objects.bulk_create_users(
+            [{"email": "student@example.com", "password": password}]
+        )
+        user = get_user_model().objects.get(email="student@example.com")
+        self.assertEqual(user.password, password)
+        self.assertTrue(user.check_password("password123"))
+
+
+class ProvisionUsersCommandTest(TestCase):
+    def write_file(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_provisions_users_from_csv(self):
+        get_user_model().objects.create_user(email="taken@example.com")
+        password = make_password("password123")
+        content = (
+            "email,first_name,last_name,password\n"
+            f"ann@example.com,Ann,Lee,{password}\n"
+            "bob@example.com,Bob,Ray,\n"
+            "taken@example.com,Tom,Kay,\n"
+            "not-an-email,Bad,Row,\n"
+            "eve@example.com,Eve,Fox,plaintext\n"
+        )
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "provision_users",
+            self.write_file("students.csv", content),
+            stdout=out,
+            stderr=err,
+        )
+
+        self.assertIn(
+            "Created 2, skipped 1 existing and 2 invalid rows.", out.getvalue()
+        )
+        self.assertIn("line 5:", err.getvalue())
+        self.assertIn("line 6:", err.getvalue())
+        ann = get_user_model().objects.get(email="ann@example.com")
+        self.assertEqual(ann.last_name, "Lee")
+        self.assertTrue(ann.check_password("password123"))
+        bob = get_user_model().objects.get(email="bob@example.com")
+        self.assertFalse(bob.has_usable_password())
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_hashes_plain_text_passwords_on_request(self):
+        content = '{"email": "ann@example.com", "password": "password123"}\n'
+        call_command(
+            "provision_users",
+            self.write_file("students.jsonl", content),
+            "--hash-passwords",
+            stdout=io.StringIO(),
+        )
+        ann = get_user_model().objects.get(email="ann@example.com")
+        self.assertTrue(ann.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(ann.check_password("password123"))
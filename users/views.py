@@ -1,7 +1,6 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
-
+from users.authentication import CachedUserJWTAuthentication
 from users.serializers import UserSerializer
 
 
@@ -11,7 +10,7 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedUserJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):